@@ -0,0 +1,7 @@
+"""Performance benchmarks for motbox
+
+Benchmarks follow asv conventions (classes with params, setup and time_
+methods), so they can be run by asv or by the runner in this package:
+
+    python -m benchmarks [name-filter]
+"""
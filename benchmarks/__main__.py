@@ -0,0 +1,166 @@
+"""Runs the benchmarks without asv
+
+    python -m benchmarks [name-filter] [--save] [--compare COMMIT]
+
+With --save the results are stored in benchmarks/results/<commit>.json,
+--compare prints ratios to results stored for another commit (or a json
+file) and exits with status 1 when some benchmark is slower by more than
+--factor.
+"""
+
+import argparse
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import subprocess
+import sys
+import timeit
+
+import benchmarks
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def iter_benchmarks():
+    """Yields (name, class, method name) of all time_ and track_ benchmarks
+    """
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module("benchmarks." + module_info.name)
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method_name in sorted(dir(cls)):
+                if method_name.startswith(("time_", "track_")):
+                    name = "{}.{}.{}".format(module_info.name, class_name, method_name)
+                    yield (name, cls, method_name)
+
+
+def param_combinations(cls):
+    params = getattr(cls, "params", [])
+    if len(params) == 0:
+        return [()]
+    if not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def time_benchmark(cls, method_name, params):
+    """Returns best time per call in seconds
+    """
+    instance = cls()
+    if hasattr(instance, "setup"):
+        instance.setup(*params)
+    method = getattr(instance, method_name)
+    timer = timeit.Timer(lambda: method(*params))
+    # number and repeat attributes as in asv, number is estimated when missing
+    number = getattr(method, "number", getattr(cls, "number", 0)) or timer.autorange()[0]
+    repeat = getattr(method, "repeat", getattr(cls, "repeat", 3))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    if hasattr(instance, "teardown"):
+        instance.teardown(*params)
+    return best
+
+
+def track_benchmark(cls, method_name, params):
+    """Returns value reported by track_ benchmark and its unit
+    """
+    instance = cls()
+    if hasattr(instance, "setup"):
+        instance.setup(*params)
+    method = getattr(instance, method_name)
+    value = method(*params)
+    if hasattr(instance, "teardown"):
+        instance.teardown(*params)
+    return (value, getattr(method, "unit", ""))
+
+
+def current_commit():
+    """Returns hash of the checked out commit (or "unknown" outside of git)
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def results_filename(commit):
+    if os.path.exists(commit):
+        return commit
+    return os.path.join(RESULTS_DIR, commit + ".json")
+
+
+def load_results(commit):
+    """Returns results stored for commit (or in a json file) as {(name, params): value}
+    """
+    with open(results_filename(commit)) as handle:
+        stored = json.load(handle)
+    return {(item["name"], item["params"]): item["value"] for item in stored["results"]}
+
+
+def save_results(results):
+    commit = current_commit()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    filename = results_filename(commit)
+    with open(filename, "w") as handle:
+        json.dump({"commit": commit, "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                   "machine": platform.node(), "python": platform.python_version(),
+                   "results": results}, handle, indent=1)
+    return filename
+
+
+def main(pattern="", save=False, compare=None, factor=1.1):
+    """Runs benchmarks matching pattern and returns number of regressions
+    """
+    baseline = {} if compare is None else load_results(compare)
+    results = []
+    regressions = 0
+    for (name, cls, method_name) in iter_benchmarks():
+        if pattern not in name:
+            continue
+        for params in param_combinations(cls):
+            try:
+                if method_name.startswith("time_"):
+                    (value, unit) = (time_benchmark(cls, method_name, params) * 1e6, "us")
+                else:
+                    (value, unit) = track_benchmark(cls, method_name, params)
+            except NotImplementedError:
+                # asv convention for skipped parameter combinations
+                continue
+            value = float(value)
+            results.append({"name": name, "params": str(params), "value": value, "unit": unit})
+            line = "{:<60} {:<24} {:>12.2f} {}".format(name, str(params), value, unit)
+            previous = baseline.get((name, str(params)))
+            if previous:
+                ratio = value / previous
+                # only times are compared automatically, track_ values can grow either way
+                slower = method_name.startswith("time_") and ratio > factor
+                regressions += slower
+                line += "  {:>6.2f}x{}".format(ratio, "  SLOWER" if slower else "")
+            print(line)
+    if save:
+        print("Results saved to {}".format(save_results(results)))
+    return regressions
+
+
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Runs motbox benchmarks")
+    parser.add_argument("pattern", nargs="?", default="", help="part of benchmark names to run")
+    parser.add_argument("--save", action="store_true", help="store results of the current commit")
+    parser.add_argument("--compare", default=None, help="commit or json file with stored results")
+    parser.add_argument("--factor", default=1.1, type=float,
+                        help="time ratio reported as regression (default 1.1)")
+    return parser.parse_args(arguments)
+
+
+if __name__ == "__main__":
+    options = parse_arguments(sys.argv[1:])
+    regressions = main(options.pattern, options.save, options.compare, options.factor)
+    sys.exit(1 if regressions > 0 else 0)
@@ -0,0 +1,54 @@
+"""Benchmarks of track descriptors
+"""
+
+import os
+import shutil
+import tempfile
+import numpy as np
+from motbox import TrackBank, TrackStack, analytics
+from motbox.bank import save_bank
+
+from .bench_track import random_track
+
+
+class DescribeTrials(object):
+    """Descriptors of 500 frame trials, trial by trial vs. stacked
+    """
+    params = [["loop", "stack"], [8, 32], [100, 1000]]
+    param_names = ["method", "n_objects", "n_trials"]
+    number = 1
+    repeat = 3
+
+    def setup(self, method, n_objects, n_trials):
+        tracks = [random_track(n_objects, 500) for _ in range(n_trials)]
+        self.tracks = tracks
+        self.stack = TrackStack().from_tracks(tracks)
+
+    def time_describe(self, method, n_objects, n_trials):
+        if method == "loop":
+            for track in self.tracks:
+                analytics.describe(track, radius=3., xlim=(-10, 10), ylim=(-10, 10))
+        else:
+            analytics.describe(self.stack, radius=3., xlim=(-10, 10), ylim=(-10, 10))
+
+
+class DescribeBank(object):
+    """Descriptors of all trials of a memory-mapped bank
+    """
+    params = [1000, 10000]
+    param_names = ["n_trials"]
+    number = 1
+    repeat = 1
+
+    def setup(self, n_trials):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "bank.npz")
+        track = random_track(8, 500)
+        track.meta = {"xlim": (-10, 10), "ylim": (-10, 10)}
+        save_bank(self.filename, [track] * n_trials)
+
+    def teardown(self, n_trials):
+        shutil.rmtree(self.directory)
+
+    def time_describe_bank(self, n_trials):
+        analytics.describe_bank(TrackBank().load(self.filename), radius=3.)
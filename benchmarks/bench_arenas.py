@@ -0,0 +1,62 @@
+"""Benchmarks of arena shapes
+"""
+
+import numpy as np
+from motbox import Track, Position, arenas
+
+
+def regular_polygon(n_edges, radius=10.):
+    angles = np.arange(n_edges) * 2 * np.pi / n_edges
+    return arenas.Polygon(np.column_stack((radius * np.sin(angles), radius * np.cos(angles))))
+
+
+class ArenaGenerate(object):
+    """Von Mises track of 8 objects and 500 frames in arenas of different shapes
+    """
+    params = [["xlim_ylim", "rectangle", "annulus", "polygon64"]]
+    param_names = ["arena"]
+
+    def setup(self, arena):
+        self.opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 1.5}
+        shapes = {"rectangle": arenas.Rectangle((-10, 10), (-10, 10)),
+                  "annulus": arenas.Circle(10., obstacles=[arenas.Circle(3.)]),
+                  "polygon64": regular_polygon(64)}
+        if arena in shapes:
+            self.opts = {"arena": shapes[arena].prepare(), "spacing": 1.5}
+        self.position = Position().random_positions(8, None, None, 1.5, rng=np.random.default_rng(0),
+                                                    arena=shapes.get(arena, shapes["rectangle"]))
+        self.time = np.arange(500) / 100.
+
+    def time_generate(self, arena):
+        Track().generate_vonmises(Position(self.position.x, self.position.y), 5., 8, self.opts,
+                                  self.time, rng=np.random.default_rng(1))
+
+
+class ArenaLookup(object):
+    """Signed distance of 8 objects from the grid vs. computed edge by edge
+    """
+    params = [["grid", "exact"], [4, 64, 256]]
+    param_names = ["method", "n_edges"]
+
+    def setup(self, method, n_edges):
+        self.arena = regular_polygon(n_edges).prepare()
+        rng = np.random.default_rng(0)
+        self.x = rng.uniform(-10, 10, 8)
+        self.y = rng.uniform(-10, 10, 8)
+
+    def time_distance(self, method, n_edges):
+        if method == "grid":
+            self.arena.distance(self.x, self.y)
+        else:
+            self.arena.exact_distance(self.x, self.y)
+
+
+class ArenaPrepare(object):
+    """Computing the distance grid of a polygon
+    """
+    params = [4, 64]
+    param_names = ["n_edges"]
+    number = 1
+
+    def time_prepare(self, n_edges):
+        regular_polygon(n_edges).prepare()
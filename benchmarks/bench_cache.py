@@ -0,0 +1,36 @@
+"""Benchmarks of the trajectory cache
+"""
+
+import shutil
+import tempfile
+import numpy as np
+from motbox import Track, Position
+from motbox.cache import TrajectoryCache
+
+
+class CachedVonmises(object):
+    """Von Mises track of 8 objects generated vs. taken from the cache
+    """
+    params = [["generate", "hit"], [500, 5000]]
+    param_names = ["source", "n_frames"]
+
+    def setup(self, source, n_frames):
+        self.directory = tempfile.mkdtemp()
+        self.cache = TrajectoryCache(self.directory)
+        self.opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 1.5}
+        self.time = np.arange(n_frames) / 100.
+        self.position = Position().random_positions(8, (-10, 10), (-10, 10), 1.5,
+                                                    rng=np.random.default_rng(0))
+        if source == "hit":
+            self.generate(self.cache)
+
+    def teardown(self, source, n_frames):
+        shutil.rmtree(self.directory)
+
+    def generate(self, cache):
+        position = Position(self.position.x, self.position.y)
+        Track().generate_vonmises(position, 5., 8, self.opts, self.time,
+                                  rng=np.random.default_rng(1), cache=cache)
+
+    def time_vonmises(self, source, n_frames):
+        self.generate(None if source == "generate" else self.cache)
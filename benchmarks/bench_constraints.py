@@ -0,0 +1,50 @@
+"""Benchmarks of constraint-targeted trial generation
+"""
+
+import numpy as np
+from motbox import Track, Position
+from motbox.constraints import (MinDistance, MinEncounters, WallContact, ConstraintReport,
+                                evaluate, generate_constrained)
+
+OPTS = {"xlim": (-8, 8), "ylim": (-8, 8), "spacing": 1.5}
+
+
+def constraints():
+    return [MinDistance([0, 1, 2], 1.3), MinEncounters([0, 1, 2], 2.5, 6),
+            WallContact([0, 1, 2], 0.5)]
+
+
+class ConstrainedTrials(object):
+    """Three accepted 8 s trials of 8 objects at 50 Hz
+
+    "posthoc" generates whole tracks and checks them afterwards, "early"
+    checks constraints during generation.
+    """
+    params = [["posthoc", "early"]]
+    param_names = ["method"]
+    number = 1
+    repeat = 1
+
+    def setup(self, method):
+        self.time = np.arange(0, 8, 0.02)
+
+    def generate(self, method):
+        rng = np.random.default_rng(0)
+        report = ConstraintReport()
+        while report.accepted < 3:
+            if method == "early":
+                generate_constrained(8, 5., 8, OPTS, self.time, constraints(), rng=rng, report=report)
+                continue
+            position = Position().random_positions(8, OPTS["xlim"], OPTS["ylim"], 1.5, rng=rng)
+            track = Track().generate_vonmises(position, 5., 8, OPTS, self.time, rng=rng)
+            report.candidates += 1
+            report.frames += len(self.time)
+            report.accepted += evaluate(track, constraints(), OPTS) is None
+        return report
+
+    def time_generate(self, method):
+        self.generate(method)
+
+    def track_simulated_frames(self, method):
+        return self.generate(method).frames
+    track_simulated_frames.unit = "frames"
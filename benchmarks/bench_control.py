@@ -0,0 +1,29 @@
+"""Benchmarks of per-frame Puppeteer updates
+"""
+
+from motbox import Puppeteer
+
+from .bench_track import random_track
+
+
+class Stimulus(object):
+    def __init__(self):
+        self.pos = (0., 0.)
+        self.name = "stimulus"
+
+
+class UpdatePositions(object):
+    params = [[8, 32]]
+    param_names = ["n_objects"]
+
+    def setup(self, n_objects):
+        self.puppeteer = Puppeteer()
+        self.puppeteer.track = random_track(n_objects, 1000)
+        self.puppeteer.clone_template_psychopy(Stimulus(), n_objects)
+        self.puppeteer.prepare_frames(144)
+
+    def time_update_positions(self, n_objects):
+        self.puppeteer.update_positions_psychopy(3.21)
+
+    def time_update_frame(self, n_objects):
+        self.puppeteer.update_frame_psychopy(462)
@@ -0,0 +1,44 @@
+"""Benchmarks of event-driven collisions
+
+Per-frame bouncing needs fine timestep to keep objects inside the arena
+and apart, event-driven collisions are exact at any timestep.
+"""
+
+import numpy as np
+from scipy.spatial.distance import pdist
+from motbox import Track, Position
+
+
+class GenerateCollisions(object):
+    """10 s von Mises track of 12 objects in 20 x 20 arena, spacing 2
+    """
+    params = [["frames", "events"], [5, 25, 100]]
+    param_names = ["collisions", "frequency"]
+    number = 1
+    repeat = 3
+
+    def setup(self, collisions, frequency):
+        self.position = Position().random_positions(12, (-10, 10), (-10, 10), 2,
+                                                    rng=np.random.default_rng(0))
+        self.opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 2.}
+        if collisions == "events":
+            self.opts["collisions"] = "events"
+        self.time = np.arange(0, 10, 1. / frequency)
+
+    def generate(self):
+        return Track().generate_vonmises(Position(self.position.x, self.position.y), 5., 8,
+                                         self.opts, self.time, rng=np.random.default_rng(1))
+
+    def time_generate(self, collisions, frequency):
+        self.generate()
+
+    def track_min_distance(self, collisions, frequency):
+        track = self.generate()
+        return min(np.min(pdist(np.column_stack((track.x[frame], track.y[frame]))))
+                   for frame in range(len(track.time)))
+    track_min_distance.unit = "units"
+
+    def track_max_overshoot(self, collisions, frequency):
+        track = self.generate()
+        return max(np.max(np.abs(track.x)), np.max(np.abs(track.y))) - 10
+    track_max_overshoot.unit = "units"
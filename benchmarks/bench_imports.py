@@ -0,0 +1,41 @@
+"""Benchmarks of package import time
+
+Each import runs in a fresh interpreter with python -X importtime, the
+reported cumulative time of the module excludes interpreter startup.
+"""
+
+import subprocess
+import sys
+import numpy as np
+
+HEAVY = ("scipy", "matplotlib", "moviepy", "numba")
+
+
+def import_time(module):
+    """Returns cumulative import time of module in milliseconds
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                            check=True, capture_output=True, text=True)
+    for line in output.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000.
+    raise ValueError("Import time of {} not reported".format(module))
+
+
+class ImportTime(object):
+    """Import of the package (playback path), generators and visualisations
+    """
+    params = ["motbox", "motbox.generator", "motbox.commands", "motbox.visualisations"]
+    param_names = ["module"]
+
+    def track_import_time(self, module):
+        # median of several runs, single runs are noisy
+        return float(np.median([import_time(module) for _ in range(5)]))
+    track_import_time.unit = "ms"
+
+    def track_heavy_modules(self, module):
+        code = "import sys, {}; print(sum(name in sys.modules for name in {!r}))".format(module, HEAVY)
+        output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+        return int(output.stdout)
+    track_heavy_modules.unit = "modules"
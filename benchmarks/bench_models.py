@@ -0,0 +1,48 @@
+"""Benchmarks of motion models
+"""
+
+import numpy as np
+from motbox import Track, Position, models
+
+OPTS = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 1.5}
+
+MODELS = {"vonmises": models.VonMises(8), "brownian": models.Brownian(),
+          "ornstein_uhlenbeck": models.OrnsteinUhlenbeck(0.5), "curvature": models.Curvature(0.2),
+          "speed_changes": models.SpeedChanges(1.)}
+
+
+class VonmisesNoise(object):
+    """Von Mises direction changes drawn each frame (jitter_func) vs. in one block (model)
+    """
+    params = [["jitter_func", "model"], [500, 5000]]
+    param_names = ["noise", "n_frames"]
+
+    def setup(self, noise, n_frames):
+        self.time = np.arange(n_frames) / 100.
+        self.position = Position().random_positions(8, (-10, 10), (-10, 10), 1.5,
+                                                    rng=np.random.default_rng(0))
+
+    def time_generate(self, noise, n_frames):
+        rng = np.random.default_rng(1)
+        position = Position(self.position.x, self.position.y)
+        if noise == "model":
+            Track().generate_trajectory(position, 5., OPTS, self.time, rng=rng,
+                                        model=models.VonMises(8))
+        else:
+            def jitter_func():
+                return rng.vonmises(mu=0, kappa=8, size=8)
+            Track().generate_trajectory(position, 5., OPTS, self.time, jitter_func=jitter_func,
+                                        rng=rng)
+
+
+class SampleModel(object):
+    """Sampling noise of 5000 frames of 8 objects
+    """
+    params = [list(MODELS)]
+    param_names = ["model"]
+
+    def setup(self, model):
+        self.steps = np.full((4999, 8), 0.05)
+
+    def time_sample(self, model):
+        MODELS[model].sample(self.steps, 0.01, np.random.default_rng(1))
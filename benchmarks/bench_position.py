@@ -0,0 +1,23 @@
+"""Benchmarks of Position methods
+"""
+
+import numpy as np
+from motbox import Position
+
+
+class RandomPositions(object):
+    """Random starting positions in 20 x 20 area with minimum distance 2
+
+    Rejection sampling is skipped for densities it does not finish in
+    reasonable time.
+    """
+    params = [["rejection", "grid"], [8, 16, 24, 60]]
+    param_names = ["method", "n_objects"]
+
+    def setup(self, method, n_objects):
+        if method == "rejection" and n_objects > 24:
+            raise NotImplementedError()
+        self.rng = np.random.default_rng(0)
+
+    def time_random_positions(self, method, n_objects):
+        Position().random_positions(n_objects, (-10, 10), (-10, 10), 2, rng=self.rng, method=method)
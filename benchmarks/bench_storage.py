@@ -0,0 +1,159 @@
+"""Benchmarks of saving and loading tracks
+"""
+
+import os
+import shutil
+import tempfile
+import tracemalloc
+import numpy as np
+from motbox import Track, TrackBank, storage
+from motbox.bank import save_bank
+from motbox.track import load_many
+
+from .bench_track import random_track
+
+
+class LoadTrack(object):
+    """Loading single track saved as text or binary file
+    """
+    params = [["csv", "npz", "npz32"], [8, 32], [1200, 12000]]
+    param_names = ["format", "n_objects", "n_frames"]
+
+    def setup(self, file_format, n_objects, n_frames):
+        self.directory = tempfile.mkdtemp()
+        track = random_track(n_objects, n_frames)
+        if file_format == "csv":
+            self.filename = os.path.join(self.directory, "track.csv")
+            track.save_to_csv(self.filename)
+        else:
+            self.filename = os.path.join(self.directory, "track.npz")
+            track.save_to_npz(self.filename, dtype=np.float32 if file_format == "npz32" else None)
+
+    def teardown(self, file_format, n_objects, n_frames):
+        shutil.rmtree(self.directory)
+
+    def time_load(self, file_format, n_objects, n_frames):
+        Track().load_from_csv(self.filename)
+
+    def time_load_and_read(self, file_format, n_objects, n_frames):
+        track = Track()
+        track.load_from_csv(self.filename)
+        np.sum(track.x)
+
+    def track_file_size(self, file_format, n_objects, n_frames):
+        return os.path.getsize(self.filename)
+    track_file_size.unit = "bytes"
+
+
+class SaveTrack(object):
+    """Saving single track as text or binary file
+    """
+    params = [["csv", "npz", "npz32"], [8, 32], [1200, 12000]]
+    param_names = ["format", "n_objects", "n_frames"]
+
+    def setup(self, file_format, n_objects, n_frames):
+        self.directory = tempfile.mkdtemp()
+        self.track = random_track(n_objects, n_frames)
+        extension = ".csv" if file_format == "csv" else ".npz"
+        self.filename = os.path.join(self.directory, "track" + extension)
+        self.dtype = np.float32 if file_format == "npz32" else None
+
+    def teardown(self, file_format, n_objects, n_frames):
+        shutil.rmtree(self.directory)
+
+    def time_save(self, file_format, n_objects, n_frames):
+        if file_format == "csv":
+            self.track.save_to_csv(self.filename)
+        else:
+            self.track.save_to_npz(self.filename, dtype=self.dtype)
+
+
+class ReadCsv(object):
+    """Reading legacy text files
+    """
+    params = [["genfromtxt", "read_csv_v0"], [1200, 12000]]
+    param_names = ["reader", "n_frames"]
+
+    def setup(self, reader, n_frames):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "track.csv")
+        random_track(8, n_frames).save_to_csv(self.filename)
+
+    def teardown(self, reader, n_frames):
+        shutil.rmtree(self.directory)
+
+    def time_read(self, reader, n_frames):
+        if reader == "genfromtxt":
+            np.genfromtxt(self.filename, delimiter="\t")
+        else:
+            storage.read_csv_v0(self.filename)
+
+
+class LoadMany(object):
+    """Loading a folder of text tracks one by one or with a thread pool
+    """
+    params = [[1, 4]]
+    param_names = ["max_workers"]
+
+    def setup(self, max_workers):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for index in range(32):
+            path = os.path.join(self.directory, "track_{}.csv".format(index))
+            random_track(8, 1200).save_to_csv(path)
+            self.paths.append(path)
+
+    def teardown(self, max_workers):
+        shutil.rmtree(self.directory)
+
+    def time_load_many(self, max_workers):
+        load_many(self.paths, max_workers=max_workers)
+
+
+class BankAccess(object):
+    """Opening a bank of tracks and reading one trial
+    """
+    params = [[100, 2000]]
+    param_names = ["n_trials"]
+
+    def setup(self, n_trials):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "bank.npz")
+        save_bank(self.filename, (random_track(8, 500) for _ in range(n_trials)))
+
+    def teardown(self, n_trials):
+        shutil.rmtree(self.directory)
+
+    def time_open_and_read_trial(self, n_trials):
+        track = TrackBank().load(self.filename)[n_trials // 2]
+        np.sum(track.x)
+
+
+class TracksInMemory(object):
+    """Memory of 10000 generated trials (8 objects, 300 frames) kept in memory
+
+    "separate" are float64 x and y arrays with own timelines (as generated
+    before compact tracks), "float32" compact tracks sharing one timeline as
+    returned by generate_straight_trajectory_bank(..., dtype=np.float32).
+    """
+    params = [["separate", "float64", "float32"]]
+    param_names = ["storage"]
+
+    def track_memory(self, storage_type):
+        data = random_track(8, 300)
+        tracemalloc.start()
+        time = data.time.copy()
+        tracks = []
+        for _ in range(10000):
+            track = Track()
+            if storage_type == "separate":
+                (track.time, track.x, track.y) = (data.time.copy(), data.x.copy(), data.y.copy())
+            else:
+                (track.time, track.x, track.y) = (time, data.x, data.y)
+                track.compact(np.float64 if storage_type == "float64" else np.float32)
+            track.n_objects = 8
+            tracks.append(track)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return memory / 2 ** 20
+    track_memory.unit = "MiB"
@@ -0,0 +1,42 @@
+"""Benchmarks of streaming trajectory generation
+"""
+
+import tracemalloc
+import numpy as np
+from motbox import Track, Position
+from motbox.stream import TrajectoryStream
+
+OPTS = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 1.5}
+
+
+class GenerateLongTrack(object):
+    """Von Mises track of 8 objects at 1 kHz, whole array vs. 1000 frame chunks
+    """
+    params = [["track", "stream"], [10000, 40000]]
+    param_names = ["method", "n_frames"]
+    number = 1
+    repeat = 1
+
+    def setup(self, method, n_frames):
+        self.position = Position().random_positions(8, (-10, 10), (-10, 10), 2,
+                                                    rng=np.random.default_rng(0))
+
+    def generate(self, method, n_frames):
+        rng = np.random.default_rng(1)
+        if method == "track":
+            Track().generate_vonmises(self.position, 5., 8, OPTS, np.arange(n_frames) / 1000., rng=rng)
+        else:
+            stream = TrajectoryStream().start(self.position, 5., OPTS, 0.001, kappa=8, rng=rng)
+            for chunk in stream.chunks(1000, n_frames):
+                pass
+
+    def time_generate(self, method, n_frames):
+        self.generate(method, n_frames)
+
+    def track_peak_memory(self, method, n_frames):
+        tracemalloc.start()
+        self.generate(method, n_frames)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 1024.
+    track_peak_memory.unit = "KiB"
@@ -0,0 +1,191 @@
+"""Benchmarks of Track methods
+"""
+
+import numpy as np
+from motbox import Track, Position, kernels
+from motbox.stats import GenerationStats
+from motbox.track import resample, time_interpolate_tracks
+
+
+def position_for_time_interp(track, timevalue):
+    """Per-object np.interp lookup, as used before the precomputed lookup
+    """
+    newx = np.zeros((1, track.n_objects))
+    newy = np.zeros((1, track.n_objects))
+    for index in range(track.n_objects):
+        newx[:, index] = np.interp(timevalue, track.time, track.x[:, index])
+        newy[:, index] = np.interp(timevalue, track.time, track.y[:, index])
+    return (newx, newy)
+
+
+def random_track(n_objects, n_frames, frequency=100.):
+    track = Track()
+    track.time = np.arange(n_frames) / frequency
+    track.x = np.cumsum(np.random.normal(size=(n_frames, n_objects)), axis=0)
+    track.y = np.cumsum(np.random.normal(size=(n_frames, n_objects)), axis=0)
+    track.n_objects = n_objects
+    return track
+
+
+class PositionForTime(object):
+    params = [[4, 20, 64], [500, 50000]]
+    param_names = ["n_objects", "n_frames"]
+
+    def setup(self, n_objects, n_frames):
+        self.track = random_track(n_objects, n_frames)
+        self.timevalue = self.track.time[-1] * 0.377
+        self.out = (np.zeros((1, n_objects)), np.zeros((1, n_objects)))
+
+    def time_interp_loop(self, n_objects, n_frames):
+        position_for_time_interp(self.track, self.timevalue)
+
+    def time_lookup(self, n_objects, n_frames):
+        self.track.position_for_time(self.timevalue)
+
+    def time_lookup_out(self, n_objects, n_frames):
+        self.track.position_for_time(self.timevalue, out=self.out)
+
+
+def time_interpolate_interp(track, newtime):
+    """Per-object np.interp resampling, as used before the vectorized resample
+    """
+    newx = np.zeros((len(newtime), track.n_objects))
+    newy = np.zeros((len(newtime), track.n_objects))
+    for index in range(track.n_objects):
+        newx[:, index] = np.interp(newtime, track.time, track.x[:, index])
+        newy[:, index] = np.interp(newtime, track.time, track.y[:, index])
+    return (newx, newy)
+
+
+class TimeInterpolate(object):
+    """Resampling 100 Hz track to 144 Hz
+    """
+    params = [[8, 64], [1200, 60000]]
+    param_names = ["n_objects", "n_frames"]
+
+    def setup(self, n_objects, n_frames):
+        self.track = random_track(n_objects, n_frames)
+        self.newtime = np.arange(0, self.track.time[-1], 1 / 144.)
+
+    def time_interp_loop(self, n_objects, n_frames):
+        time_interpolate_interp(self.track, self.newtime)
+
+    def time_linear(self, n_objects, n_frames):
+        resample(self.track.time, self.newtime, [self.track.x, self.track.y])
+
+    def time_cubic(self, n_objects, n_frames):
+        resample(self.track.time, self.newtime, [self.track.x, self.track.y], method="cubic")
+
+
+class TimeInterpolateMany(object):
+    """Resampling a bank of tracks sharing one timeline
+    """
+    params = [[10, 100]]
+    param_names = ["n_tracks"]
+
+    def setup(self, n_tracks):
+        self.tracks = [random_track(8, 1200) for _ in range(n_tracks)]
+        self.newtime = np.arange(0, 12, 1 / 144.)
+
+    def time_one_by_one(self, n_tracks):
+        for track in self.tracks:
+            resample(track.time, self.newtime, [track.x, track.y])
+
+    def time_together(self, n_tracks):
+        time_interpolate_tracks(self.tracks, self.newtime)
+
+
+class TrackVariants(object):
+    """Mirrored, shifted and target-subset variants of a trial, copies vs. views
+    """
+    params = [["copy", "view"], [8, 32], [1200, 12000]]
+    param_names = ["method", "n_objects", "n_frames"]
+
+    def setup(self, method, n_objects, n_frames):
+        self.track = random_track(n_objects, n_frames)
+
+    def variants(self, method):
+        track = self.track
+        if method == "copy":
+            (mirrored, shifted, targets) = (Track(), Track(), Track())
+            for variant in (mirrored, shifted, targets):
+                (variant.time, variant.x, variant.y) = (track.time.copy(), track.x.copy(), track.y.copy())
+                variant.n_objects = track.n_objects
+            mirrored.x *= -1
+            shifted.x += 1.
+            shifted.y += 1.
+            (targets.x, targets.y, targets.n_objects) = (targets.x[:, :4], targets.y[:, :4], 4)
+        else:
+            (mirrored, shifted, targets) = (track[:], track[:], track[:, :4])
+            mirrored.scale(-1, axis=0)
+            shifted.move((1., 1.))
+        return (mirrored, shifted, targets)
+
+    def time_create(self, method, n_objects, n_frames):
+        self.variants(method)
+
+    def time_create_and_play(self, method, n_objects, n_frames):
+        # a playback reads one position per screen refresh
+        for variant in self.variants(method):
+            for timevalue in np.linspace(0, variant.time[-1], 600):
+                variant.position_for_time(timevalue)
+
+
+class GenerateVonmises(object):
+    """Von Mises track at 100 Hz, density is given by the arena size (20 x 20 or 10 x 10)
+    """
+    params = [[4, 8, 16], [500, 5000], ["sparse", "dense"]]
+    param_names = ["n_objects", "n_frames", "density"]
+
+    def setup(self, n_objects, n_frames, density):
+        limit = 10 if density == "sparse" else 5
+        self.opts = {"xlim": (-limit, limit), "ylim": (-limit, limit), "spacing": 1.5}
+        self.start = Position().random_positions(n_objects, self.opts["xlim"], self.opts["ylim"], 1.5,
+                                                 rng=np.random.default_rng(0), method="grid")
+        self.time = np.arange(n_frames) / 100.
+
+    def time_generate_vonmises(self, n_objects, n_frames, density):
+        Track().generate_vonmises(Position(self.start.x, self.start.y), 5., 8, self.opts, self.time,
+                                  rng=np.random.default_rng(1))
+
+    def time_generate_trajectory(self, n_objects, n_frames, density):
+        Track().generate_trajectory(Position(self.start.x, self.start.y), 5., self.opts, self.time,
+                                    rng=np.random.default_rng(1))
+
+
+class GenerationStatsOverhead(object):
+    """Von Mises track of 8 objects, 2000 frames, with and without collected statistics
+    """
+    params = [[False, True]]
+    param_names = ["stats"]
+
+    def setup(self, stats):
+        self.opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 1.5}
+        self.start = Position().random_positions(8, (-10, 10), (-10, 10), 1.5,
+                                                 rng=np.random.default_rng(0))
+        self.time = np.arange(2000) / 100.
+
+    def time_generate_vonmises(self, stats):
+        Track().generate_vonmises(Position(self.start.x, self.start.y), 5., 8, self.opts, self.time,
+                                  rng=np.random.default_rng(1), stats=GenerationStats() if stats else None)
+
+
+class GenerateBackend(object):
+    """Von Mises track of 500 frames in 20 x 20 arena with NumPy and compiled kernel
+    """
+    params = [["numpy", "numba"], [8, 16]]
+    param_names = ["backend", "n_objects"]
+
+    def setup(self, backend, n_objects):
+        if backend == "numba" and not kernels.AVAILABLE:
+            raise NotImplementedError()
+        self.opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 1.5, "backend": backend}
+        self.start = Position().random_positions(n_objects, (-10, 10), (-10, 10), 1.5,
+                                                 rng=np.random.default_rng(0))
+        self.time = np.arange(500) / 100.
+        # compiles the kernel
+        self.time_generate_vonmises(backend, n_objects)
+
+    def time_generate_vonmises(self, backend, n_objects):
+        Track().generate_vonmises(Position(self.start.x, self.start.y), 5., 8, self.opts, self.time,
+                                  rng=np.random.default_rng(1))
@@ -0,0 +1,94 @@
+"""Benchmarks of video rendering
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+from motbox import visualisations as vis
+
+from .bench_track import random_track
+
+
+class RenderFrame(object):
+    """Rendering one 900 x 600 frame without encoding
+    """
+    params = [["fast", "pretty"], [8, 64]]
+    param_names = ["mode", "n_objects"]
+
+    def setup(self, mode, n_objects):
+        self.track = random_track(n_objects, 1000)
+        self.track.x = np.clip(self.track.x, -10, 10)
+        self.track.y = np.clip(self.track.y, -10, 10)
+        if mode == "fast":
+            self.frames = vis.render_frames(self.track, np.arange(0, 10, 0.0001))
+        else:
+            (self.fig, self.axis) = plt.subplots(figsize=(6, 4), dpi=150)
+
+    def teardown(self, mode, n_objects):
+        if mode == "pretty":
+            plt.close(self.fig)
+
+    def time_render_frame(self, mode, n_objects):
+        if mode == "fast":
+            next(self.frames)
+        else:
+            self.axis.clear()
+            (tx, ty) = self.track.position_for_time(3.)
+            self.axis.plot(tx, ty, "ko")
+            self.axis.set_xlim((-10, 10))
+            self.axis.set_ylim((-10, 10))
+            self.fig.canvas.draw()
+            np.asarray(self.fig.canvas.buffer_rgba())[:, :, :3].copy()
+
+
+class TrajectoryVideo(object):
+    """Rendering and encoding 10 s video (250 frames)
+    """
+    params = [["fast", "pretty"]]
+    param_names = ["mode"]
+    number = 1
+    repeat = 1
+
+    def setup(self, mode):
+        self.directory = tempfile.mkdtemp()
+        self.track = random_track(8, 1001)
+        self.track.x = np.clip(self.track.x, -10, 10)
+        self.track.y = np.clip(self.track.y, -10, 10)
+
+    def teardown(self, mode):
+        shutil.rmtree(self.directory)
+
+    def time_trajectory_video(self, mode):
+        vis.trajectory_video(self.track, os.path.join(self.directory, "video.mp4"), mode=mode)
+
+    def track_frames_per_second(self, mode):
+        start = time.perf_counter()
+        vis.trajectory_video(self.track, os.path.join(self.directory, "video.mp4"), mode=mode)
+        return len(vis.frame_times(self.track)) / (time.perf_counter() - start)
+    track_frames_per_second.unit = "frames/s"
+
+
+class ParallelVideo(object):
+    """Rendering and encoding 40 s video (1000 frames) in worker processes
+    """
+    params = [[1, 2, 4]]
+    param_names = ["jobs"]
+    number = 1
+    repeat = 1
+
+    def setup(self, jobs):
+        self.directory = tempfile.mkdtemp()
+        self.track = random_track(8, 4001)
+        self.track.x = np.clip(self.track.x, -10, 10)
+        self.track.y = np.clip(self.track.y, -10, 10)
+
+    def teardown(self, jobs):
+        shutil.rmtree(self.directory)
+
+    def time_trajectory_video(self, jobs):
+        vis.trajectory_video(self.track, os.path.join(self.directory, "video.mp4"), jobs=jobs)
@@ -1,8 +1,29 @@
 """ Set of tools for generating trajectories
 for Multiple Object Tracking Experiments
 
+Track, TrackView, Position and Puppeteer are imported with the package,
+the other classes when first used. Heavy dependencies (scipy, matplotlib,
+moviepy, numba) are imported inside the functions which need them, so
+playback in an experiment does not load them.
 """
-__all__ = ["Track", "Position", "Puppeteer"]
+import importlib
 
-from .track import Track, Position
-from .control import Puppeteer
\ No newline at end of file
+__version__ = "0.1.0"
+
+__all__ = ["Track", "TrackView", "Position", "Puppeteer", "TrackStack", "TrackBank", "TrajectoryStream"]
+
+from .track import Track, TrackView, Position
+from .control import Puppeteer
+
+# class name -> module, imported on first access
+_LAZY = {"TrackStack": "batch", "TrackBank": "bank", "TrajectoryStream": "stream"}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module("." + _LAZY[name], __name__), name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
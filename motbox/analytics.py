@@ -0,0 +1,222 @@
+"""Descriptors of tracks
+
+Functions accept a Track (x and y with dim1 = time, dim2 = objects) or a
+TrackStack (dim1 = trials) and compute all frames, objects and trials at
+once. Pairwise distances are computed in chunks of frames (CHUNK_ELEMENTS
+coordinates at a time), so memory stays bounded for any number of objects.
+
+Banks are screened with describe_bank, which takes consecutive trials of
+the same shape as memory-mapped TrackStack views (TrackBank.stack).
+"""
+
+import json
+
+import numpy as np
+
+from . import arenas
+
+# number of coordinates (frames x objects) compared at once
+CHUNK_ELEMENTS = 2 ** 16
+
+
+def displacement(track):
+    """Returns touple (dx, dy) of movements between frames, shape (..., time - 1, objects)
+    """
+    return (np.diff(track.x, axis=-2), np.diff(track.y, axis=-2))
+
+
+def speed(track):
+    """Returns instantaneous speed (units per second), shape (..., time - 1, objects)
+    """
+    (dx, dy) = displacement(track)
+    return np.hypot(dx, dy) / np.diff(track.time)[:, None]
+
+
+def heading(track):
+    """Returns direction of movement between frames in radians (0 - 2pi)
+
+    Same convention as directions in Track.generate_trajectory (0 is up,
+    pi/2 is right), shape (..., time - 1, objects).
+    """
+    (dx, dy) = displacement(track)
+    return np.mod(np.arctan2(dx, dy), 2 * np.pi)
+
+
+def heading_change(track):
+    """Returns change of heading between consecutive movements in radians (-pi - pi)
+
+    Shape is (..., time - 2, objects).
+    """
+    change = np.diff(heading(track), axis=-2)
+    return np.mod(change + np.pi, 2 * np.pi) - np.pi
+
+
+def _pairwise(track, radius, chunk_elements):
+    """Returns nearest neighbour distances and crowding (None without radius)
+
+    Frames are processed in chunks, in each chunk object i is compared with
+    objects i + 1, ... in all frames at once.
+    """
+    shape = np.shape(track.x)
+    n_objects = shape[-1]
+    x = np.reshape(track.x, (-1, n_objects))
+    y = np.reshape(track.y, (-1, n_objects))
+    nearest = np.zeros(x.shape)
+    counts = None if radius is None else np.zeros(x.shape, dtype=int)
+    chunk = max(1, chunk_elements // max(n_objects, 1))
+    for start in range(0, len(x), chunk):
+        # objects x frames, rows are contiguous
+        cx = np.array(x[start:start + chunk].T, dtype=float, order="C")
+        cy = np.array(y[start:start + chunk].T, dtype=float, order="C")
+        squared = np.full(cx.shape, np.inf)
+        close = np.zeros(cx.shape, dtype=int)
+        for index in range(n_objects - 1):
+            dx = cx[index + 1:] - cx[index]
+            dy = cy[index + 1:] - cy[index]
+            distance = dx * dx + dy * dy
+            np.minimum(squared[index], np.min(distance, axis=0), out=squared[index])
+            np.minimum(squared[index + 1:], distance, out=squared[index + 1:])
+            if radius is not None:
+                within = distance < radius * radius
+                close[index] += np.count_nonzero(within, axis=0)
+                close[index + 1:] += within
+        nearest[start:start + chunk] = np.sqrt(squared).T
+        if radius is not None:
+            counts[start:start + chunk] = close.T
+    return (nearest.reshape(shape), None if radius is None else counts.reshape(shape))
+
+
+def nearest_distance(track, chunk_elements=CHUNK_ELEMENTS):
+    """Returns distance of each object to its nearest neighbour, shape (..., time, objects)
+    """
+    return _pairwise(track, None, chunk_elements)[0]
+
+
+def min_distance(track, chunk_elements=CHUNK_ELEMENTS):
+    """Returns minimum pairwise distance in each frame, shape (..., time)
+    """
+    return np.min(nearest_distance(track, chunk_elements), axis=-1)
+
+
+def crowding(track, radius, chunk_elements=CHUNK_ELEMENTS):
+    """Returns number of other objects closer than radius, shape (..., time, objects)
+    """
+    return _pairwise(track, radius, chunk_elements)[1]
+
+
+def _arena(track, xlim, ylim):
+    """Returns arena limits, from track's meta when not given (None when unknown)
+    """
+    meta = getattr(track, "meta", None) or {}
+    return (meta.get("xlim") if xlim is None else xlim, meta.get("ylim") if ylim is None else ylim)
+
+
+def _shaped_arena(track, arena, xlim, ylim):
+    """Returns arena (motbox.arenas.Arena) given or stored in track's meta, None for rectangles
+    """
+    if arena is not None or xlim is not None or ylim is not None:
+        return arena
+    description = (getattr(track, "meta", None) or {}).get("arena")
+    return None if description is None else arenas.from_description(description)
+
+
+def wall_contacts(track, margin=0., xlim=None, ylim=None, arena=None):
+    """Returns whether objects are closer than margin to the walls, shape (..., time, objects)
+
+    Arena (motbox.arenas.Arena, walls are its boundary and obstacles) or
+    arena limits are taken from track's meta unless given.
+    """
+    arena = _shaped_arena(track, arena, xlim, ylim)
+    if arena is not None:
+        return arena.distance(track.x, track.y) > -margin
+    (xlim, ylim) = _arena(track, xlim, ylim)
+    if xlim is None or ylim is None:
+        raise ValueError("Arena limits are not given and not stored in track's meta")
+    return ((track.x < xlim[0] + margin) | (track.x > xlim[1] - margin)
+            | (track.y < ylim[0] + margin) | (track.y > ylim[1] - margin))
+
+
+def describe(track, radius=None, margin=0., xlim=None, ylim=None, chunk_elements=CHUNK_ELEMENTS,
+             arena=None):
+    """Returns summary descriptors of track or of each trial of TrackStack
+
+    Parameters
+    ---------
+      track : motbox.Track or motbox.TrackStack
+      radius : float, optional
+        radius of crowding (mean_crowding is computed only when given)
+      margin : float
+        distance from walls counted as wall contact
+      xlim, ylim : touple(2) of float, optional
+        arena limits (default from track's meta, wall contacts are skipped without them)
+      arena : motbox.arenas.Arena, optional
+        arena of other shape than rectangle (default from track's meta)
+
+    Returns
+    ---------
+      dictionary with mean_speed, max_speed, mean_heading_change (mean
+      absolute change per frame), min_distance, mean_nearest_distance,
+      mean_crowding and wall_contact_fraction, scalars for Track and
+      arrays (trials) for TrackStack
+    """
+    axes = (-2, -1)
+    speeds = speed(track)
+    (nearest, counts) = _pairwise(track, radius, chunk_elements)
+    result = {"mean_speed": np.mean(speeds, axis=axes), "max_speed": np.max(speeds, axis=axes),
+              "mean_heading_change": np.mean(np.abs(heading_change(track)), axis=axes),
+              "min_distance": np.min(nearest, axis=axes),
+              "mean_nearest_distance": np.mean(nearest, axis=axes)}
+    if radius is not None:
+        result["mean_crowding"] = np.mean(counts, axis=axes)
+    arena = _shaped_arena(track, arena, xlim, ylim)
+    (xlim, ylim) = _arena(track, xlim, ylim)
+    if arena is not None or (xlim is not None and ylim is not None):
+        contacts = wall_contacts(track, margin, xlim, ylim, arena)
+        result["wall_contact_fraction"] = np.mean(contacts, axis=axes)
+    return result
+
+
+def describe_bank(bank, radius=None, margin=0., xlim=None, ylim=None, chunk_trials=1000,
+                  chunk_elements=CHUNK_ELEMENTS, arena=None):
+    """Returns descriptors (see describe) of all trials of TrackBank
+
+    Consecutive trials with the same timeline and number of objects are
+    processed together, chunk_trials at a time. Arena (or its limits) is
+    taken from meta of the first trial of each chunk unless given, trials
+    without any have NaN wall_contact_fraction.
+
+    Returns
+    ---------
+      dictionary of arrays (trials)
+    """
+    parts = []
+    # arenas rebuilt from meta, the grid is computed once for all chunks
+    rebuilt = {}
+    start = 0
+    while start < bank.n_trials:
+        stop = min(start + chunk_trials, bank.n_trials)
+        # number of frames and objects
+        shapes = bank.index[start:stop, 1::2]
+        same = np.all(shapes == shapes[0], axis=1)
+        if not np.all(same):
+            stop = start + int(np.argmin(same))
+        try:
+            stack = bank.stack(start, stop)
+        except ValueError:
+            # different timelines, trial by trial
+            stop = start + 1
+            stack = bank.stack(start, stop)
+        params = bank.meta[start]["params"]
+        shape = arena
+        if shape is None and xlim is None and ylim is None and params.get("arena") is not None:
+            key = json.dumps(params["arena"], sort_keys=True)
+            if key not in rebuilt:
+                rebuilt[key] = arenas.from_description(params["arena"])
+            shape = rebuilt[key]
+        parts.append(describe(stack, radius, margin, params.get("xlim") if xlim is None else xlim,
+                              params.get("ylim") if ylim is None else ylim, chunk_elements, shape))
+        start = stop
+    names = [name for part in parts for name in part]
+    return {name: np.concatenate([part[name] if name in part else np.full(len(part["mean_speed"]), np.nan)
+                                  for part in parts])
+            for name in dict.fromkeys(names)}
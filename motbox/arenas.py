@@ -0,0 +1,294 @@
+"""Arena shapes
+
+An arena is the region where objects move: Rectangle, Circle or Polygon,
+each with optional obstacles (other shapes objects cannot enter, e.g. an
+annular arena is a Circle with a smaller Circle as obstacle). The signed
+distance to the boundary (negative inside) and its gradient (outward
+normal) are computed once on a grid covering the arena, then checking and
+reflecting all objects in a frame is one interpolated lookup, whatever the
+shape and number of edges.
+
+Arenas are used with opts["arena"] in Track.generate_trajectory (objects
+outside and moving away are reflected about the boundary normal) and with
+arena in Position.random_positions. Track.meta["arena"] stores
+arena.describe(), from_description rebuilds the arena.
+
+Examples
+-------
+arena = arenas.Circle(10., obstacles=[arenas.Circle(3.)])
+position = Position().random_positions(8, None, None, 1.5, arena=arena)
+track = Track().generate_vonmises(position, 5., 8, {"arena": arena, "spacing": 1.5}, time)
+"""
+
+import abc
+
+import numpy as np
+
+# grid cells along the longer side of arena's bounding box
+RESOLUTION = 512
+
+# redraws of points outside the arena in uniform sampling
+SAMPLING_ROUNDS = 1000
+
+
+class Arena(object, metaclass=abc.ABCMeta):
+    """Base of arena shapes
+
+    - obstacles - list of arenas objects cannot enter
+    - resolution - number of grid cells along the longer side
+
+    Shapes implement _distance, bounds and _parameters.
+    """
+    name = None
+
+    def __init__(self, obstacles=(), resolution=RESOLUTION):
+        self.obstacles = list(obstacles)
+        self.resolution = resolution
+        self._grid = None
+        self._flat = None
+        self._origin = None
+        self._cell = None
+
+
+    @abc.abstractmethod
+    def _distance(self, x, y):
+        """Returns exact signed distance to the shape without obstacles
+        """
+
+
+    @abc.abstractmethod
+    def bounds(self):
+        """Returns touple (xlim, ylim) of the bounding box
+        """
+
+
+    @abc.abstractmethod
+    def _parameters(self):
+        """Returns parameters of the shape for describe()
+        """
+
+
+    def exact_distance(self, x, y):
+        """Returns exact signed distance to the boundary (negative inside)
+        """
+        distance = self._distance(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        for obstacle in self.obstacles:
+            distance = np.maximum(distance, -obstacle.exact_distance(x, y))
+        return distance
+
+
+    def prepare(self):
+        """Computes the distance and normal grid (done on first lookup), returns self
+        """
+        if self._grid is not None:
+            return self
+        (xlim, ylim) = self.bounds()
+        size = max(xlim[1] - xlim[0], ylim[1] - ylim[0])
+        cell = size / self.resolution
+        # objects overshoot the boundary by at most a step
+        pad = 0.05 * size + 2 * cell
+        x = np.arange(xlim[0] - pad, xlim[1] + pad + cell, cell)
+        y = np.arange(ylim[0] - pad, ylim[1] + pad + cell, cell)
+        (grid_x, grid_y) = np.meshgrid(x, y, indexing="ij")
+        distance = self.exact_distance(grid_x, grid_y)
+        (dx, dy) = np.gradient(distance, cell)
+        self._grid = np.stack((distance, dx, dy), axis=-1)
+        self._flat = self._grid.reshape(-1, 3)
+        self._origin = (x[0], y[0])
+        self._cell = cell
+        return self
+
+
+    def lookup(self, x, y):
+        """Returns signed distance and gradient, array of shape x.shape + (3, )
+
+        Values are taken from the nearest grid node, the distance is
+        corrected by the gradient (exact where the boundary is straight).
+        Points outside the grid take values from its border.
+        """
+        self.prepare()
+        shape = np.shape(x)
+        x = np.ravel(x)
+        y = np.ravel(y)
+        (n_x, n_y) = self._grid.shape[:2]
+        # minimum and maximum, np.clip is slow for few objects
+        ix = np.minimum(np.maximum(np.rint((x - self._origin[0]) / self._cell).astype(int), 0), n_x - 1)
+        iy = np.minimum(np.maximum(np.rint((y - self._origin[1]) / self._cell).astype(int), 0), n_y - 1)
+        values = self._flat[ix * n_y + iy]
+        values[:, 0] += (values[:, 1] * (x - self._origin[0] - ix * self._cell)
+                         + values[:, 2] * (y - self._origin[1] - iy * self._cell))
+        return values.reshape(shape + (3, ))
+
+
+    def distance(self, x, y):
+        """Returns signed distance to the boundary from the grid (negative inside)
+        """
+        return self.lookup(x, y)[..., 0]
+
+
+    def contains(self, x, y):
+        """Returns whether points are inside the arena (and outside obstacles)
+        """
+        return self.distance(x, y) < 0
+
+
+    def bounce(self, x, y, direction, stats=None):
+        """Reflects directions of objects outside the arena which move away from it
+
+        Directions are mirrored about the boundary, as in Track.bounce_square
+        for walls of a rectangle. Objects already returning are not changed,
+        so they are not caught outside.
+
+        Parameters
+        ---------
+          x, y : arrays of float
+            positions of objects
+          direction : array of float
+            directions of movement (radians), modified in place
+          stats : motbox.stats.GenerationStats, optional
+            counts bounced objects ("wall_bounces")
+
+        Returns
+        ---------
+          direction
+        """
+        values = self.lookup(x, y)
+        (vx, vy) = (np.sin(direction), np.cos(direction))
+        norm = np.hypot(values[..., 1], values[..., 2])
+        norm[norm == 0] = 1.
+        (nx, ny) = (values[..., 1] / norm, values[..., 2] / norm)
+        dot = vx * nx + vy * ny
+        bounced = (values[..., 0] > 0) & (dot > 0)
+        vx = vx[bounced] - 2 * dot[bounced] * nx[bounced]
+        vy = vy[bounced] - 2 * dot[bounced] * ny[bounced]
+        direction[bounced] = np.mod(np.arctan2(vx, vy), 2 * np.pi)
+        if stats is not None:
+            stats.count("wall_bounces", np.count_nonzero(bounced))
+        return direction
+
+
+    def sample(self, n, random, xlim=None, ylim=None):
+        """Returns touple (x, y) of n uniformly random points inside the arena
+
+        Points are drawn in xlim x ylim (default bounding box) and points
+        outside are redrawn.
+        """
+        (box_x, box_y) = self.bounds()
+        xlim = box_x if xlim is None else xlim
+        ylim = box_y if ylim is None else ylim
+        x = random.uniform(low=xlim[0], high=xlim[1], size=(n, ))
+        y = random.uniform(low=ylim[0], high=ylim[1], size=(n, ))
+        outside = ~self.contains(x, y)
+        for _ in range(SAMPLING_ROUNDS):
+            if not np.any(outside):
+                return (x, y)
+            count = np.count_nonzero(outside)
+            x[outside] = random.uniform(low=xlim[0], high=xlim[1], size=(count, ))
+            y[outside] = random.uniform(low=ylim[0], high=ylim[1], size=(count, ))
+            outside[outside] = ~self.contains(x[outside], y[outside])
+        raise ValueError("Could not place {} points inside the arena".format(n))
+
+
+    def area(self):
+        """Returns area inside the arena, estimated from the grid
+        """
+        self.prepare()
+        return np.count_nonzero(self._grid[..., 0] < 0) * self._cell ** 2
+
+
+    def describe(self):
+        """Returns name and parameters as JSON serializable dictionary
+        """
+        description = {"name": self.name}
+        description.update(self._parameters())
+        description["obstacles"] = [obstacle.describe() for obstacle in self.obstacles]
+        description["resolution"] = self.resolution
+        return description
+
+
+class Rectangle(Arena):
+    """Rectangle xlim x ylim (the same arena as opts xlim and ylim)
+    """
+    name = "rectangle"
+
+    def __init__(self, xlim, ylim, obstacles=(), resolution=RESOLUTION):
+        Arena.__init__(self, obstacles, resolution)
+        self.xlim = tuple(xlim)
+        self.ylim = tuple(ylim)
+
+    def _distance(self, x, y):
+        qx = np.abs(x - (self.xlim[0] + self.xlim[1]) / 2) - (self.xlim[1] - self.xlim[0]) / 2
+        qy = np.abs(y - (self.ylim[0] + self.ylim[1]) / 2) - (self.ylim[1] - self.ylim[0]) / 2
+        return (np.hypot(np.maximum(qx, 0), np.maximum(qy, 0))
+                + np.minimum(np.maximum(qx, qy), 0))
+
+    def bounds(self):
+        return (self.xlim, self.ylim)
+
+    def _parameters(self):
+        return {"xlim": list(self.xlim), "ylim": list(self.ylim)}
+
+
+class Circle(Arena):
+    """Circle with given radius and center
+    """
+    name = "circle"
+
+    def __init__(self, radius, center=(0, 0), obstacles=(), resolution=RESOLUTION):
+        Arena.__init__(self, obstacles, resolution)
+        self.radius = radius
+        self.center = tuple(center)
+
+    def _distance(self, x, y):
+        return np.hypot(x - self.center[0], y - self.center[1]) - self.radius
+
+    def bounds(self):
+        return ((self.center[0] - self.radius, self.center[0] + self.radius),
+                (self.center[1] - self.radius, self.center[1] + self.radius))
+
+    def _parameters(self):
+        return {"radius": self.radius, "center": list(self.center)}
+
+
+class Polygon(Arena):
+    """Simple polygon (convex or not) given by vertices in order
+    """
+    name = "polygon"
+
+    def __init__(self, vertices, obstacles=(), resolution=RESOLUTION):
+        Arena.__init__(self, obstacles, resolution)
+        self.vertices = np.array(vertices, dtype=float)
+
+    def _distance(self, x, y):
+        distance = np.full(np.shape(x), np.inf)
+        inside = np.zeros(np.shape(x), dtype=bool)
+        for (start, end) in zip(self.vertices, np.roll(self.vertices, -1, axis=0)):
+            edge = end - start
+            # nearest point of the edge
+            t = np.clip(((x - start[0]) * edge[0] + (y - start[1]) * edge[1]) / edge.dot(edge), 0, 1)
+            distance = np.minimum(distance, np.hypot(x - start[0] - t * edge[0],
+                                                     y - start[1] - t * edge[1]))
+            # even-odd rule, ray to the right
+            crosses = (start[1] > y) != (end[1] > y)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                inside ^= crosses & (x < start[0] + (y - start[1]) * edge[0] / edge[1])
+        return np.where(inside, -distance, distance)
+
+    def bounds(self):
+        (low, high) = (self.vertices.min(axis=0), self.vertices.max(axis=0))
+        return ((low[0], high[0]), (low[1], high[1]))
+
+    def _parameters(self):
+        return {"vertices": self.vertices.tolist()}
+
+
+ARENAS = {arena.name: arena for arena in (Rectangle, Circle, Polygon)}
+
+
+def from_description(description):
+    """Returns arena described by Arena.describe() (e.g. Track.meta["arena"])
+    """
+    parameters = dict(description)
+    arena = ARENAS[parameters.pop("name")]
+    parameters["obstacles"] = [from_description(item) for item in parameters.get("obstacles", [])]
+    return arena(**parameters)
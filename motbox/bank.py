@@ -0,0 +1,255 @@
+"""Banks of many tracks stored in one file
+
+A bank is an uncompressed numpy .npz archive (format version 1):
+
+- format - name of the format ("motbox-bank") and version
+- time - numpy 1D-array, timelines of all trials one after another
+- x - numpy 1D-array, x coordinates of all trials one after another
+- y - numpy 1D-array, y coordinates of all trials one after another
+- index - numpy 2D-array (dim1 = trials), columns are time offset,
+  number of frames, coordinate offset and number of objects
+- meta - JSON encoded list of per-trial metadata (object count,
+  duration, generation parameters)
+
+Data are memory-mapped, so opening a bank reads only the index and
+metadata and trial k is read without touching the other trials.
+"""
+
+import tempfile
+import zipfile
+import numpy as np
+
+from . import storage
+from .batch import TrackStack
+from .track import Track
+
+FORMAT_NAME = "motbox-bank"
+
+INDEX_COLUMNS = ("time_offset", "n_frames", "offset", "n_objects")
+
+
+class BankWriter(object):
+    """Writes tracks into bank file one by one
+
+    Coordinates are collected in temporary files and the bank is assembled
+    on close, so the tracks do not need to be kept in memory.
+
+    Examples
+    -------
+    with BankWriter("bank.npz") as writer:
+        for track in tracks:
+            writer.append(track)
+    """
+
+    def __init__(self, filename, dtype=None):
+        """Constructor
+
+        Parameters
+        ---------
+          filename : str
+            bank file to create
+          dtype : numpy dtype, optional
+            dtype of stored coordinates (default is dtype of the first track)
+        """
+        self.filename = filename
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.index = []
+        self.meta = []
+        self._parts = {name: tempfile.TemporaryFile() for name in ("time", "x", "y")}
+        self._sizes = {"time": 0, "x": 0}
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+
+    def append(self, track):
+        """Adds track to the bank and returns its trial number
+        """
+        if self.dtype is None:
+            self.dtype = np.asarray(track.x).dtype
+        time = np.ascontiguousarray(track.time, dtype=float)
+        x = np.ascontiguousarray(track.x, dtype=self.dtype)
+        y = np.ascontiguousarray(track.y, dtype=self.dtype)
+        self._parts["time"].write(time.tobytes())
+        self._parts["x"].write(x.tobytes())
+        self._parts["y"].write(y.tobytes())
+        self.index.append((self._sizes["time"], len(time), self._sizes["x"], track.n_objects))
+        self.meta.append({"n_objects": int(track.n_objects), "n_frames": len(time),
+                          "duration": float(time[-1] - time[0]) if len(time) > 0 else 0.,
+                          "params": getattr(track, "meta", {})})
+        self._sizes["time"] += len(time)
+        self._sizes["x"] += x.size
+        return len(self.index) - 1
+
+
+    def close(self):
+        """Writes the bank file
+        """
+        dtype = float if self.dtype is None else self.dtype
+        with zipfile.ZipFile(self.filename, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            storage.write_member(archive, "format",
+                                 np.array([FORMAT_NAME, str(storage.FORMAT_VERSION)]))
+            index = np.array(self.index, dtype=np.int64).reshape((-1, len(INDEX_COLUMNS)))
+            storage.write_member(archive, "index", index)
+            storage.write_member(archive, "meta", storage.encode_meta(self.meta))
+            storage.write_member_from_file(archive, "time", float, (self._sizes["time"], ),
+                                           self._parts["time"])
+            storage.write_member_from_file(archive, "x", dtype, (self._sizes["x"], ), self._parts["x"])
+            storage.write_member_from_file(archive, "y", dtype, (self._sizes["x"], ), self._parts["y"])
+        self._discard()
+
+
+    def _discard(self):
+        for part in self._parts.values():
+            part.close()
+
+
+def save_bank(filename, tracks, dtype=None):
+    """Saves tracks into one bank file
+
+    Parameters
+    ---------
+      filename : str
+        bank file to create
+      tracks : iterable of motbox.Track
+        tracks can differ in length and number of objects
+      dtype : numpy dtype, optional
+        dtype of stored coordinates, e.g. np.float32
+    """
+    with BankWriter(filename, dtype) as writer:
+        for track in tracks:
+            writer.append(track)
+
+
+class TrackBank(object):
+    """Many tracks stored in one file with random access to each trial
+
+    - index - numpy 2D-array (dim1 = trials), see INDEX_COLUMNS
+    - meta - list of per-trial metadata dictionaries
+    - n_trials - number of trials
+    """
+
+    def __init__(self):
+        """The constructor creates an empty object with data set to None
+        """
+        self.filename = None
+        self.index = None
+        self.meta = []
+        self.n_trials = 0
+        self._time = None
+        self._x = None
+        self._y = None
+
+
+    def load(self, filename, mmap_mode="c"):
+        """Opens bank file
+
+        Only index and metadata are read, trial data are memory-mapped
+        and read when a trial is accessed.
+
+        Parameters
+        ---------
+          filename : str
+            bank file created by save_bank or BankWriter
+          mmap_mode : str or None
+            "c" (default) maps data copy-on-write, "r" read-only,
+            None reads the whole bank into memory
+        """
+        with zipfile.ZipFile(filename) as archive:
+            storage.check_format(archive, FORMAT_NAME)
+            self.index = storage.map_member(filename, archive, "index", None)
+            with archive.open("meta.npy") as member:
+                self.meta = storage.decode_meta(np.lib.format.read_array(member))
+            self._time = storage.map_member(filename, archive, "time", mmap_mode)
+            self._x = storage.map_member(filename, archive, "x", mmap_mode)
+            self._y = storage.map_member(filename, archive, "y", mmap_mode)
+        self.filename = filename
+        self.n_trials = len(self.index)
+        return self
+
+
+    def __len__(self):
+        return self.n_trials
+
+
+    def __getitem__(self, trial):
+        """Returns trial as a Track
+
+        Track's arrays are views into the memory-mapped bank.
+        """
+        if trial < 0:
+            trial += self.n_trials
+        if not 0 <= trial < self.n_trials:
+            raise IndexError("Trial {} is out of range of {} trials".format(trial, self.n_trials))
+        (time_offset, n_frames, offset, n_objects) = (int(value) for value in self.index[trial])
+        size = n_frames * n_objects
+        track = Track()
+        track.time = self._time[time_offset:time_offset + n_frames]
+        track.x = self._x[offset:offset + size].reshape((n_frames, n_objects))
+        track.y = self._y[offset:offset + size].reshape((n_frames, n_objects))
+        track.n_objects = n_objects
+        track.meta = dict(self.meta[trial]["params"])
+        return track
+
+
+    def stack(self, start=0, stop=None):
+        """Returns consecutive trials as a TrackStack
+
+        Trials need the same timeline and number of objects. Coordinates
+        are stored one trial after another, so the stack is a view into
+        the memory-mapped bank and nothing is copied.
+
+        Parameters
+        ---------
+          start, stop : int
+            range of trials (default is the whole bank)
+
+        Returns
+        ---------
+          motbox.TrackStack
+        """
+        stop = self.n_trials if stop is None else min(stop, self.n_trials)
+        if not 0 <= start < stop:
+            raise IndexError("Empty range of trials {} - {}".format(start, stop))
+        (time_offset, n_frames, offset, n_objects) = (int(value) for value in self.index[start])
+        index = self.index[start:stop]
+        if np.any(index[:, 1] != n_frames) or np.any(index[:, 3] != n_objects):
+            raise ValueError("All trials need the same number of frames and objects")
+        n_trials = stop - start
+        times = self._time[time_offset:time_offset + n_trials * n_frames].reshape((n_trials, n_frames))
+        if not np.all(times == times[0]):
+            raise ValueError("All trials need the same timeline")
+        size = n_trials * n_frames * n_objects
+        stack = TrackStack()
+        stack.time = np.array(times[0])
+        stack.x = self._x[offset:offset + size].reshape((n_trials, n_frames, n_objects))
+        stack.y = self._y[offset:offset + size].reshape((n_trials, n_frames, n_objects))
+        stack.n_trials = n_trials
+        stack.n_objects = n_objects
+        return stack
+
+
+    def __iter__(self):
+        """Yields trials as Track objects
+        """
+        for trial in range(self.n_trials):
+            yield self[trial]
+
+
+    def summary(self):
+        """Returns text summary
+        """
+        if self.index is None:
+            return "TrackBank: NOT initialized"
+        if self.n_trials == 0:
+            return "TrackBank: 0 trials"
+        return "TrackBank: {} trials, {} - {} objects".format(
+            self.n_trials, np.amin(self.index[:, 3]), np.amax(self.index[:, 3]))
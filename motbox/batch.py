@@ -0,0 +1,279 @@
+"""Batched trajectory generation for Multiple Object Tracking
+
+TrackStack holds many trials which share one timeline and the same number
+of objects. All trials are advanced together, frame by frame, using
+vectorized operations over (trials, objects) instead of one Python loop
+per trial.
+
+"""
+
+import numpy as np
+
+from . import collisions
+from . import events
+from .track import Track, resample
+
+
+def stack_positions(positions):
+    """Stacks starting positions of several trials
+
+    Parameters
+    ---------
+      positions : sequence of motbox.Position
+        one Position per trial, all with the same number of objects
+
+    Returns
+    ---------
+      touple (x, y) of 2D-arrays (dim1 = trials, dim2 = objects)
+    """
+    positions = list(positions)
+    if len(positions) == 0:
+        raise ValueError("At least one starting position is needed")
+    n_objects = positions[0].n_objects
+    if any(position.n_objects != n_objects for position in positions):
+        raise ValueError("All starting positions need the same number of objects")
+    x = np.array([position.x for position in positions], dtype=float)
+    y = np.array([position.y for position in positions], dtype=float)
+    return (x.reshape((len(positions), n_objects)), y.reshape((len(positions), n_objects)))
+
+
+class TrackStack(object):
+    """Stack of tracks sharing one timeline
+
+    - x - numpy 3D-array (dim1 = trials, dim2 = time, dim3 = objects)
+    - y - numpy 3D-array (dim1 = trials, dim2 = time, dim3 = objects)
+    - time - numpy 1D-array
+    """
+
+    def __init__(self):
+        """The constructor creates an empty object with data set to None
+        """
+        self.x = None
+        self.y = None
+        self.time = None
+        self.n_trials = 0
+        self.n_objects = 0
+
+
+    def __len__(self):
+        return self.n_trials
+
+
+    def __getitem__(self, index):
+        """Returns single trial as a Track
+
+        The returned Track shares its x and y arrays with the stack.
+        """
+        track = Track()
+        track.time = self.time
+        track.x = self.x[index]
+        track.y = self.y[index]
+        track.n_objects = self.n_objects
+        return track
+
+
+    def __iter__(self):
+        for index in range(self.n_trials):
+            yield self[index]
+
+
+    def split(self, copy=True):
+        """Splits the stack into list of ordinary Track objects
+
+        Parameters
+        ---------
+          copy : bool
+            if True (default), each Track gets its own copy of the data,
+            otherwise the tracks are views into the stack
+
+        Returns
+        ---------
+          list of motbox.Track
+        """
+        tracks = []
+        for track in self:
+            if copy:
+                track.time = track.time.copy()
+                track.x = track.x.copy()
+                track.y = track.y.copy()
+            tracks.append(track)
+        return tracks
+
+
+    def from_tracks(self, tracks):
+        """Initializes the stack from Track objects
+
+        All tracks need to have the same timeline and number of objects.
+        """
+        tracks = list(tracks)
+        if len(tracks) == 0:
+            raise ValueError("At least one track is needed")
+        time = tracks[0].time
+        n_objects = tracks[0].n_objects
+        for track in tracks[1:]:
+            if track.n_objects != n_objects or not np.array_equal(track.time, time):
+                raise ValueError("All tracks need the same timeline and number of objects")
+        self.time = np.array(time, dtype=float)
+        self.x = np.stack([track.x for track in tracks])
+        self.y = np.stack([track.y for track in tracks])
+        self.n_trials = len(tracks)
+        self.n_objects = n_objects
+        return self
+
+
+    def timestep(self):
+        """Estimates size of time steps in timeline
+        """
+        return np.mean(np.diff(self.time))
+
+
+    def time_interpolate(self, newtime, method="linear"):
+        """Interpolates all trials according to new timeline
+
+        See Also
+        ---------
+        Track.time_interpolate
+        """
+        (self.x, self.y) = resample(self.time, newtime, [self.x, self.y], method, axis=1)
+        self.time = newtime
+
+
+    def summary(self):
+        """Returns text summary
+        """
+        if (not self.x is None) and (not self.y is None) and (not self.time is None):
+            report = "TrackStack: {} trials, {} objects, time {} - {}".format(
+                self.n_trials, self.n_objects, np.amin(self.time), np.amax(self.time))
+        else:
+            report = "TrackStack: NOT initialized"
+        return report
+
+
+    def bounce_square(self, x, y, direction, arena_opts):
+        """Checks for boundary bouncing in all trials and returns corrected directions
+
+        Same rules as Track.bounce_square, x, y and direction are
+        2D-arrays (dim1 = trials, dim2 = objects).
+        """
+        xlim = arena_opts["xlim"]
+        ylim = arena_opts["ylim"]
+        too_horizontal = np.logical_or(x > xlim[1], x < xlim[0])
+        too_vertical = np.logical_or(y < ylim[0], y > ylim[1])
+        corner = np.logical_and(too_horizontal, too_vertical)
+        side = np.logical_xor(too_horizontal, too_vertical)
+        side_horizontal = np.logical_and(side, too_horizontal)
+        side_vertical = np.logical_and(side, too_vertical)
+        direction[corner] = np.mod(direction[corner] + np.pi, 2 * np.pi)
+        direction[side_horizontal] = 2 * np.pi - direction[side_horizontal]
+        direction[side_vertical] = np.mod(np.pi - direction[side_vertical], 2 * np.pi)
+        return direction
+
+
+    def bounce_arena(self, x, y, direction, arena):
+        """Checks for bouncing from boundary and obstacles of arena in all trials
+
+        See motbox.arenas.Arena.bounce.
+        """
+        return arena.bounce(x, y, direction)
+
+
+    def bounce_objects(self, x, y, direction, opts):
+        """Checks for minimum inter-object spacing in all trials
+
+        Same rules as Track.bounce_objects: two colliding objects swap their
+        directions, larger groups reverse them. Collision groups of all
+        trials are found in one pass, see motbox.collisions.
+        """
+        method = opts.get("collisions", "auto")
+        return collisions.bounce_groups(x, y, direction, opts["spacing"], method)
+
+
+    def generate_trajectory(self, positions, speed, opts, time=None, direction=None, jitter_func=None,
+                            rng=None):
+        """Generates trajectories for all trials at once
+
+        Parameters
+        ---------
+        positions : sequence of motbox.Position
+            starting points, one Position per trial. All trials need the same number of objects.
+        speed : float or tuple
+            same as in Track.generate_trajectory, shared by all trials
+        opts : dictionary
+            xlim, ylim (or arena), spacing and optionally collisions, see Track.generate_trajectory
+        time : array of float
+            common timeline of all trials, e.g. np.arange(0, 5, 0.1)
+        direction : array of float, optional
+            starting directions in radians, broadcastable to (trials, objects).
+            (default is None, generates randomly).
+        jitter_func : function to add jitter
+            called once per frame, returns values broadcastable to (trials, objects)
+        rng : numpy.random.Generator, optional
+            source of random starting directions (default is the global numpy.random)
+
+        Returns
+        ---------
+        Returns self with generated tracks
+
+        See Also
+        ---------
+        Track.generate_trajectory
+        """
+        (x, y) = stack_positions(positions)
+        (n_trials, n_objects) = x.shape
+        if type(speed) is tuple and len(speed) != n_objects:
+            raise Exception("Length of speed is not the same as number of objects")
+
+        arena = opts.get("arena")
+        if arena is not None and opts.get("collisions") == "events":
+            raise ValueError("Exact collisions (events) are available only in rectangular arenas")
+
+        self.n_trials = n_trials
+        self.n_objects = n_objects
+        if not time is None:
+            self.time = time
+        if direction is None:
+            random = np.random if rng is None else rng
+            direction = random.uniform(low=0., high=2*np.pi, size=(n_trials, n_objects))
+        else:
+            direction = np.array(np.broadcast_to(direction, (n_trials, n_objects)), dtype=float)
+
+        n_frames = len(self.time)
+        self.x = np.zeros((n_trials, n_frames, n_objects))
+        self.y = np.zeros((n_trials, n_frames, n_objects))
+        self.x[:, 0, :] = x
+        self.y[:, 0, :] = y
+        step = np.asarray(speed) * self.timestep()
+        for frame in range(1, n_frames):
+            if opts.get("collisions") == "events":
+                # collision events are resolved trial by trial
+                for trial in range(n_trials):
+                    (x[trial], y[trial], direction[trial]) = events.advance(
+                        x[trial], y[trial], direction[trial], step, opts)
+            else:
+                if arena is None:
+                    direction = self.bounce_square(x, y, direction, opts)
+                else:
+                    direction = self.bounce_arena(x, y, direction, arena)
+                direction = self.bounce_objects(x, y, direction, opts)
+                x = x + np.sin(direction) * step
+                y = y + np.cos(direction) * step
+            self.x[:, frame, :] = x
+            self.y[:, frame, :] = y
+            if jitter_func is not None:
+                direction += jitter_func()
+        return self
+
+
+    def generate_vonmises(self, positions, speed, kappa, opts, time=None, direction=None, rng=None):
+        """Generates trajectories for all trials with von Mises sampling
+
+        See Also
+        ---------
+        Track.generate_vonmises
+        """
+        positions = list(positions)
+        size = (len(positions), positions[0].n_objects)
+        random = np.random if rng is None else rng
+        def jitter_func():
+            return random.vonmises(mu=0, kappa=kappa, size=size)
+        return self.generate_trajectory(positions, speed, opts, time, direction, jitter_func, rng)
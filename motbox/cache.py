@@ -0,0 +1,226 @@
+"""Cache of generated trajectories
+
+Generated tracks are stored on disk under a key computed from everything
+which determines them: kind of generation, its parameters (starting
+positions, speed, kappa, opts, timeline, ...), state of the random
+generator before generation, motbox version and ALGORITHM. The same
+request returns the stored track instead of simulating it again and sets
+the random generator to its state after generation, so following draws
+are the same as without the cache.
+
+Entries are binary track files (see motbox.storage) named by the key. The
+cache keeps at most max_size bytes, the least recently used entries are
+removed first. Entries of other versions never match and are removed as
+they age.
+
+Examples
+-------
+cache = TrajectoryCache("trajectories", max_size=2 ** 30)
+track = Track().generate_vonmises(position, 5., 8, opts, time, rng=rng, cache=cache)
+print(cache.summary())
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+import numpy as np
+
+from . import __version__
+from . import storage
+from .models import rng_state, set_rng_state
+from .track import Track
+
+# version of generating algorithms, increase when the same parameters and
+# random state give different tracks or different meta
+# 2 - meta["model"], meta["seed"] and meta["arena"]
+ALGORITHM = 2
+
+DEFAULT_DIRECTORY = os.path.join("~", ".cache", "motbox")
+
+
+def _update(hasher, value):
+    """Feeds value into hash, containers are traversed, arrays hashed by content
+    """
+    if isinstance(value, dict):
+        hasher.update(b"{")
+        for key in sorted(value, key=str):
+            _update(hasher, str(key))
+            _update(hasher, value[key])
+        hasher.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"[")
+        for item in value:
+            _update(hasher, item)
+        hasher.update(b"]")
+    elif hasattr(value, "describe"):
+        # arenas and motion models
+        _update(hasher, value.describe())
+    elif isinstance(value, (np.ndarray, np.generic)):
+        array = np.ascontiguousarray(value)
+        hasher.update("array {} {}".format(array.dtype.str, array.shape).encode())
+        hasher.update(array.tobytes())
+    else:
+        hasher.update("{} {!r};".format(type(value).__name__, value).encode())
+
+
+class TrajectoryCache(object):
+    """Least recently used on-disk cache of generated tracks
+
+    - directory - folder with cached tracks
+    - max_size - maximum total size of entries in bytes
+    - hits, misses, evictions - counters since the cache object was created
+    """
+
+    def __init__(self, directory=None, max_size=2 ** 30):
+        """Constructor
+
+        Parameters
+        ---------
+          directory : str, optional
+            folder for the entries, created when missing (default ~/.cache/motbox)
+          max_size : int
+            maximum total size of entries in bytes (default 1 GiB)
+        """
+        self.directory = os.path.expanduser(DEFAULT_DIRECTORY if directory is None else directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+
+    def key(self, kind, params, rng=None):
+        """Returns key (hex digest) of generation with params from current state of rng
+        """
+        hasher = hashlib.sha256()
+        _update(hasher, {"motbox": __version__, "algorithm": ALGORITHM, "kind": kind,
+                         "params": params, "rng": rng_state(rng)})
+        return hasher.hexdigest()
+
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+
+    def get(self, key):
+        """Returns touple (track, random state after generation) or None when not cached
+        """
+        path = self._path(key)
+        try:
+            (time, x, y, meta) = storage.load_track(path, mmap_mode=None)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # missing, evicted meanwhile or damaged entry
+            self.misses += 1
+            return None
+        self.hits += 1
+        track = Track()
+        (track.time, track.x, track.y) = (time, x, y)
+        track.n_objects = x.shape[1]
+        track.meta = meta["track"]
+        return (track.compact(), meta["rng"])
+
+
+    def put(self, key, track, state):
+        """Stores track with random state after its generation, evicts old entries
+        """
+        (handle, temporary) = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        os.close(handle)
+        try:
+            storage.save_track(temporary, track.time, track.x, track.y,
+                               {"track": track.meta, "rng": state, "motbox": __version__,
+                                "algorithm": ALGORITHM})
+            # atomic, other processes never see a partial entry
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.evict()
+
+
+    def _entries(self):
+        """Returns list of (last use, size, path) of entries
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits into max_size
+        """
+        entries = sorted(self._entries())
+        total = sum(size for (_, size, _) in entries)
+        for (_, size, path) in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+
+    def fetch(self, kind, params, rng, generate, stats=None):
+        """Returns cached track or generates and stores it
+
+        Parameters
+        ---------
+          kind : str
+            name of the generating function
+          params : dictionary
+            everything the track depends on except the random state
+            (numbers, strings, arrays, lists and dictionaries of them)
+          rng : numpy.random.Generator or None
+            random generator used by generate (None for global numpy.random)
+          generate : function
+            called without arguments when the track is not cached, returns Track
+          stats : motbox.stats.GenerationStats, optional
+            counts "cache_hits" and "cache_misses"
+
+        Returns
+        ---------
+          motbox.Track
+        """
+        key = self.key(kind, params, rng)
+        entry = self.get(key)
+        if stats is not None:
+            stats.count("cache_hits" if entry is not None else "cache_misses")
+        if entry is not None:
+            (track, state) = entry
+            set_rng_state(rng, state)
+            return track
+        track = generate()
+        self.put(key, track, rng_state(rng))
+        return track
+
+
+    def size(self):
+        """Returns total size of entries in bytes
+        """
+        return sum(size for (_, size, _) in self._entries())
+
+
+    def clear(self):
+        """Removes all entries
+        """
+        for (_, _, path) in self._entries():
+            os.remove(path)
+
+
+    def summary(self):
+        """Returns text summary of counters and size
+        """
+        requests = self.hits + self.misses
+        return "TrajectoryCache {}: {} entries, {:.1f} MiB, hits {} ({:.1f} %), misses {}, evictions {}".format(
+            self.directory, len(self._entries()), self.size() / 2 ** 20, self.hits,
+            100. * self.hits / requests if requests > 0 else 0., self.misses, self.evictions)
@@ -0,0 +1,164 @@
+"""Finding groups of colliding objects
+
+Pairs of objects closer than spacing are searched either densely, from all
+pairwise distances, or with a uniform grid with cell size equal to spacing,
+which only compares objects in neighbouring cells. Both searches find the
+same pairs, the dense one is faster for a handful of objects, the grid one
+scales linearly with number of objects.
+
+Coordinates can have leading dimensions (e.g. trials x objects), each row of
+objects is then handled as a separate arena.
+"""
+
+import numpy as np
+
+# above this number of objects per arena "auto" switches to the grid search
+DENSE_LIMIT = 96
+
+# half of the 3x3 neighbourhood, each pair of neighbouring cells is visited once
+_GRID_OFFSETS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def _dense_pairs(x, y, spacing):
+    n_objects = x.shape[1]
+    dx = x[:, :, None] - x[:, None, :]
+    dy = y[:, :, None] - y[:, None, :]
+    close = np.triu(np.sqrt(dx * dx + dy * dy) < spacing, 1)
+    (arena, first, second) = np.nonzero(close)
+    return (arena * n_objects + first, arena * n_objects + second)
+
+
+def _grid_pairs(x, y, spacing):
+    (n_arenas, n_objects) = x.shape
+    if spacing <= 0:
+        # no distance is smaller, cells would be infinite
+        return (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+    cell_x = np.floor(x / spacing).astype(np.int64)
+    cell_y = np.floor(y / spacing).astype(np.int64)
+    # one empty cell of padding on each side keeps neighbours inside the arena's key range
+    cell_x -= cell_x.min() - 1
+    cell_y -= cell_y.min() - 1
+    n_cells_x = cell_x.max() + 2
+    n_cells_y = cell_y.max() + 2
+    arena = np.arange(n_arenas).reshape((n_arenas, 1))
+    key = ((arena * n_cells_x + cell_x) * n_cells_y + cell_y).reshape(-1)
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    flat_x = x.reshape(-1)
+    flat_y = y.reshape(-1)
+    nodes = np.arange(len(key))
+
+    firsts = []
+    seconds = []
+    for (offset_x, offset_y) in _GRID_OFFSETS:
+        target = key + offset_x * n_cells_y + offset_y
+        start = np.searchsorted(sorted_key, target, side="left")
+        count = np.searchsorted(sorted_key, target, side="right") - start
+        total = np.sum(count)
+        if total == 0:
+            continue
+        first = np.repeat(nodes, count)
+        within = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        second = order[np.repeat(start, count) + within]
+        if offset_x == 0 and offset_y == 0:
+            keep = first < second
+            first = first[keep]
+            second = second[keep]
+        firsts.append(first)
+        seconds.append(second)
+    if len(firsts) == 0:
+        return (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+    first = np.concatenate(firsts)
+    second = np.concatenate(seconds)
+    dx = flat_x[first] - flat_x[second]
+    dy = flat_y[first] - flat_y[second]
+    close = np.sqrt(dx * dx + dy * dy) < spacing
+    (first, second) = (first[close], second[close])
+    return (np.minimum(first, second), np.maximum(first, second))
+
+
+def _connect(first, second, n_nodes):
+    from scipy import sparse
+    from scipy.sparse import csgraph
+    edges = sparse.coo_matrix(
+        (np.ones(len(first), dtype=bool), (first, second)), shape=(n_nodes, n_nodes))
+    return csgraph.connected_components(edges, directed=False)
+
+
+def close_pairs(x, y, spacing, method="auto"):
+    """Finds pairs of objects closer than spacing
+
+    Parameters
+    ---------
+      x : array of float
+        x coordinates, 1D (objects) or 2D (arenas x objects)
+      y : array of float
+        y coordinates, same shape as x
+      spacing : float
+        minimum allowed distance between objects
+      method : str
+        "dense" (all pairwise distances), "grid" (uniform grid with cell
+        size spacing) or "auto" (dense up to DENSE_LIMIT objects)
+
+    Returns
+    ---------
+      touple (first, second) of index arrays into the flattened coordinates,
+      each pair is listed once with first < second
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_objects = x.shape[-1]
+    x = x.reshape((-1, n_objects))
+    y = y.reshape((-1, n_objects))
+    if method == "auto":
+        method = "dense" if n_objects <= DENSE_LIMIT else "grid"
+    if method == "dense":
+        return _dense_pairs(x, y, spacing)
+    if method == "grid":
+        return _grid_pairs(x, y, spacing)
+    raise ValueError("Unknown collision method: {}".format(method))
+
+
+def collision_groups(x, y, spacing, method="auto"):
+    """Labels groups of objects which are (transitively) closer than spacing
+
+    Returns
+    ---------
+      touple (n_groups, grouping) as scipy.sparse.csgraph.connected_components,
+      grouping labels the flattened coordinates
+    """
+    (first, second) = close_pairs(x, y, spacing, method)
+    return _connect(first, second, np.size(x))
+
+
+def bounce_groups(x, y, direction, spacing, method="auto", stats=None):
+    """Changes directions of colliding objects
+
+    Two colliding objects swap their directions, larger groups reverse
+    their directions. Direction is modified in place when possible.
+    Optional motbox.stats.GenerationStats counts close pairs
+    ("collision_pairs"), colliding pairs ("collision_groups") and larger
+    groups ("crowd_groups").
+
+    Returns
+    ---------
+      array of corrected directions, same shape as direction
+    """
+    (first, second) = close_pairs(x, y, spacing, method)
+    if stats is not None:
+        stats.count("collision_pairs", len(first))
+    if len(first) == 0:
+        return direction
+    _, grouping = _connect(first, second, np.size(x))
+    group_size = np.bincount(grouping)[grouping]
+    flat = direction.reshape(-1)
+    pairs = np.nonzero(group_size == 2)[0]
+    if stats is not None:
+        stats.count("collision_groups", len(pairs) // 2)
+        stats.count("crowd_groups", len(np.unique(grouping[group_size > 2])))
+    if len(pairs) > 0:
+        pairs = pairs[np.argsort(grouping[pairs], kind="stable")].reshape((-1, 2))
+        flat[pairs] = flat[pairs[:, ::-1]]
+    crowd = group_size > 2
+    flat[crowd] = np.mod(flat[crowd] + np.pi, 2 * np.pi)
+    return flat.reshape(np.shape(direction))
@@ -1,6 +1,11 @@
+import json
 import os
 import click
+import numpy as np
+from motbox import storage
+from motbox.stats import GenerationStats
 from motbox.generator import generate_straight_trajectory as gst
+from motbox.generator import generate_straight_trajectory_bank as gstb
 
 @click.command()
 @click.argument('path', type=click.Path(exists=True, dir_okay=True, file_okay=False))
@@ -13,8 +18,89 @@ from motbox.generator import generate_straight_trajectory as gst
 @click.option('-t', '--time', default=5, type=float)
 @click.option('--plot', default=False, type=bool)
 @click.option('--video', default=False, type=bool)
-def generate_straight_trajectory(path, filename, n, speed, time, frequency, xlim, ylim, plot, video):
+@click.option('--trials', default=1, type=int, help='Number of trials, more than 1 generates a bank.')
+@click.option('-j', '--jobs', default=1, type=int, help='Number of worker processes, 0 uses all processors.')
+@click.option('--seed', default=None, type=int, help='Seed of the generated trials.')
+@click.option('--format', 'file_format', default='bank', type=click.Choice(['bank', 'csv', 'npz']),
+              help='Output of multiple trials: one bank file or a file per trial.')
+@click.option('--stats', is_flag=True, default=False,
+              help='Print time of generation phases and counts of collisions, save them to FILENAME_stats.json.')
+@click.option('--float32', is_flag=True, default=False,
+              help='Store coordinates of multiple trials in single precision (half the size).')
+def generate_straight_trajectory(path, filename, n, speed, time, frequency, xlim, ylim, plot, video,
+                                 trials, jobs, seed, file_format, stats, float32):
     filepath = os.path.join(path, filename)
-    click.echo(f'Saving to {filepath}.csv')
-    gst(n=n, speed=speed, time=time, frequency=frequency,
-        xlim=xlim, ylim=ylim, save=True, path=path, filename=filename, plot=plot, video=video)
+    stats = GenerationStats() if stats else None
+    if trials == 1:
+        click.echo(f'Saving to {filepath}.csv')
+        gst(n=n, speed=speed, time=time, frequency=frequency,
+            xlim=xlim, ylim=ylim, save=True, path=path, filename=filename, plot=plot, video=video,
+            rng=None if seed is None else np.random.default_rng(seed), stats=stats)
+        save_stats(stats, filepath)
+        return
+    if plot or video:
+        click.echo('Plots and videos are not created for multiple trials.')
+    click.echo(f'Generating {trials} trials into {filepath}' + ('.npz' if file_format == 'bank' else '_*'))
+    with click.progressbar(length=trials, label='Trials') as bar:
+        def progress(finished):
+            bar.update(finished - bar.pos)
+        gstb(trials, n=n, speed=speed, time=time, frequency=frequency, xlim=xlim, ylim=ylim,
+             seed=seed, jobs=jobs if jobs > 0 else None, path=path, filename=filename,
+             file_format=file_format, progress=progress, stats=stats,
+             dtype=np.float32 if float32 else None)
+    save_stats(stats, filepath)
+
+
+def save_stats(stats, filepath):
+    """Prints generation statistics and saves them as JSON
+    """
+    if stats is None:
+        return
+    click.echo(stats.summary())
+    with open(f'{filepath}_stats.json', 'w') as handle:
+        json.dump(stats.as_dict(), handle, indent=1)
+    click.echo(f'Statistics saved to {filepath}_stats.json')
+
+
+def track_files(paths):
+    """Expands directories into track files (.csv and .npz) they contain
+
+    Binary files of other formats than a track (e.g. banks) in directories
+    are skipped.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                filename = os.path.join(path, name)
+                if os.path.splitext(name)[1] not in ('.csv', '.npz'):
+                    continue
+                if storage.is_binary(filename) and storage.file_format(filename) != storage.FORMAT_NAME:
+                    click.echo(f'Skipping {filename}, it is not a track file')
+                    continue
+                files.append(filename)
+        else:
+            files.append(path)
+    return files
+
+
+@click.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('-o', '--output', default=None, type=click.Path(file_okay=False),
+              help='Directory for the videos, default is next to the track files.')
+@click.option('-x', '--xlim', default=(-10, 10), type=(float, float))
+@click.option('-y', '--ylim', default=(-10, 10), type=(float, float))
+@click.option('-r', '--radius', default=0.5, type=float, help='Radius of the discs.')
+@click.option('--preset', default='ultrafast', type=str, help='x264 encoder preset.')
+@click.option('-j', '--jobs', default=0, type=int, help='Number of worker processes, 0 uses all processors.')
+def render_trajectory_videos(paths, output, xlim, ylim, radius, preset, jobs):
+    from motbox.visualisations import render_videos
+    files = track_files(paths)
+    if output is not None:
+        os.makedirs(output, exist_ok=True)
+    click.echo(f'Rendering {len(files)} videos')
+    with click.progressbar(length=len(files), label='Videos') as bar:
+        def progress(finished):
+            bar.update(finished - bar.pos)
+        render_videos(files, output_dir=output, xlim=xlim, ylim=ylim, radius=radius, preset=preset,
+                      jobs=jobs if jobs > 0 else None, progress=progress)
@@ -0,0 +1,265 @@
+"""Trials meeting constraints with early rejection
+
+Constraints are evaluated frame by frame while a candidate trial is
+generated (see motbox.stream.TrajectoryStream). As soon as a constraint
+cannot be satisfied anymore, the candidate is abandoned and a new one
+is started, so rejected candidates cost only the frames simulated until
+the violation.
+
+Each constraint has three methods:
+
+- start(n_objects, n_frames, timestep, opts) - resets the state for a new candidate
+- update(frame, x, y) - checks positions of the next frame, returns False
+  when the constraint cannot be satisfied anymore
+- satisfied() - final decision after the last frame
+
+Examples
+-------
+constraints = [MinDistance([0, 1], 2.), MinEncounters([0, 1], 3., 2), WallContact([0, 1], 0.5)]
+report = ConstraintReport()
+track = generate_constrained(8, 5., 8, opts, time, constraints, rng=rng, report=report)
+print(report.summary())
+"""
+
+import numpy as np
+
+from .stream import TrajectoryStream
+from .track import Track, Position
+
+
+def _distractors(targets, n_objects):
+    return np.setdiff1d(np.arange(n_objects), targets)
+
+
+def _target_distances(targets, distractors, x, y):
+    """Distances between targets (rows) and distractors (columns)
+    """
+    dx = x[targets][:, None] - x[distractors][None, :]
+    dy = y[targets][:, None] - y[distractors][None, :]
+    return np.sqrt(dx * dx + dy * dy)
+
+
+class MinDistance(object):
+    """Targets never come closer than distance to any distractor
+    """
+    name = "min_distance"
+
+    def __init__(self, targets, distance):
+        self.targets = np.asarray(targets)
+        self.distance = distance
+
+    def start(self, n_objects, n_frames, timestep, opts):
+        self.distractors = _distractors(self.targets, n_objects)
+        return self
+
+    def update(self, frame, x, y):
+        distances = _target_distances(self.targets, self.distractors, x, y)
+        return bool(np.all(distances >= self.distance))
+
+    def satisfied(self):
+        return True
+
+
+class MinEncounters(object):
+    """At least count close encounters of targets with distractors
+
+    An encounter starts when a target-distractor pair comes closer than
+    distance. The candidate is abandoned when remaining frames cannot
+    bring enough new encounters, each pair needs at least two frames
+    (leave and return) for a new one.
+    """
+    name = "min_encounters"
+
+    def __init__(self, targets, distance, count):
+        self.targets = np.asarray(targets)
+        self.distance = distance
+        self.count = count
+
+    def start(self, n_objects, n_frames, timestep, opts):
+        self.distractors = _distractors(self.targets, n_objects)
+        self.n_frames = n_frames
+        self.encounters = 0
+        self.close = None
+        return self
+
+    def update(self, frame, x, y):
+        close = _target_distances(self.targets, self.distractors, x, y) < self.distance
+        if self.close is None:
+            self.encounters += np.count_nonzero(close)
+        else:
+            self.encounters += np.count_nonzero(close & ~self.close)
+        self.close = close
+        remaining = self.n_frames - frame - 1
+        # close pairs have to leave first, the others can return in the next frame
+        possible = (np.count_nonzero(close) * (remaining // 2)
+                    + np.count_nonzero(~close) * ((remaining + 1) // 2))
+        return self.encounters + possible >= self.count
+
+    def satisfied(self):
+        return self.encounters >= self.count
+
+
+class WallContact(object):
+    """No target stays near the wall longer than max_duration (seconds)
+
+    Target is near the wall when its centre is closer than margin to the
+    arena limits or to the boundary of opts["arena"] (default is half of
+    spacing).
+    """
+    name = "wall_contact"
+
+    def __init__(self, targets, max_duration, margin=None):
+        self.targets = np.asarray(targets)
+        self.max_duration = max_duration
+        self.margin = margin
+
+    def start(self, n_objects, n_frames, timestep, opts):
+        margin = opts["spacing"] / 2. if self.margin is None else self.margin
+        self.arena = opts.get("arena")
+        self.wall_margin = margin
+        if self.arena is None:
+            self.xlim = (opts["xlim"][0] + margin, opts["xlim"][1] - margin)
+            self.ylim = (opts["ylim"][0] + margin, opts["ylim"][1] - margin)
+        # number of consecutive frames allowed near the wall
+        self.max_frames = int(np.floor(self.max_duration / timestep + 1e-9)) + 1
+        self.frames = np.zeros(len(self.targets), dtype=int)
+        return self
+
+    def update(self, frame, x, y):
+        (tx, ty) = (x[self.targets], y[self.targets])
+        if self.arena is None:
+            near = (tx < self.xlim[0]) | (tx > self.xlim[1]) | (ty < self.ylim[0]) | (ty > self.ylim[1])
+        else:
+            near = self.arena.distance(tx, ty) > -self.wall_margin
+        self.frames = np.where(near, self.frames + 1, 0)
+        return bool(np.all(self.frames <= self.max_frames))
+
+    def satisfied(self):
+        return True
+
+
+class ConstraintReport(object):
+    """Counts of generated, accepted and rejected candidates
+
+    - candidates - number of started candidates
+    - accepted - number of accepted candidates
+    - rejected - dictionary constraint name -> number of rejections
+    - frames - number of simulated frames
+    - wasted_frames - frames simulated for rejected candidates
+    """
+
+    def __init__(self):
+        self.candidates = 0
+        self.accepted = 0
+        self.rejected = {}
+        self.frames = 0
+        self.wasted_frames = 0
+
+    def reject(self, name, frames):
+        self.rejected[name] = self.rejected.get(name, 0) + 1
+        self.wasted_frames += frames
+
+    def acceptance_rate(self):
+        return self.accepted / self.candidates if self.candidates > 0 else 0.
+
+    def summary(self):
+        """Returns text summary
+        """
+        lines = ["candidates {}, accepted {} ({:.1f} %), simulated frames {}, wasted {}".format(
+            self.candidates, self.accepted, 100 * self.acceptance_rate(), self.frames,
+            self.wasted_frames)]
+        for name in sorted(self.rejected):
+            lines.append("  rejected by {}: {}".format(name, self.rejected[name]))
+        return "\n".join(lines)
+
+
+def evaluate(track, constraints, opts):
+    """Checks finished track, returns name of the first violated constraint or None
+    """
+    n_frames = len(track.time)
+    timestep = track.timestep()
+    for constraint in constraints:
+        constraint.start(track.n_objects, n_frames, timestep, opts)
+    for frame in range(n_frames):
+        for constraint in constraints:
+            if not constraint.update(frame, track.x[frame], track.y[frame]):
+                return constraint.name
+    for constraint in constraints:
+        if not constraint.satisfied():
+            return constraint.name
+    return None
+
+
+def generate_constrained(n, speed, kappa, opts, time, constraints, rng=None, max_candidates=1000,
+                         report=None):
+    """Generates von Mises trial meeting all constraints
+
+    Candidates start at random positions (Position.random_positions with
+    spacing) and are checked during generation, see module description.
+
+    Parameters
+    ---------
+      n : int
+        number of objects
+      speed, kappa, opts :
+        as in Track.generate_vonmises
+      time : array of float
+        timeline of the trial, regular
+      constraints : list
+        constraints (MinDistance, MinEncounters, WallContact or own objects
+        with start, update and satisfied methods)
+      rng : numpy.random.Generator, optional
+        source of random numbers (default is the global numpy.random)
+      max_candidates : int
+        number of candidates to try
+      report : ConstraintReport, optional
+        counts of candidates and rejections are added into it
+
+    Returns
+    ---------
+      motbox.Track with meta["candidates"] (number of candidates tried for this trial)
+
+    Raises
+    ---------
+      ValueError
+        when time is empty or no candidate of max_candidates meets the constraints
+    """
+    if len(time) == 0:
+        raise ValueError("time must contain at least one frame")
+    report = ConstraintReport() if report is None else report
+    n_frames = len(time)
+    timestep = np.mean(np.diff(time))
+    for candidate in range(max_candidates):
+        report.candidates += 1
+        position = Position().random_positions(n, opts.get("xlim"), opts.get("ylim"), opts["spacing"],
+                                               rng=rng, arena=opts.get("arena"))
+        stream = TrajectoryStream().start(position, speed, opts, timestep, kappa=kappa, rng=rng,
+                                          start=time[0])
+        for constraint in constraints:
+            constraint.start(n, n_frames, timestep, opts)
+        x = np.zeros((n_frames, n))
+        y = np.zeros((n_frames, n))
+        violated = None
+        for (frame, (_, frame_x, frame_y)) in enumerate(stream.frames(n_frames)):
+            x[frame] = frame_x
+            y[frame] = frame_y
+            for constraint in constraints:
+                if not constraint.update(frame, x[frame], y[frame]):
+                    violated = constraint.name
+                    break
+            if violated is not None:
+                break
+        report.frames += frame + 1
+        if violated is None:
+            violated = next((constraint.name for constraint in constraints
+                             if not constraint.satisfied()), None)
+        if violated is not None:
+            report.reject(violated, frame + 1)
+            continue
+        report.accepted += 1
+        track = Track()
+        (track.time, track.x, track.y, track.n_objects) = (time, x, y, n)
+        track.meta = stream.meta()
+        track.meta["candidates"] = candidate + 1
+        return track
+    raise ValueError("No candidate of {} meets the constraints".format(max_candidates))
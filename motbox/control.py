@@ -3,7 +3,9 @@
 In future we may add other experiment frameworks, e.g., OpenSesame
 """
 import copy
+import time
 import numpy as np
+from .track import resample
 
 class Puppeteer(object):
     """
@@ -15,17 +17,104 @@ class Puppeteer(object):
         """
         self.objects = []
         self.track = None
+        self._position_buffers = None
+        self.refresh_rate = None
+        self.frames = None
+        self.frame_times = None
+        self._frame_positions = None
 
 
     def update_positions_psychopy(self, timevalue):
         """Updates the controlled objects' positions to coordinates based on
         given time point
         """
-        (newx, newy) = self.track.position_for_time(timevalue)
         n_track_objects = self.track.n_objects
+        if self._position_buffers is None or self._position_buffers[0].shape[1] != n_track_objects:
+            self._position_buffers = (np.zeros((1, n_track_objects)), np.zeros((1, n_track_objects)))
+        (newx, newy) = self.track.position_for_time(timevalue, out=self._position_buffers)
         n_screen_objects = len(self.objects)
         for index in range(min(n_track_objects, n_screen_objects)):
-            self.objects[index].pos = (float(newx[:, index]), float(newy[:, index]))
+            self.objects[index].pos = (float(newx[0, index]), float(newy[0, index]))
+
+
+    def prepare_frames(self, refresh_rate, duration=None, start=None):
+        """Precomputes positions of all display frames before the trial
+
+        Positions are interpolated at frame times start + k / refresh_rate
+        and stored in a contiguous frames array (dim1 = frames,
+        dim2 = objects, dim3 = x and y), so that update_frame_psychopy
+        only looks them up.
+
+        Parameters
+        ---------
+          refresh_rate : float
+            monitor refresh rate in Hz
+          duration : float, optional
+            trial duration in seconds (default is the length of the track)
+          start : float, optional
+            track time of the first frame (default is the start of the track)
+        """
+        if start is None:
+            start = self.track.time[0]
+        if duration is None:
+            duration = self.track.time[-1] - start
+        n_frames = int(np.floor(duration * refresh_rate + 1e-9)) + 1
+        planned = start + np.arange(n_frames) / refresh_rate
+        (newx, newy) = resample(self.track.time, planned, [self.track.x, self.track.y])
+        self.frames = np.empty((n_frames, self.track.n_objects, 2))
+        self.frames[:, :, 0] = newx
+        self.frames[:, :, 1] = newy
+        self.refresh_rate = refresh_rate
+        self.frame_times = np.full(n_frames, np.nan)
+        # plain Python floats, so that the per-frame update allocates nothing
+        self._frame_positions = self.frames.tolist()
+        return self.frames
+
+
+    def update_frame_psychopy(self, frame, timestamp=None):
+        """Updates the controlled objects' positions to precomputed frame
+
+        Parameters
+        ---------
+          frame : int
+            index of the frame since the start of the trial (e.g. frameN in
+            PsychoPy Builder). Frames after the end hold the last position.
+          timestamp : float, optional
+            time of the frame (e.g. returned by win.flip()), measured
+            with time.perf_counter when not given
+        """
+        last = len(self._frame_positions) - 1
+        for (psychopy_object, position) in zip(self.objects, self._frame_positions[min(frame, last)]):
+            psychopy_object.pos = position
+        if frame <= last:
+            self.frame_times[frame] = time.perf_counter() if timestamp is None else timestamp
+
+
+    def frame_report(self, tolerance=0.5):
+        """Reports timing of the frames shown by update_frame_psychopy
+
+        Parameters
+        ---------
+          tolerance : float
+            interval longer than (1 + tolerance) frame periods counts as
+            dropped frames
+
+        Returns
+        ---------
+          dictionary with recorded frames, dropped frames, frames after
+          which frames were dropped and mean and maximum frame interval (s)
+        """
+        shown = np.nonzero(~np.isnan(self.frame_times))[0]
+        period = 1. / self.refresh_rate
+        intervals = np.diff(self.frame_times[shown])
+        late = np.nonzero(intervals > (1 + tolerance) * period)[0]
+        dropped = np.rint(intervals[late] / period).astype(int) - 1
+        return {"n_frames": len(self.frame_times),
+                "n_recorded": len(shown),
+                "n_dropped": int(np.sum(np.maximum(dropped, 1))),
+                "dropped_after": shown[late].tolist(),
+                "mean_interval": float(np.mean(intervals)) if len(intervals) > 0 else np.nan,
+                "max_interval": float(np.max(intervals)) if len(intervals) > 0 else np.nan}
 
 
     def clone_template_psychopy(self, psychopyobject, ntimes):
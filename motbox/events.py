@@ -0,0 +1,140 @@
+"""Event-driven (continuous time) collisions
+
+Instead of checking walls and spacing at sampled frames, objects are moved
+along straight lines between collision events. Times of wall and pair
+collisions are predicted exactly and processed in time order from a
+priority queue, so objects never cross the walls or come closer than
+spacing, whatever the timestep is.
+
+- wall collision - object centre reaches xlim or ylim, the velocity
+  component perpendicular to the wall is reversed
+- pair collision - centres of two objects are spacing apart, velocity of
+  each object is mirrored about the line of contact (tangent), so both
+  objects keep their speed and move apart
+
+Events are invalidated with per-object collision counters: an event
+predicted before one of its objects collided again is skipped.
+"""
+
+import heapq
+import numpy as np
+
+# safety limit of processed events per object and step
+MAX_EVENTS = 1000
+
+_PAIR = 0
+_WALL_X = 1
+_WALL_Y = 2
+
+
+def _wall_times(position, velocity, low, high):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        times = np.where(velocity > 0, (high - position) / velocity,
+                         np.where(velocity < 0, (low - position) / velocity, np.inf))
+    return np.maximum(times, 0.)
+
+
+def _pair_times(x, y, vx, vy, index, spacing):
+    """Times when objects index touch each of the objects (inf when never)
+
+    With scalar index returns 1D-array, with index of shape (n, 1) returns
+    2D-array of times of all pairs.
+    """
+    px = x - x[index]
+    py = y - y[index]
+    wx = vx - vx[index]
+    wy = vy - vy[index]
+    approach = px * wx + py * wy
+    speed2 = wx * wx + wy * wy
+    gap = px * px + py * py - spacing * spacing
+    discriminant = approach * approach - speed2 * gap
+    with np.errstate(divide="ignore", invalid="ignore"):
+        times = np.where(gap < 0, 0., (-approach - np.sqrt(discriminant)) / speed2)
+    times[(approach >= 0) | (discriminant < 0) | (speed2 == 0)] = np.inf
+    return times
+
+
+def advance(x, y, direction, step, opts, stats=None):
+    """Moves objects by one step with exact wall and pair collisions
+
+    Parameters
+    ---------
+      x, y : array of float
+        current positions of objects (1D)
+      direction : array of float
+        directions of movement in radians
+      step : float or array of float
+        distance moved by each object in the step
+      opts : dictionary
+        xlim, ylim and spacing as in Track.generate_trajectory
+      stats : motbox.stats.GenerationStats, optional
+        counts processed wall and pair collisions ("wall_bounces", "collision_events")
+
+    Returns
+    ---------
+      touple (x, y, direction) of new arrays after the step
+    """
+    x = np.array(x, dtype=float)
+    y = np.array(y, dtype=float)
+    step = np.broadcast_to(np.asarray(step, dtype=float), x.shape)
+    vx = np.sin(direction) * step
+    vy = np.cos(direction) * step
+    (xlim, ylim, spacing) = (opts["xlim"], opts["ylim"], opts["spacing"])
+    n_objects = len(x)
+    counts = np.zeros(n_objects, dtype=int)
+    queue = []
+
+    def predict(index):
+        for (kind, times) in ((_WALL_X, _wall_times(x[index], vx[index], *xlim)),
+                              (_WALL_Y, _wall_times(y[index], vy[index], *ylim))):
+            if now + times <= 1.:
+                heapq.heappush(queue, (now + times, kind, index, index, counts[index], 0))
+        times = now + _pair_times(x, y, vx, vy, index, spacing)
+        times[index] = np.inf
+        for other in np.nonzero(times <= 1.)[0]:
+            heapq.heappush(queue, (times[other], _PAIR, index, other, counts[index], counts[other]))
+
+    # initial predictions of all objects at once
+    now = 0.
+    for (kind, times) in ((_WALL_X, _wall_times(x, vx, *xlim)), (_WALL_Y, _wall_times(y, vy, *ylim))):
+        for index in np.nonzero(times <= 1.)[0]:
+            queue.append((times[index], kind, index, index, 0, 0))
+    times = _pair_times(x, y, vx, vy, np.arange(n_objects)[:, None], spacing)
+    (firsts, seconds) = np.nonzero(np.triu(times <= 1., 1))
+    queue.extend((times[first, second], _PAIR, first, second, 0, 0)
+                 for (first, second) in zip(firsts, seconds))
+    heapq.heapify(queue)
+    processed = 0
+    while queue:
+        (time, kind, first, second, count_first, count_second) = heapq.heappop(queue)
+        if counts[first] != count_first or (kind == _PAIR and counts[second] != count_second):
+            continue
+        processed += 1
+        if processed > MAX_EVENTS * n_objects:
+            raise RuntimeError("Too many collision events in one step")
+        x += vx * (time - now)
+        y += vy * (time - now)
+        now = time
+        if stats is not None:
+            stats.count("collision_events" if kind == _PAIR else "wall_bounces")
+        if kind == _WALL_X:
+            vx[first] = -vx[first]
+        elif kind == _WALL_Y:
+            vy[first] = -vy[first]
+        else:
+            normal = np.array((x[second] - x[first], y[second] - y[first]))
+            normal /= np.hypot(*normal)
+            for index in (first, second):
+                normal_speed = vx[index] * normal[0] + vy[index] * normal[1]
+                vx[index] -= 2 * normal_speed * normal[0]
+                vy[index] -= 2 * normal_speed * normal[1]
+        for index in {first, second}:
+            counts[index] += 1
+        for index in {first, second}:
+            predict(index)
+    x += vx * (1. - now)
+    y += vy * (1. - now)
+    moving = step > 0
+    direction = np.array(direction, dtype=float)
+    direction[moving] = np.mod(np.arctan2(vx[moving], vy[moving]), 2 * np.pi)
+    return (x, y, direction)
@@ -1,11 +1,14 @@
+import contextlib
 import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
 import numpy as np
 from motbox import Track, Position
-import motbox.visualisations as vis
+from motbox.bank import BankWriter
+from motbox.stats import GenerationStats
 
 
 def generate_straight_trajectory(n=1, speed=1, time=5, frequency=10, xlim=(-10, 10), ylim=(-10, 10), spacing=1,
-    save=True, path='.', filename='track', plot=False, video=False):
+    save=True, path='.', filename='track', plot=False, video=False, rng=None, stats=None, cache=None):
     """Generates straight trajectory at random starting points.
     returns the trajectory as a csv, and then saves a plot and video if wanted
 
@@ -34,6 +37,12 @@ def generate_straight_trajectory(n=1, speed=1, time=5, frequency=10, xlim=(-10,
         if the plot of the trajectory should be created. filename is used to determine name of the plot
     video : bool (False)
         if the video of the trajectory should be created. filename is used to create name of the video
+    rng : numpy.random.Generator (None)
+        source of random numbers, global numpy.random is used if not given
+    stats : motbox.stats.GenerationStats (None)
+        collects times and counters of starting positions and track generation (see motbox.stats)
+    cache : motbox.cache.TrajectoryCache (None)
+        returns stored track when the same parameters and random state were generated before
 
     Return
     --------
@@ -44,16 +53,155 @@ def generate_straight_trajectory(n=1, speed=1, time=5, frequency=10, xlim=(-10,
     This function is basically just a wrapper around motbox.Track.generate_tracjectory
     """
     filepath = os.path.join(path, filename)
-    ## generate random start
-    position = Position()
-    position.random_positions(n, xlim, ylim, 1)
-
-    ## generate path
-    track = Track()
-    track.generate_trajectory(position, speed, {"xlim": xlim, "ylim": ylim, "spacing": spacing},
-        time=np.arange(0, time, 1/frequency))
+
+    def generate():
+        ## generate random start
+        position = Position()
+        position.random_positions(n, xlim, ylim, 1, rng=rng, stats=stats)
+
+        ## generate path
+        return Track().generate_trajectory(position, speed, {"xlim": xlim, "ylim": ylim, "spacing": spacing},
+            time=np.arange(0, time, 1/frequency), rng=rng, stats=stats)
+
+    if cache is None:
+        track = generate()
+    else:
+        params = {"n": n, "speed": speed, "time": time, "frequency": frequency, "xlim": xlim,
+                  "ylim": ylim, "spacing": spacing}
+        track = cache.fetch("straight_trajectory", params, rng, generate, stats)
+        track.stats = stats
     if save: track.save_to_csv(f'{filepath}.csv')
-    if plot: vis.plot(track.x, track.y, f"{filepath}.png", xlim, ylim)
-    if video: vis.trajectory_video(track, f"{filepath}.mp4", xlim, ylim)
+    if plot:
+        import motbox.visualisations as vis
+        vis.plot(track.x, track.y, f"{filepath}.png", xlim, ylim)
+    if video:
+        import motbox.visualisations as vis
+        vis.trajectory_video(track, f"{filepath}.mp4", xlim, ylim)
 
     return track
+
+
+def _straight_trials(trials, seeds, params, collect_stats=False, dtype=None, cache=None):
+    """Generates given trials of a bank, runs in worker processes
+    """
+    tracks = []
+    for (trial, seed) in zip(trials, seeds):
+        track = generate_straight_trajectory(save=False, rng=np.random.default_rng(seed),
+                                             stats=GenerationStats() if collect_stats else None,
+                                             cache=cache, **params)
+        if dtype is not None:
+            track.compact(dtype)
+        track.meta["trial"] = trial
+        track.meta["seed"] = {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+        tracks.append(track)
+    return tracks
+
+
+def generate_straight_trajectory_bank(n_trials, n=1, speed=1, time=5, frequency=10, xlim=(-10, 10),
+    ylim=(-10, 10), spacing=1, seed=None, jobs=1, path='.', filename='track', file_format='bank',
+    progress=None, stats=None, dtype=None, cache=None):
+    """Generates many trials of straight trajectories in parallel.
+
+    Every trial gets its own random stream spawned from seed (numpy
+    SeedSequence.spawn), so the trials are the same for any number of jobs.
+    Finished trials are written to disk as they arrive.
+
+    Parameters
+    ----------
+    n_trials : int
+        number of trials to generate
+    n, speed, time, frequency, xlim, ylim, spacing :
+        same as in generate_straight_trajectory
+    seed : int (None)
+        seed of the whole bank, random if not given. Stored in tracks' meta.
+    jobs : int (1)
+        number of worker processes, None or less than 1 uses all processors
+    path : str ('.')
+        directory to save into
+    filename : str ('track')
+        name of the bank file, or prefix of the trial files
+    file_format : str ('bank')
+        "bank" (one TrackBank file filename.npz), "csv" or "npz" (one file
+        per trial, filename_00001.csv ...) or None (keep in memory only)
+    progress : function (None)
+        called with number of finished trials after each batch
+    stats : motbox.stats.GenerationStats (None)
+        statistics of all trials are merged into it
+    dtype : numpy dtype (None)
+        dtype of coordinates, e.g. np.float32 halves the size of the bank
+        and of tracks kept in memory (trials are generated in float64)
+    cache : motbox.cache.TrajectoryCache (None)
+        trials generated before with the same parameters and seed are taken
+        from the cache, hits and misses are counted in stats. With more than
+        one job every worker process uses its own copy of the cache, the
+        entries on disk are shared, but counters and evictions of the
+        passed object do not change (use stats to count hits).
+
+    Return
+    --------
+    list of saved file paths, or list of tracks if file_format is None
+    """
+    params = {"n": n, "speed": speed, "time": time, "frequency": frequency,
+              "xlim": xlim, "ylim": ylim, "spacing": spacing}
+    seeds = np.random.SeedSequence(seed).spawn(n_trials)
+    n_workers = jobs if jobs is not None and jobs > 0 else os.cpu_count()
+    batch_size = max(1, min(64, n_trials // (4 * n_workers)))
+    batches = [list(range(start, min(start + batch_size, n_trials)))
+               for start in range(0, n_trials, batch_size)]
+
+    writer = None
+    results = []
+    if file_format == 'bank':
+        results = [os.path.join(path, f'{filename}.npz')]
+        writer = BankWriter(results[0], dtype=dtype)
+    elif file_format is not None and file_format not in ('csv', 'npz'):
+        raise ValueError(f'Unknown file format {file_format}')
+    # trials are written in order, finished trials wait here for their predecessors
+    waiting = {}
+    next_trial = 0
+    timeline = None
+
+    def store(tracks):
+        nonlocal next_trial, timeline
+        for track in tracks:
+            waiting[track.meta['trial']] = track
+            if stats is not None:
+                stats.merge(track.stats)
+        while next_trial in waiting:
+            track = waiting.pop(next_trial)
+            if file_format is None:
+                # trials kept in memory share one time array
+                if timeline is not None and np.array_equal(track.time, timeline):
+                    track.time = timeline
+                timeline = track.time
+                results.append(track)
+            elif writer is not None:
+                writer.append(track)
+            else:
+                trial_path = os.path.join(path, f'{filename}_{next_trial + 1:05d}.{file_format}')
+                track.save_to_csv(trial_path)
+                results.append(trial_path)
+            next_trial += 1
+        if progress is not None:
+            progress(next_trial + len(waiting))
+
+    with writer if writer is not None else contextlib.nullcontext():
+        if n_workers == 1:
+            for batch in batches:
+                store(_straight_trials(batch, [seeds[trial] for trial in batch], params,
+                                       stats is not None, dtype, cache))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                # at most two batches per worker are in flight, stored results are dropped,
+                # so memory does not grow with n_trials
+                pending = set()
+                for batch in batches:
+                    if len(pending) >= 2 * n_workers:
+                        (done, pending) = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            store(future.result())
+                    pending.add(executor.submit(_straight_trials, batch, [seeds[trial] for trial in batch],
+                                                params, stats is not None, dtype, cache))
+                for future in as_completed(pending):
+                    store(future.result())
+    return results
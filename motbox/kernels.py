@@ -0,0 +1,171 @@
+"""Compiled simulation kernel (optional, requires numba)
+
+The whole frame loop of Track.generate_trajectory (wall bounces, collision
+groups, moving and jitter) runs in one compiled function, so the
+interpreter is not involved between frames. Steps and turns of the motion
+model (see motbox.models) are sampled before, jitter is drawn before the
+loop in the same order as in the NumPy path, and the kernel applies
+the same rules with the same floating point operations, so the generated
+tracks are identical to the NumPy ones (as long as numpy and numba use the
+same sin and cos of the C library, as on common platforms).
+
+Collision groups are found with union-find over all pairs closer than
+spacing, which gives the same groups as motbox.collisions.
+
+The backend is chosen with opts["backend"] in Track.generate_trajectory:
+"numpy" (default), "numba" (falls back to NumPy with a warning when numba
+is not installed) or "auto" (numba when installed). Arenas given by
+opts["arena"] (see motbox.arenas) always use NumPy.
+
+numba is imported and the kernel compiled on first use, importing this
+module only checks that numba is installed.
+"""
+
+import importlib.util
+import warnings
+import numpy as np
+
+AVAILABLE = importlib.util.find_spec("numba") is not None
+
+BACKENDS = ("numpy", "numba", "auto")
+
+
+def use_kernel(opts):
+    """Decides whether the compiled kernel generates the track for given opts
+    """
+    backend = opts.get("backend", "numpy")
+    if backend not in BACKENDS:
+        raise ValueError("Unknown backend: {}".format(backend))
+    if backend == "numpy" or opts.get("collisions") == "events":
+        return False
+    if opts.get("arena") is not None:
+        if backend == "numba":
+            warnings.warn("numba backend supports only rectangular arenas, using numpy backend")
+        return False
+    if not AVAILABLE:
+        if backend == "numba":
+            warnings.warn("numba is not installed, using numpy backend")
+        return False
+    return True
+
+
+def _frames(x, y, direction, steps, turns, jitter, xlim, ylim, spacing):
+    """Fills frames 1.. of x and y from starting positions in frame 0
+    """
+    (n_frames, n_objects) = x.shape
+    position_x = x[0].copy()
+    position_y = y[0].copy()
+    parent = np.empty(n_objects, dtype=np.int64)
+    size = np.empty(n_objects, dtype=np.int64)
+    partner = np.empty(n_objects, dtype=np.int64)
+    for frame in range(1, n_frames):
+        # walls, see Track.bounce_square
+        for index in range(n_objects):
+            horizontal = position_x[index] > xlim[1] or position_x[index] < xlim[0]
+            vertical = position_y[index] < ylim[0] or position_y[index] > ylim[1]
+            if horizontal and vertical:
+                direction[index] = (direction[index] + np.pi) % (2 * np.pi)
+            elif horizontal:
+                direction[index] = 2 * np.pi - direction[index]
+            elif vertical:
+                direction[index] = (np.pi - direction[index]) % (2 * np.pi)
+        # collision groups, see motbox.collisions.bounce_groups
+        for index in range(n_objects):
+            parent[index] = index
+        colliding = False
+        for first in range(n_objects):
+            for second in range(first + 1, n_objects):
+                dx = position_x[first] - position_x[second]
+                dy = position_y[first] - position_y[second]
+                if np.sqrt(dx * dx + dy * dy) < spacing:
+                    colliding = True
+                    root_first = first
+                    while parent[root_first] != root_first:
+                        root_first = parent[root_first]
+                    root_second = second
+                    while parent[root_second] != root_second:
+                        root_second = parent[root_second]
+                    if root_first != root_second:
+                        parent[max(root_first, root_second)] = min(root_first, root_second)
+        if colliding:
+            size[:] = 0
+            partner[:] = -1
+            for index in range(n_objects):
+                root = index
+                while parent[root] != root:
+                    root = parent[root]
+                parent[index] = root
+                size[root] += 1
+            for index in range(n_objects):
+                root = parent[index]
+                if size[root] == 2:
+                    if partner[root] < 0:
+                        partner[root] = index
+                    else:
+                        other = partner[root]
+                        (direction[index], direction[other]) = (direction[other], direction[index])
+                elif size[root] > 2:
+                    direction[index] = (direction[index] + np.pi) % (2 * np.pi)
+        # move and store
+        for index in range(n_objects):
+            position_x[index] = position_x[index] + np.sin(direction[index]) * steps[frame - 1, index]
+            position_y[index] = position_y[index] + np.cos(direction[index]) * steps[frame - 1, index]
+            x[frame, index] = position_x[index]
+            y[frame, index] = position_y[index]
+        for index in range(turns.shape[1]):
+            direction[index] += turns[frame - 1, index]
+        for index in range(jitter.shape[1]):
+            direction[index] += jitter[frame - 1, index]
+
+
+_compiled = None
+
+
+def _kernel():
+    """Returns compiled _frames, numba is imported on the first call
+    """
+    global _compiled
+    if _compiled is None:
+        import numba
+        _compiled = numba.njit(cache=True)(_frames)
+    return _compiled
+
+
+def generate_frames(x, y, direction, step, jitter_func, opts, turns=None):
+    """Runs the compiled kernel
+
+    Parameters
+    ---------
+      x, y : 2D-arrays (dim1 = time, dim2 = objects)
+        coordinates with starting positions in the first frame, filled in place
+      direction : array of float
+        starting directions (not modified)
+      step : float or array of float
+        distance moved each frame, for all objects, per object or
+        (frames - 1) x objects
+      jitter_func : function or None
+        called once per frame (before the loop) for direction changes
+      opts : dictionary
+        xlim, ylim and spacing
+      turns : 2D-array (dim1 = frames - 1, dim2 = objects), optional
+        direction changes of the motion model, added before jitter
+
+    Returns
+    ---------
+      array of directions after the last frame
+    """
+    (n_frames, n_objects) = x.shape
+    if jitter_func is None:
+        jitter = np.zeros((n_frames - 1, 0))
+    else:
+        jitter = np.zeros((n_frames - 1, n_objects))
+        for frame in range(n_frames - 1):
+            jitter[frame] = jitter_func()
+    if turns is None:
+        turns = np.zeros((n_frames - 1, 0))
+    direction = np.array(direction, dtype=float)
+    steps = np.array(np.broadcast_to(step, (n_frames - 1, n_objects)), dtype=float)
+    _kernel()(x, y, direction, steps, np.asarray(turns, dtype=float), jitter,
+              np.asarray(opts["xlim"], dtype=float), np.asarray(opts["ylim"], dtype=float),
+              float(opts["spacing"]))
+    return direction
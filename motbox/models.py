@@ -0,0 +1,277 @@
+"""Motion models
+
+A motion model describes how objects change their speed and direction
+between frames. All its random numbers are drawn at once before the frame
+loop of Track.generate_trajectory, the loop only moves objects by prepared
+steps and adds prepared turns to their directions, so models cost the same
+per frame no matter how they are defined.
+
+Model's sample(steps, timestep, random) gets distances moved into each
+frame (array (frames - 1) x objects, from speed) and returns touple
+(steps, turns) of the same shape: distances moved into frame k + 1 and
+changes of direction (radians) after the move. Directions follow the
+convention of Track.generate_trajectory (0 is up, pi/2 is right), positive
+turns are clockwise.
+
+Models based on velocity vectors (Brownian, OrnsteinUhlenbeck) are turned
+into steps and relative turns. A bounce then rotates the rest of the path,
+which is still a path of the same process as the noise is isotropic.
+
+Track.generate_trajectory stores model.describe() in Track.meta["model"]
+and the seed of the random generator (see rng_seed) in Track.meta["seed"],
+from_description rebuilds the model.
+
+Examples
+-------
+model = models.Combined(models.SpeedChanges(0.5, (0.5, 1.5)), models.VonMises(8))
+track = Track().generate_trajectory(position, 5., opts, time, model=model, rng=rng)
+"""
+
+import numpy as np
+
+
+def _to_lists(value):
+    """Returns copy of nested dictionaries with arrays converted to lists
+    """
+    if isinstance(value, dict):
+        return {key: _to_lists(item) for (key, item) in value.items()}
+    return value.tolist() if isinstance(value, np.ndarray) else value
+
+
+def rng_state(rng):
+    """Returns JSON serializable state of numpy.random.Generator (or of global numpy.random for None)
+    """
+    if rng is None:
+        return _to_lists(np.random.get_state(legacy=False))
+    return _to_lists(rng.bit_generator.state)
+
+
+def rng_seed(rng):
+    """Returns seed of numpy.random.Generator as JSON serializable dictionary
+
+    The dictionary has entropy and spawn_key of the generator's SeedSequence,
+    numpy.random.default_rng(numpy.random.SeedSequence(**seed)) starts the
+    same random stream. None for the global numpy.random and generators
+    without SeedSequence.
+    """
+    seed_seq = None if rng is None else getattr(rng.bit_generator, "seed_seq", None)
+    if not isinstance(seed_seq, np.random.SeedSequence):
+        return None
+    return {"entropy": _as_value(seed_seq.entropy), "spawn_key": list(seed_seq.spawn_key)}
+
+
+def set_rng_state(rng, state):
+    """Restores state returned by rng_state
+    """
+    if rng is None:
+        state = dict(state)
+        state["state"] = {"key": np.asarray(state["state"]["key"], dtype=np.uint32),
+                          "pos": state["state"]["pos"]}
+        np.random.set_state(state)
+    else:
+        rng.bit_generator.state = state
+
+
+def _as_value(value):
+    """Returns JSON friendly parameter (lists for arrays)
+    """
+    return np.asarray(value).tolist() if np.ndim(value) > 0 else value
+
+
+def _polar(vectors, timestep):
+    """Returns touple (steps, turns) of moves by velocity vectors
+
+    vectors have shape (frames - 1) x objects x 2 (units per second), the
+    first direction is given by the track, so only changes are used.
+    """
+    steps = np.hypot(vectors[..., 0], vectors[..., 1]) * timestep
+    heading = np.arctan2(vectors[..., 0], vectors[..., 1])
+    turns = np.zeros(steps.shape)
+    turns[:-1] = np.diff(heading, axis=0)
+    return (steps, turns)
+
+
+class MotionModel(object):
+    """Straight movement with constant speed, base of other models
+    """
+    name = "straight"
+
+    def sample(self, steps, timestep, random):
+        """Returns touple (steps, turns), see the module documentation
+
+        Parameters
+        ---------
+          steps : 2D-array (dim1 = frames - 1, dim2 = objects)
+            distances moved with the speed of the track
+          timestep : float
+            time between frames
+          random : numpy.random.Generator or numpy.random
+            source of random numbers
+        """
+        return (steps, np.zeros(steps.shape))
+
+
+    def describe(self):
+        """Returns name and parameters as JSON serializable dictionary
+        """
+        return {"name": self.name}
+
+
+class VonMises(MotionModel):
+    """Direction changes from von Mises distribution each frame
+
+    - kappa - concentration, higher values give straighter paths
+    """
+    name = "vonmises"
+
+    def __init__(self, kappa):
+        self.kappa = kappa
+
+    def sample(self, steps, timestep, random):
+        return (steps, random.vonmises(mu=0, kappa=self.kappa, size=steps.shape))
+
+    def describe(self):
+        return {"name": self.name, "kappa": _as_value(self.kappa)}
+
+
+class Curvature(MotionModel):
+    """Movement along circles
+
+    - curvature - change of direction per unit of distance (radians), per
+      object or for all objects, positive values turn clockwise
+    """
+    name = "curvature"
+
+    def __init__(self, curvature):
+        self.curvature = curvature
+
+    def sample(self, steps, timestep, random):
+        return (steps, steps * np.asarray(self.curvature))
+
+    def describe(self):
+        return {"name": self.name, "curvature": _as_value(self.curvature)}
+
+
+class Brownian(MotionModel):
+    """Random walk, independent normal displacement in each frame
+
+    - sigma - standard deviation of displacement per axis and square root
+      of second, None sets it so that the mean distance moved per frame is
+      the same as with the speed of the track
+    """
+    name = "brownian"
+
+    def __init__(self, sigma=None):
+        self.sigma = sigma
+
+    def sample(self, steps, timestep, random):
+        if self.sigma is None:
+            # mean of Rayleigh distribution is scale * sqrt(pi / 2)
+            scale = steps / timestep / np.sqrt(np.pi / 2)
+        else:
+            scale = np.asarray(self.sigma) / np.sqrt(timestep)
+        vectors = random.standard_normal(steps.shape + (2, )) * np.asarray(scale)[..., None]
+        return _polar(vectors, timestep)
+
+    def describe(self):
+        return {"name": self.name, "sigma": _as_value(self.sigma)}
+
+
+class OrnsteinUhlenbeck(MotionModel):
+    """Velocity following Ornstein-Uhlenbeck process around zero
+
+    - tau - correlation time of velocity (seconds)
+    - sigma - stationary standard deviation of each velocity component
+      (units per second), None sets it so that the mean speed is the speed
+      of the track
+
+    The process is sampled exactly for any timestep, the first velocity
+    comes from the stationary distribution.
+    """
+    name = "ornstein_uhlenbeck"
+
+    def __init__(self, tau, sigma=None):
+        self.tau = tau
+        self.sigma = sigma
+
+    def sample(self, steps, timestep, random):
+        from scipy.signal import lfilter
+        if len(steps) == 0:
+            # single frame, no moves
+            return (steps, np.zeros(steps.shape))
+        if self.sigma is None:
+            sigma = steps[0] / timestep / np.sqrt(np.pi / 2)
+        else:
+            sigma = np.broadcast_to(self.sigma, steps.shape[1:])
+        decay = np.exp(-timestep / self.tau)
+        noise = random.standard_normal(steps.shape + (2, ))
+        noise[0] *= sigma[:, None]
+        noise[1:] *= (sigma * np.sqrt(1 - decay ** 2))[:, None]
+        # v[k] = decay * v[k - 1] + noise[k]
+        vectors = lfilter([1.], [1., -decay], noise, axis=0)
+        return _polar(vectors, timestep)
+
+    def describe(self):
+        return {"name": self.name, "tau": self.tau, "sigma": _as_value(self.sigma)}
+
+
+class SpeedChanges(MotionModel):
+    """Speed changing at random moments
+
+    - rate - mean number of changes per second of each object
+    - factors - touple (low, high), new speed is speed of the track times
+      uniform random factor from this range
+    """
+    name = "speed_changes"
+
+    def __init__(self, rate, factors=(0.5, 1.5)):
+        self.rate = rate
+        self.factors = tuple(factors)
+
+    def sample(self, steps, timestep, random):
+        (events, factors) = random.random((2, ) + steps.shape)
+        factors = self.factors[0] + factors * (self.factors[1] - self.factors[0])
+        # index of the last change up to each frame, -1 before the first one
+        frames = np.arange(steps.shape[0])[:, None]
+        last = np.maximum.accumulate(np.where(events < self.rate * timestep, frames, -1), axis=0)
+        current = np.take_along_axis(factors, np.maximum(last, 0), axis=0)
+        return (steps * np.where(last >= 0, current, 1.), np.zeros(steps.shape))
+
+    def describe(self):
+        return {"name": self.name, "rate": self.rate, "factors": list(self.factors)}
+
+
+class Combined(MotionModel):
+    """Several models applied in order
+
+    Steps are passed from one model to the next (e.g. SpeedChanges before
+    Curvature turns faster objects more), turns are added.
+    """
+    name = "combined"
+
+    def __init__(self, *models):
+        self.models = models
+
+    def sample(self, steps, timestep, random):
+        turns = np.zeros(steps.shape)
+        for model in self.models:
+            (steps, model_turns) = model.sample(steps, timestep, random)
+            turns += model_turns
+        return (steps, turns)
+
+    def describe(self):
+        return {"name": self.name, "models": [model.describe() for model in self.models]}
+
+
+MODELS = {model.name: model for model in
+          (MotionModel, VonMises, Curvature, Brownian, OrnsteinUhlenbeck, SpeedChanges, Combined)}
+
+
+def from_description(description):
+    """Returns model described by MotionModel.describe() (e.g. Track.meta["model"])
+    """
+    parameters = dict(description)
+    model = MODELS[parameters.pop("name")]
+    if model is Combined:
+        return Combined(*[from_description(item) for item in parameters["models"]])
+    return model(**parameters)
@@ -0,0 +1,93 @@
+"""Instrumentation of trajectory generation
+
+Generating functions accept optional stats argument. When a GenerationStats
+object is given, wall time of each phase and counters of events (wall
+bounces, collision groups, attempts to place objects, ...) are recorded into
+it, otherwise nothing is measured. One object can collect statistics of
+several calls, e.g. of Position.random_positions and Track.generate_trajectory
+of the same trial, and statistics of many trials can be merged.
+
+Examples
+-------
+stats = GenerationStats()
+position = Position().random_positions(8, xlim, ylim, 2, stats=stats)
+track = Track().generate_vonmises(position, 5., 8, opts, time, stats=stats)
+print(track.stats.summary())
+"""
+
+import time
+
+
+def ignore(phase):
+    """Replaces GenerationStats.lap when statistics are not collected
+    """
+
+
+class GenerationStats(object):
+    """Per-phase times and event counters
+
+    - times - dictionary phase -> total wall time (seconds)
+    - calls - dictionary phase -> number of timed sections
+    - counts - dictionary counter -> total value
+    """
+
+    def __init__(self):
+        """The constructor creates an empty object
+        """
+        self.times = {}
+        self.calls = {}
+        self.counts = {}
+        self._last = None
+
+
+    def start(self):
+        """Starts timing, the next lap is measured from now
+        """
+        self._last = time.perf_counter()
+        return self
+
+
+    def lap(self, phase):
+        """Adds time since start or previous lap to the phase
+        """
+        now = time.perf_counter()
+        self.times[phase] = self.times.get(phase, 0.) + now - self._last
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self._last = now
+
+
+    def count(self, name, value=1):
+        """Increases counter by value
+        """
+        self.counts[name] = self.counts.get(name, 0) + int(value)
+
+
+    def merge(self, other):
+        """Adds times and counts of other GenerationStats, returns self
+        """
+        for (phase, value) in other.times.items():
+            self.times[phase] = self.times.get(phase, 0.) + value
+            self.calls[phase] = self.calls.get(phase, 0) + other.calls[phase]
+        for (name, value) in other.counts.items():
+            self.count(name, value)
+        return self
+
+
+    def as_dict(self):
+        """Returns JSON serializable dictionary with times, calls and counts
+        """
+        return {"times": dict(self.times), "calls": dict(self.calls), "counts": dict(self.counts)}
+
+
+    def summary(self):
+        """Returns text table of phases (total time, share, time per call) and counters
+        """
+        total = sum(self.times.values())
+        lines = ["{:<20} {:>10} {:>7} {:>12}".format("phase", "time [s]", "share", "per call [us]")]
+        for phase in sorted(self.times, key=self.times.get, reverse=True):
+            lines.append("{:<20} {:>10.4f} {:>6.1f}% {:>12.2f}".format(
+                phase, self.times[phase], 100. * self.times[phase] / total if total > 0 else 0.,
+                1e6 * self.times[phase] / self.calls[phase]))
+        for name in sorted(self.counts):
+            lines.append("{:<20} {:>10d}".format(name, self.counts[name]))
+        return "\n".join(lines)
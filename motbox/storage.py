@@ -0,0 +1,264 @@
+"""Binary storage of tracks
+
+Tracks are stored in an uncompressed numpy .npz archive (format version 1):
+
+- format - name of the format ("motbox-track") and version
+- time - numpy 1D-array
+- x - numpy 2D-array (dim1 = time, dim2 = objects)
+- y - numpy 2D-array (dim1 = time, dim2 = objects)
+- meta - JSON encoded dictionary (arena limits, spacing, speed, seed, ...)
+
+Members of the archive are not compressed, so they can be memory-mapped
+directly from the file, the same way as np.load(mmap_mode="r") maps .npy
+files. Nothing is read until the data are used.
+"""
+
+import itertools
+import json
+import shutil
+import struct
+import zipfile
+import numpy as np
+
+FORMAT_NAME = "motbox-track"
+FORMAT_VERSION = 1
+
+# files starting with these bytes are zip archives (npz)
+ZIP_MAGIC = b"PK\x03\x04"
+
+# delimiters recognized in text files, in order of preference
+DELIMITERS = ("\t", ",", ";")
+
+# number of text rows parsed at once
+CHUNK_ROWS = 4096
+
+
+def is_binary(filename):
+    """Checks whether file is a binary (npz) file instead of text
+    """
+    with open(filename, "rb") as handle:
+        return handle.read(4) == ZIP_MAGIC
+
+
+def file_format(filename):
+    """Returns format name stored in binary file (e.g. "motbox-track" or "motbox-bank")
+
+    None for text files and archives without format.
+    """
+    if not is_binary(filename):
+        return None
+    with zipfile.ZipFile(filename) as archive:
+        if "format.npy" not in archive.namelist():
+            return None
+        with archive.open("format.npy") as member:
+            return str(np.lib.format.read_array(member)[0])
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError("Value {!r} cannot be stored in track metadata".format(value))
+
+
+def encode_meta(meta):
+    return np.array(json.dumps(meta or {}, default=_to_json, sort_keys=True))
+
+
+def decode_meta(value):
+    return json.loads(str(value[()]))
+
+
+def map_member(filename, archive, name, mmap_mode="r"):
+    """Memory-maps array stored in an uncompressed npz archive
+
+    Parameters
+    ---------
+      filename : str
+        path to the npz file
+      archive : zipfile.ZipFile
+        the same file opened as zip archive
+      name : str
+        name of the array (without .npy)
+      mmap_mode : str or None
+        "r" (read-only), "c" (copy-on-write) or None to read into memory
+
+    Returns
+    ---------
+      numpy array (np.memmap when mapped)
+    """
+    info = archive.getinfo(name + ".npy")
+    if mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+        with archive.open(info) as member:
+            return np.lib.format.read_array(member)
+    with open(filename, "rb") as handle:
+        handle.seek(info.header_offset)
+        header = handle.read(30)
+        (name_length, extra_length) = struct.unpack("<HH", header[26:30])
+        handle.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(handle)
+        if version == (1, 0):
+            (shape, fortran_order, dtype) = np.lib.format.read_array_header_1_0(handle)
+        else:
+            (shape, fortran_order, dtype) = np.lib.format.read_array_header_2_0(handle)
+        offset = handle.tell()
+    if dtype.hasobject:
+        raise ValueError("Array {} cannot be memory-mapped".format(name))
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def check_format(archive, name):
+    """Checks format name and version stored in the archive
+    """
+    if "format.npy" not in archive.namelist():
+        raise ValueError("File is not a {} file".format(name))
+    with archive.open("format.npy") as member:
+        stored = np.lib.format.read_array(member)
+    if str(stored[0]) != name:
+        raise ValueError("File is a {} file, not {}".format(stored[0], name))
+    if int(stored[1]) > FORMAT_VERSION:
+        raise ValueError("File format version {} is newer than supported {}".format(
+            stored[1], FORMAT_VERSION))
+
+
+def write_member(archive, name, array):
+    """Writes array into zip archive as uncompressed .npy member
+    """
+    with archive.open(name + ".npy", "w", force_zip64=True) as member:
+        np.lib.format.write_array(member, np.asanyarray(array), allow_pickle=False)
+
+
+def write_member_from_file(archive, name, dtype, shape, source):
+    """Writes raw data from file object into zip archive as .npy member
+
+    Allows to store arrays which were written piece by piece into a
+    temporary file without loading them into memory.
+    """
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+              "fortran_order": False, "shape": tuple(shape)}
+    source.seek(0)
+    with archive.open(name + ".npy", "w", force_zip64=True) as member:
+        np.lib.format.write_array_header_2_0(member, header)
+        shutil.copyfileobj(source, member)
+
+
+def save_track(filename, time, x, y, meta=None, dtype=None):
+    """Saves track data into binary file
+
+    Parameters
+    ---------
+      filename : str
+        file to create, any extension
+      time, x, y : arrays
+        track data
+      meta : dictionary
+        JSON serializable metadata
+      dtype : numpy dtype, optional
+        dtype of stored coordinates, e.g. np.float32 to halve the size.
+        Time is always stored as float64.
+    """
+    with open(filename, "wb") as handle:
+        np.savez(handle, format=np.array([FORMAT_NAME, str(FORMAT_VERSION)]),
+                 time=np.ascontiguousarray(time, dtype=float),
+                 x=np.ascontiguousarray(x, dtype=dtype), y=np.ascontiguousarray(y, dtype=dtype),
+                 meta=encode_meta(meta))
+
+
+def load_track(filename, mmap_mode="r"):
+    """Loads track data from binary file
+
+    Parameters
+    ---------
+      filename : str
+        npz file created by save_track
+      mmap_mode : str or None
+        "r" maps data read-only, "c" maps them copy-on-write (changes stay in
+        memory), None reads everything into memory
+
+    Returns
+    ---------
+      touple (time, x, y, meta)
+    """
+    with zipfile.ZipFile(filename) as archive:
+        check_format(archive, FORMAT_NAME)
+        time = map_member(filename, archive, "time", mmap_mode)
+        x = map_member(filename, archive, "x", mmap_mode)
+        y = map_member(filename, archive, "y", mmap_mode)
+        with archive.open("meta.npy") as member:
+            meta = decode_meta(np.lib.format.read_array(member))
+    return (time, x, y, meta)
+
+
+def detect_delimiter(line):
+    """Guesses delimiter from a line of text file
+
+    Returns one of DELIMITERS or None for whitespace.
+    """
+    for delim in DELIMITERS:
+        if delim in line:
+            return delim
+    return None
+
+
+def _data_lines(lines, delim):
+    """Yields non-empty lines without line ending and trailing delimiter
+    """
+    for line in lines:
+        line = line.rstrip()
+        if delim is not None and line.endswith(delim):
+            line = line[:-len(delim)]
+        if line:
+            yield line
+
+
+def read_csv_v0(filename, delim=None):
+    """Reads track data from text file in RepMot/RevMot format
+
+    The first column is time, followed by x and y columns of each object.
+    The file is read in blocks of CHUNK_ROWS lines, each parsed with
+    np.loadtxt, so the text is never held in memory as a whole. A trailing
+    delimiter at the end of lines is ignored. Files with missing values are
+    read with np.genfromtxt.
+
+    Parameters
+    ---------
+      filename : str
+        text file
+      delim : str, optional
+        delimiter, detected from the first line when None
+
+    Returns
+    ---------
+      touple (time, x, y)
+    """
+    with open(filename, "r") as handle:
+        first = next((line for line in handle if line.strip()), None)
+        if first is None:
+            raise ValueError("File {} contains no data".format(filename))
+        if delim is None:
+            delim = detect_delimiter(first)
+        lines = _data_lines(itertools.chain([first], handle), delim)
+        first = next(lines)
+        n_columns = len(first.split(delim))
+        if n_columns % 2 == 0:
+            raise ValueError("File {} has even number of columns ({}), expected time followed "
+                             "by x and y of each object".format(filename, n_columns))
+        lines = itertools.chain([first], lines)
+        blocks = []
+        try:
+            while True:
+                block = list(itertools.islice(lines, CHUNK_ROWS))
+                if len(block) == 0:
+                    break
+                blocks.append(np.loadtxt(block, delimiter=delim, ndmin=2))
+            mat = np.concatenate(blocks)
+        except ValueError:
+            handle.seek(0)
+            mat = np.genfromtxt(_data_lines(handle, delim), delimiter=delim, ndmin=2)
+            if mat.shape[1] != n_columns:
+                raise
+    return (mat[:, 0], mat[:, 1::2], mat[:, 2::2])
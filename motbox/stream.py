@@ -0,0 +1,239 @@
+"""Streaming trajectory generation
+
+TrajectoryStream produces the same trajectories as Track.generate_trajectory
+and Track.generate_vonmises, but frame by frame, so only the current
+positions and directions are kept in memory. The stream can be used for
+tracks of any length (e.g. continuous tracking) or in closed loop, and its
+state can be saved and resumed later.
+
+Examples
+-------
+stream = TrajectoryStream().start(position, 5., opts, 0.001, kappa=8, rng=rng)
+for chunk in stream.chunks(1000, n_frames=600000):
+    ...  # chunk is a Track with 1000 frames
+state = stream.state()
+...
+stream = TrajectoryStream().resume(state)
+"""
+
+import numpy as np
+
+from . import arenas
+from . import events
+from . import models
+from .track import Track, Position
+
+
+class TrajectoryStream(object):
+    """Generator of trajectory frames with O(objects) state
+
+    - position - motbox.Position, positions of the last produced frame
+    - direction - numpy 1D-array, directions of movement (radians)
+    - frame - number of produced frames
+    - time - time of the next frame
+    """
+
+    def __init__(self):
+        """The constructor creates an empty object with data set to None
+        """
+        self.position = None
+        self.direction = None
+        self.speed = None
+        self.opts = None
+        self.timestep = None
+        self.kappa = None
+        self.jitter_func = None
+        self.rng = None
+        self.frame = 0
+        self.time = 0.
+
+
+    def start(self, position, speed, opts, timestep, direction=None, kappa=None, jitter_func=None,
+              rng=None, start=0.):
+        """Starts new stream
+
+        Parameters
+        ---------
+          position : motbox.Position
+            starting positions, the object is copied and not modified
+          speed : float or touple
+            speed of all objects or of each object (units per second)
+          opts : dictionary
+            arena options as in Track.generate_trajectory (xlim, ylim or arena, spacing, collisions)
+          timestep : float
+            time between frames
+          direction : touple of float, optional
+            starting directions (default is None, generates randomly)
+          kappa : float, optional
+            concentration of von Mises direction changes (as in Track.generate_vonmises),
+            None moves objects in straight lines
+          jitter_func : function, optional
+            custom direction change called each frame, its state is not saved by state()
+          rng : numpy.random.Generator, optional
+            source of random numbers (default is the global numpy.random)
+          start : float
+            time of the first frame
+
+        Returns
+        ---------
+        self
+        """
+        if type(speed) is tuple and len(speed) != position.n_objects:
+            raise ValueError("Length of speed is not the same as number of objects")
+        if opts.get("arena") is not None and opts.get("collisions") == "events":
+            raise ValueError("Exact collisions (events) are available only in rectangular arenas")
+        self.rng = rng
+        random = np.random if rng is None else rng
+        if direction is None:
+            direction = random.uniform(low=0., high=2 * np.pi, size=(position.n_objects, ))
+        self.position = Position(position.x, position.y)
+        self.direction = np.array(direction, dtype=float)
+        self.speed = speed
+        self.opts = dict(opts)
+        self.timestep = float(timestep)
+        self.kappa = kappa
+        self.jitter_func = jitter_func
+        self.frame = 0
+        self.time = float(start)
+        return self
+
+
+    def state(self):
+        """Returns state of the stream as JSON serializable dictionary
+
+        Generation continues from the next frame after resume(state). Arena
+        is stored by its description (Arena.describe()).
+        """
+        speed = np.asarray(self.speed)
+        opts = dict(self.opts)
+        if opts.get("arena") is not None:
+            opts["arena"] = opts["arena"].describe()
+        return {"frame": self.frame, "time": self.time, "timestep": self.timestep,
+                "x": self.position.x.tolist(), "y": self.position.y.tolist(),
+                "direction": self.direction.tolist(),
+                "speed": speed.tolist() if speed.ndim > 0 else float(speed),
+                "opts": opts, "kappa": self.kappa, "rng": models.rng_state(self.rng),
+                "global_rng": self.rng is None}
+
+
+    def resume(self, state, jitter_func=None):
+        """Restores stream from dictionary created by state()
+
+        The global numpy.random is restored when the stream used it.
+
+        Returns
+        ---------
+        self
+        """
+        if state.get("global_rng", False):
+            models.set_rng_state(None, state["rng"])
+            rng = None
+        else:
+            bit_generator = getattr(np.random, state["rng"]["bit_generator"])()
+            bit_generator.state = state["rng"]
+            rng = np.random.Generator(bit_generator)
+        opts = dict(state["opts"])
+        if opts.get("arena") is not None:
+            opts["arena"] = arenas.from_description(opts["arena"])
+        speed = state["speed"]
+        self.start(Position(state["x"], state["y"]),
+                   tuple(speed) if isinstance(speed, list) else speed,
+                   opts, state["timestep"], state["direction"], state["kappa"],
+                   jitter_func, rng, state["time"])
+        self.frame = state["frame"]
+        return self
+
+
+    def meta(self):
+        """Returns generation parameters as stored in Track.meta
+        """
+        meta = {"xlim": self.opts.get("xlim"), "ylim": self.opts.get("ylim"),
+                "spacing": self.opts.get("spacing"), "speed": self.speed}
+        if self.opts.get("arena") is not None:
+            meta["arena"] = self.opts["arena"].describe()
+        if self.kappa is not None:
+            meta["kappa"] = self.kappa
+        return meta
+
+
+    def frames(self, n_frames=None):
+        """Yields frames (time, x, y) one by one
+
+        Parameters
+        ---------
+          n_frames : int, optional
+            number of frames to produce (default is None, runs forever)
+
+        Returns
+        ---------
+        generator of touples (time, x, y), x and y are copies of positions
+        """
+        track = Track()
+        arena = self.opts.get("arena")
+        random = np.random if self.rng is None else self.rng
+        step = np.asarray(self.speed) * self.timestep
+        n_objects = self.position.n_objects
+        produced = 0
+        while n_frames is None or produced < n_frames:
+            if self.frame > 0:
+                if self.opts.get("collisions") == "events":
+                    (self.position.x, self.position.y, self.direction) = events.advance(
+                        self.position.x, self.position.y, self.direction, step, self.opts)
+                else:
+                    if arena is None:
+                        self.direction = track.bounce_square(self.position, self.direction, self.opts)
+                    else:
+                        self.direction = track.bounce_arena(self.position, self.direction, arena)
+                    self.direction = track.bounce_objects(self.position, self.direction, self.opts)
+                    self.position.move((np.sin(self.direction) * step,
+                                        np.cos(self.direction) * step))
+                if self.kappa is not None:
+                    self.direction += random.vonmises(mu=0, kappa=self.kappa, size=n_objects)
+                if self.jitter_func is not None:
+                    self.direction += self.jitter_func()
+            time = self.time
+            self.frame += 1
+            self.time = time + self.timestep
+            produced += 1
+            yield (time, self.position.x.copy(), self.position.y.copy())
+
+
+    def chunks(self, chunk_size, n_frames=None):
+        """Yields consecutive parts of the trajectory as Track objects
+
+        Parameters
+        ---------
+          chunk_size : int
+            number of frames in each chunk (the last one can be shorter)
+          n_frames : int, optional
+            total number of frames (default is None, runs forever)
+
+        Returns
+        ---------
+        generator of motbox.Track
+        """
+        frames = self.frames(n_frames)
+        n_objects = self.position.n_objects
+        while True:
+            time = np.zeros(chunk_size)
+            x = np.zeros((chunk_size, n_objects))
+            y = np.zeros((chunk_size, n_objects))
+            size = 0
+            for (frame_time, frame_x, frame_y) in frames:
+                time[size] = frame_time
+                x[size] = frame_x
+                y[size] = frame_y
+                size += 1
+                if size == chunk_size:
+                    break
+            if size == 0:
+                return
+            track = Track()
+            track.time = time[:size]
+            track.x = x[:size]
+            track.y = y[:size]
+            track.n_objects = n_objects
+            track.meta = self.meta()
+            yield track
+            if size < chunk_size:
+                return
@@ -6,34 +6,136 @@ moving objects.
 """
 
 import numpy as np
-from scipy.spatial import distance
-from scipy.sparse import csgraph
+from . import collisions
+from . import events
+from . import kernels
+from . import models
+from . import stats as instrumentation
+from . import storage
+
+
+def resample(time, newtime, blocks, method="linear", axis=0):
+    """Resamples arrays sampled at time to newtime
+
+    Search indices and weights are computed once and applied to all
+    blocks at once. Values outside of time are held constant, as in np.interp.
+
+    Parameters
+    ---------
+      time : array of float
+        original ascending timeline
+      newtime : array of float
+        new timeline
+      blocks : list of arrays
+        data with time along axis (e.g. Track.x and Track.y)
+      method : str
+        "linear" or "cubic" (cubic spline, slower, smoother)
+      axis : int
+        axis of the blocks which corresponds to time
+
+    Returns
+    ---------
+      list of resampled arrays
+    """
+    time = np.asarray(time, dtype=float)
+    newtime = np.clip(np.asarray(newtime, dtype=float), time[0], time[-1])
+    if method == "cubic":
+        from scipy.interpolate import CubicSpline
+        return [CubicSpline(time, block, axis=axis)(newtime) for block in blocks]
+    if method != "linear":
+        raise ValueError("Unknown interpolation method: {}".format(method))
+    last = len(time) - 1
+    index = np.clip(np.searchsorted(time, newtime, side="right") - 1, 0, max(last - 1, 0))
+    following = np.minimum(index + 1, last)
+    span = time[following] - time[index]
+    weight = np.divide(newtime - time[index], span, out=np.zeros(len(newtime)), where=span > 0)
+    results = []
+    for block in blocks:
+        block = np.moveaxis(np.asarray(block), axis, 0)
+        shape = (len(newtime), ) + (1, ) * (block.ndim - 1)
+        start = np.take(block, index, axis=0)
+        result = np.take(block, following, axis=0)
+        result -= start
+        result *= weight.reshape(shape)
+        result += start
+        results.append(np.moveaxis(result, 0, axis))
+    return results
+
+
+# candidates drawn at once and default number of candidates per point in grid sampling
+GRID_BATCH = 16
+GRID_ATTEMPTS = 1000
+
+
+def check_density(n, xlim, ylim, min_distance):
+    """Raises ValueError if n points with min_distance cannot fit into the area
+
+    Uses density of hexagonal packing, the densest possible arrangement.
+    Practical samplers fail well below this limit.
+    """
+    if n < 2 or min_distance <= 0:
+        return
+    area = (xlim[1] - xlim[0] + min_distance) * (ylim[1] - ylim[0] + min_distance)
+    capacity = area / (np.sqrt(3) / 2 * min_distance ** 2)
+    if n > capacity:
+        raise ValueError("{} objects with distance {} cannot fit into area {} x {}, "
+                         "at most {} fit in theory".format(n, min_distance, xlim, ylim, int(capacity)))
+
 
 class Position(object):
     """Represents position of n objects or one timeslice of Track
+
+    - xy - numpy 2D-array (dim1 = objects, dim2 = x and y)
+    - x, y - views of the columns of xy, assigning them fills xy
     """
+    # __dict__ keeps ad-hoc attributes of scripts working
+    __slots__ = ("xy", "n_objects", "__dict__")
 
     def __init__(self, x=None, y=None):
         """Constructor
         """
-        self.x = np.array(x, dtype=float)
-        self.y = np.array(y, dtype=float)
         if x is None:
+            self.xy = np.zeros((0, 2))
             self.n_objects = 0
         else:
+            self.xy = np.empty((len(x), 2))
+            self.xy[:, 0] = x
+            self.xy[:, 1] = y
             self.n_objects = len(x)
 
+    @property
+    def x(self):
+        return self.xy[:, 0]
+
+    @x.setter
+    def x(self, value):
+        self._set_column(0, value)
+
+    @property
+    def y(self):
+        return self.xy[:, 1]
+
+    @y.setter
+    def y(self, value):
+        self._set_column(1, value)
+
+    def _set_column(self, axis, value):
+        value = np.asarray(value, dtype=float)
+        if len(value) != len(self.xy):
+            self.xy = np.zeros((len(value), 2))
+        self.xy[:, axis] = value
+
     def is_min_distance_complied(self, min_distance):
         """Checks if objects' distances are smaller than specified value
         """
-        coords = np.zeros((self.n_objects, 2))
-        coords[:, 0] = self.x
-        coords[:, 1] = self.y
-        dist = distance.pdist(coords)
-        return np.all(dist > min_distance)
+        # pairwise distances by broadcasting, importing scipy.spatial is slower than the check
+        difference = self.xy[:, None, :] - self.xy[None, :, :]
+        dist = np.hypot(difference[..., 0], difference[..., 1])
+        return np.all(dist[np.triu_indices(len(dist), 1)] > min_distance)
 
     # TODO - potentially make this static?
-    def random_positions(self, n, xlim, ylim, min_distance):
+    def random_positions(self, n, xlim, ylim, min_distance, rng=None, method="rejection",
+                         max_attempts=None, stats=None, arena=None):
         """Populates square ares (xlim x ylim) with n objects.
         Checks minimum inter-object distance
 
@@ -43,27 +145,131 @@ class Position(object):
             number of points to simulate
           xlim : touple of floats (2)
             definition of lower and upper limit of x positions
+            (None for the bounding box of arena)
           ylim : touple of floats (2)
             definition of lower and upper limit of y positions
+            (None for the bounding box of arena)
+          min_distance : float
+            minimum distance between objects
+          rng : numpy.random.Generator, optional
+            source of random numbers (default is the global numpy.random)
+          method : str
+            "rejection" (default) redraws all points until the distances
+            are complied. Its cost grows exponentially with density.
+            "grid" places points one by one and redraws only the rejected
+            point, checking neighbours in a background grid. It scales
+            linearly with n, but the distribution differs slightly
+            (random sequential adsorption).
+          max_attempts : int, optional
+            "rejection": number of redraws of all points (default unlimited),
+            "grid": number of candidates for each point (default 1000)
+          stats : motbox.stats.GenerationStats, optional
+            records time ("random_positions") and drawn candidates ("position_attempts",
+            number of redraws of all points for "rejection", of single points for "grid")
+          arena : motbox.arenas.Arena, optional
+            points are placed only inside the arena (outside its obstacles)
 
         Returns
         -------
         Position
           Position object with randomly generated positions for n points
 
+        Raises
+        -------
+        ValueError
+          when n points cannot fit into the area or attempts are exhausted
+
         Examples
         -------
         position = Position()
         position.random_positions(5, (-10,10), (-10,10), 1)
+        position.random_positions(5, None, None, 1, arena=motbox.arenas.Circle(10.))
         """
-        while True:
-            self.n_objects = n
-            self.x = np.random.uniform(low=xlim[0], high=xlim[1], size=(n, ))
-            self.y = np.random.uniform(low=ylim[0], high=ylim[1], size=(n, ))
-            if self.is_min_distance_complied(min_distance):
-                break
+        if arena is not None:
+            (box_x, box_y) = arena.bounds()
+            xlim = box_x if xlim is None else xlim
+            ylim = box_y if ylim is None else ylim
+        check_density(n, xlim, ylim, min_distance)
+        random = np.random if rng is None else rng
+        if stats is not None:
+            stats.start()
+        if method == "grid":
+            attempts = self._grid_positions(n, xlim, ylim, min_distance, random,
+                                            GRID_ATTEMPTS if max_attempts is None else max_attempts,
+                                            arena)
+        elif method == "rejection":
+            attempts = 0
+            while True:
+                if max_attempts is not None and attempts >= max_attempts:
+                    raise ValueError("Could not place {} objects with distance {} in {} redraws, "
+                                     "try method='grid'".format(n, min_distance, attempts))
+                attempts += 1
+                self.n_objects = n
+                if arena is None:
+                    self.x = random.uniform(low=xlim[0], high=xlim[1], size=(n, ))
+                    self.y = random.uniform(low=ylim[0], high=ylim[1], size=(n, ))
+                else:
+                    (self.x, self.y) = arena.sample(n, random, xlim, ylim)
+                if self.is_min_distance_complied(min_distance):
+                    break
+        else:
+            raise ValueError("Unknown sampling method: {}".format(method))
+        if stats is not None:
+            stats.lap("random_positions")
+            stats.count("position_attempts", attempts)
         return self
 
+    def _grid_positions(self, n, xlim, ylim, min_distance, random, max_attempts, arena=None):
+        """Places points one by one, see random_positions
+
+        Returns number of drawn candidates
+        """
+        coords = np.zeros((n, 2))
+        total = n
+        if min_distance <= 0 and arena is not None:
+            (coords[:, 0], coords[:, 1]) = arena.sample(n, random, xlim, ylim)
+        elif min_distance <= 0:
+            coords[:, 0] = random.uniform(low=xlim[0], high=xlim[1], size=(n, ))
+            coords[:, 1] = random.uniform(low=ylim[0], high=ylim[1], size=(n, ))
+        else:
+            # cell diagonal equals min_distance, so each cell holds at most one point
+            # and all possible neighbours are within two cells
+            cell = min_distance / np.sqrt(2)
+            n_cells = (max(int(np.ceil((xlim[1] - xlim[0]) / cell)), 1),
+                       max(int(np.ceil((ylim[1] - ylim[0]) / cell)), 1))
+            grid = -np.ones((n_cells[0] + 4, n_cells[1] + 4), dtype=int)
+            offsets = np.array([(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)]).T
+            for index in range(n):
+                attempts = 0
+                while True:
+                    if attempts >= max_attempts:
+                        raise ValueError("Could not place object {} of {} with distance {} in {} "
+                                         "attempts, the area is too dense".format(
+                                             index + 1, n, min_distance, attempts))
+                    size = min(GRID_BATCH, max_attempts - attempts)
+                    attempts += size
+                    new_x = random.uniform(low=xlim[0], high=xlim[1], size=(size, ))
+                    new_y = random.uniform(low=ylim[0], high=ylim[1], size=(size, ))
+                    candidates = np.column_stack((new_x, new_y))
+                    cell_x = np.minimum(((new_x - xlim[0]) / cell).astype(int), n_cells[0] - 1) + 2
+                    cell_y = np.minimum(((new_y - ylim[0]) / cell).astype(int), n_cells[1] - 1) + 2
+                    neighbours = grid[cell_x[:, None] + offsets[0], cell_y[:, None] + offsets[1]]
+                    difference = coords[neighbours] - candidates[:, None, :]
+                    distances = np.sqrt(np.sum(difference * difference, axis=2))
+                    accepted = np.all((neighbours < 0) | (distances > min_distance), axis=1)
+                    if arena is not None:
+                        accepted &= arena.contains(new_x, new_y)
+                    if np.any(accepted):
+                        first = np.argmax(accepted)
+                        total += attempts - size + first
+                        coords[index] = candidates[first]
+                        grid[cell_x[first], cell_y[first]] = index
+                        break
+        self.n_objects = n
+        self.x = coords[:, 0].copy()
+        self.y = coords[:, 1].copy()
+        return total
+
     def circular_positions(self, n, radius, center=(0, 0)):
         """Put n objects on a circle with given center and diameter
         """
@@ -78,15 +284,14 @@ class Position(object):
 
         Expects array or tuple
         """
-        self.x += difference[0]
-        self.y += difference[1]
+        self.xy[:, 0] += difference[0]
+        self.xy[:, 1] += difference[1]
 
     def scale(self, factor):
         """Multiplies all x,y by constant
 
         """
-        self.x *= factor
-        self.y *= factor
+        self.xy *= np.asarray(factor)[..., None]
 
     def jitter_positions(self, amount, method="normal"):
         """Adds uniform or normal jitter to existing positions
@@ -104,52 +309,168 @@ class Track(object):
     - x - numpy 2D-array (dim1 = time, dim2 = objects)
     - y - numpy 2D-array (dim1 = time, dim2 = objects)
     - time - numpy 1D-array
+    - meta - dictionary with generation parameters (arena limits, spacing, speed, ...)
+    - stats - motbox.stats.GenerationStats of generation when requested, otherwise None
+
+    Generated tracks are compact: x and y are views into one contiguous
+    buffer xy (dim1 = time, dim2 = objects, dim3 = x and y), see compact.
+    Loaded tracks keep x and y as separate (possibly memory-mapped) arrays.
     """
+    # __dict__ keeps ad-hoc attributes of scripts working
+    __slots__ = ("_x", "_y", "_xy", "time", "n_objects", "meta", "stats", "_lookup", "__dict__")
+
     def __init__(self):
         """The constructor creates an empty object with data set to None
         """
-        self.x = None
-        self.y = None
+        self._x = None
+        self._y = None
+        self._xy = None
         self.time = None
         self.n_objects = 0
+        self.meta = {}
+        self.stats = None
+        self._lookup = None
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        # assigning other array than the view detaches x from the buffer
+        if value is not self._x:
+            self._xy = None
+        self._x = value
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        if value is not self._y:
+            self._xy = None
+        self._y = value
+
+    @property
+    def xy(self):
+        """Coordinates as 3D-array (dim1 = time, dim2 = objects, dim3 = x and y)
+
+        Compact tracks return their buffer, other tracks a new array.
+        """
+        if self._xy is not None:
+            return self._xy
+        if self.x is None:
+            return None
+        return np.stack((self.x, self.y), axis=-1)
+
+    def _use_buffer(self, xy):
+        (self._xy, self._x, self._y) = (xy, xy[..., 0], xy[..., 1])
+
+    def compact(self, dtype=None):
+        """Stores coordinates in one contiguous buffer, x and y become its views
 
+        Parameters
+        ---------
+          dtype : numpy dtype, optional
+            dtype of coordinates, e.g. np.float32 halves the memory
+            (default keeps dtype of x)
 
-    def load_from_csv(self, filename, delim="\t"):
+        Returns
+        ---------
+        self
+        """
+        dtype = np.asarray(self.x).dtype if dtype is None else np.dtype(dtype)
+        if self._xy is None or self._xy.dtype != dtype:
+            xy = np.empty(np.shape(self.x) + (2, ), dtype=dtype)
+            xy[..., 0] = self.x
+            xy[..., 1] = self.y
+            self._use_buffer(xy)
+        return self
+
+    def __getstate__(self):
+        slots = [name for cls in type(self).__mro__ for name in getattr(cls, "__slots__", ())
+                 if name != "__dict__"]
+        state = {name: getattr(self, name) for name in slots if hasattr(self, name)}
+        state.update(self.__dict__)
+        if state.get("_xy") is not None:
+            # views are restored from the buffer, not pickled as copies
+            del state["_x"], state["_y"]
+        return state
+
+    def __setstate__(self, state):
+        for (name, value) in state.items():
+            setattr(self, name, value)
+        if state.get("_xy") is not None:
+            self._use_buffer(self._xy)
+
+
+    def load_from_csv(self, filename, delim=None):
         """Initializes object from data file.
 
-        Calls classic format. Maybe add format detection in future.
+        Detects the format: binary files (see save_to_npz) are memory-mapped
+        copy-on-write, text files are read in classic format.
         """
+        if storage.is_binary(filename):
+            return self.load_from_npz(filename, mmap_mode="c")
         return self.load_from_csv_v0(filename, delim)
 
 
-    def load_from_csv_v0(self, filename, delim="\t"):
+    def load_from_csv_v0(self, filename, delim=None):
         """Initializes object from data file.
         Uses format from RepMot/RevMot studies.
+
+        Delimiter (tab, comma, semicolon or whitespace) is detected
+        when not given. Raises ValueError for even number of columns.
         """
-        mat = np.genfromtxt(filename, delimiter=delim)
-        # first column
+        (self.time, self.x, self.y) = storage.read_csv_v0(filename, delim)
+        self.n_objects = self.x.shape[1]
+        self.meta = {}
+        return self
 
-        ncol = mat.shape[1]
-        if ncol % 2 == 1:
-            self.time = mat[:, 0]
-            self.x = mat[:, 1::2]
-            self.y = mat[:, 2::2]
-            self.n_objects = self.x.shape[1]
-        else:
-            # even number of columns not expected
-            # error
-            pass
-        pass
+
+    def load_from_npz(self, filename, mmap_mode="r"):
+        """Initializes object from binary file.
+
+        Parameters
+        ---------
+          filename : str
+            file created by save_to_npz
+          mmap_mode : str or None
+            "r" maps data read-only without copying, "c" maps them
+            copy-on-write, None reads them into memory.
+        """
+        (self.time, self.x, self.y, self.meta) = storage.load_track(filename, mmap_mode)
+        self.n_objects = self.x.shape[1]
+        return self
 
 
     def save_to_csv(self, filename):
         """Saves object's data to file
 
-        Defaults to classic format.
+        Defaults to classic format, files with .npz extension are saved
+        in binary format (see save_to_npz).
         """
+        if str(filename).lower().endswith(".npz"):
+            return self.save_to_npz(filename)
         return self.save_to_csv_v0(filename)
 
 
+    def save_to_npz(self, filename, dtype=None):
+        """Saves object's data to binary file
+
+        Stores time, x, y and meta, see motbox.storage.
+
+        Parameters
+        ---------
+          filename : str
+            name of the file
+          dtype : numpy dtype, optional
+            dtype of stored coordinates, e.g. np.float32 (default keeps dtype of x)
+        """
+        storage.save_track(filename, self.time, self.x, self.y, self.meta, dtype)
+
+
     def save_to_csv_v0(self, filename):
         """Saves object's data to file
 
@@ -173,53 +494,139 @@ class Track(object):
         self.x += difference[0]
         self.y += difference[1]
 
-    def scale(self, factor):
+    def scale(self, factor, axis=None):
         """Multiplies all x,y by constant
 
+        With axis 0 (x) or 1 (y) only one coordinate is scaled, e.g.
+        scale(-1, axis=0) mirrors the track horizontally.
+        """
+        if axis in (None, 0):
+            self.x *= factor
+        if axis in (None, 1):
+            self.y *= factor
+
+    def __getitem__(self, index):
+        """Returns part of the track as a TrackView, track[frames] or track[frames, objects]
+
+        Frames are selected by slice, objects by int, slice or list of
+        indices. Nothing is copied, see TrackView.
+        """
+        (frames, objects) = index if isinstance(index, tuple) else (index, None)
+        return TrackView(self, frames, objects)
+
+    def window(self, start, stop, objects=None):
+        """Returns TrackView of frames with time in [start, stop), see __getitem__
+        """
+        frames = slice(int(np.searchsorted(self.time, start, side="left")),
+                       int(np.searchsorted(self.time, stop, side="left")))
+        return TrackView(self, frames, objects)
+
+    def _view_state(self):
+        """Returns (x, y, objects, scale, offset) from which views are derived
+        """
+        return (self.x, self.y, None, None, None)
+
+    def materialize(self):
+        """Returns a new Track with its own copy of the data
         """
-        self.x *= factor
-        self.y *= factor
+        track = Track()
+        track.time = np.array(self.time)
+        if self._xy is not None:
+            track._use_buffer(np.array(self._xy))
+        else:
+            track.x = np.array(self.x)
+            track.y = np.array(self.y)
+        track.n_objects = self.n_objects
+        track.meta = dict(self.meta)
+        return track
 
     def timestep(self):
         """Estimates size of time steps in timeline
         """
         return np.mean(np.diff(self.time))
 
-    def time_interpolate(self, newtime):
+    def time_interpolate(self, newtime, method="linear"):
         """Interpolates data according to new timeline
 
         Does not check the validity of new time
-        (ascending order, being within time limits)
-        """
-        nrow_new = len(newtime)
-        newx = np.zeros((nrow_new, self.n_objects))
-        newy = np.zeros((nrow_new, self.n_objects))
-        for index in range(self.n_objects):
-            newx[:, index] = np.interp(newtime, self.time, self.x[:, index])
-            newy[:, index] = np.interp(newtime, self.time, self.y[:, index])
-        self.x = newx
-        self.y = newy
+        (ascending order). Positions outside of time limits are held constant.
+
+        Parameters
+        ---------
+          newtime : array of float
+            new timeline
+          method : str
+            "linear" (default) or "cubic", see motbox.track.resample
+        """
+        (self.x, self.y) = resample(self.time, newtime, [self.x, self.y], method)
         self.time = newtime
 
-    def position_for_time(self, timevalue):
+    def prepare_lookup(self):
+        """Precomputes time lookup used by position_for_time
+
+        Detects uniform time step, so that position_for_time finds the
+        neighbouring frames by direct indexing instead of searching. It is
+        called automatically when time is replaced, call it again after
+        changing time in place.
+        """
+        time = self.time
+        n_frames = len(time)
+        if n_frames > 1:
+            step = (time[-1] - time[0]) / (n_frames - 1)
+            uniform = step > 0 and np.allclose(np.diff(time), step, rtol=1e-6, atol=0)
+        else:
+            step = 0.
+            uniform = False
+        self._lookup = (time, float(time[0]), float(step), bool(uniform), n_frames - 1)
+        return self
+
+    def _time_index(self, timevalue):
+        """Returns (index, weight) for linear blend between frames index and index + 1
+        """
+        if self._lookup is None or self._lookup[0] is not self.time:
+            self.prepare_lookup()
+        (time, start, step, uniform, last) = self._lookup
+        if last < 1 or timevalue <= start:
+            return (0, 0.)
+        if timevalue >= time[last]:
+            return (last - 1, 1.)
+        if uniform:
+            index = min(int((timevalue - start) / step), last - 1)
+            # guards against rounding of the estimated index
+            if timevalue < time[index]:
+                index -= 1
+            elif timevalue >= time[index + 1] and index < last - 1:
+                index += 1
+        else:
+            index = int(np.searchsorted(time, timevalue, side="right")) - 1
+        return (index, (timevalue - time[index]) / (time[index + 1] - time[index]))
+
+    def position_for_time(self, timevalue, out=None):
         """Interpolates coordinates for given time point
 
+        Uses precomputed time lookup (see prepare_lookup), so for uniform
+        time step the cost of the call does not depend on track length.
+
         Parameters
         ---------
           timevalue : float
             time at which to interpolate the position
+          out : touple (x, y) of arrays (1 x objects), optional
+            buffers to store the result in, can be reused between calls
 
         Returns
         ---------
           touple (x, y) of arrays for interpolated positions at time
         """
-        n_objects = self.n_objects
-        newx = np.zeros((1, n_objects))
-        newy = np.zeros((1, n_objects))
-        for index in range(n_objects):
-            newx[:, index] = np.interp(timevalue, self.time, self.x[:, index])
-            newy[:, index] = np.interp(timevalue, self.time, self.y[:, index])
-        return (newx, newy)
+        if out is None:
+            out = (np.zeros((1, self.n_objects)), np.zeros((1, self.n_objects)))
+        (index, weight) = self._time_index(timevalue)
+        following = min(index + 1, len(self.time) - 1)
+        for (coords, result) in ((self.x, out[0]), (self.y, out[1])):
+            np.subtract(coords[following], coords[index], out=result[0])
+            result *= weight
+            result += coords[index]
+        return out
 
 
     def summary(self):
@@ -233,7 +640,7 @@ class Track(object):
         return report
 
 
-    def bounce_square(self, position, direction, arena_opts):
+    def bounce_square(self, position, direction, arena_opts, stats=None):
         """Checks for boundary bouncing and returns corrected directions
 
         Parameters
@@ -246,6 +653,9 @@ class Track(object):
           arena_opts : dictionary
             DESCRIPTION
 
+          stats : motbox.stats.GenerationStats, optional
+            counts bounced objects ("wall_bounces")
+
         Returns
 
         """
@@ -262,29 +672,34 @@ class Track(object):
         direction[corner] = np.mod(direction[corner] + np.pi, 2 * np.pi)
         direction[np.logical_and(side, too_horizontal)] = 2 * np.pi - direction[np.logical_and(side, too_horizontal)]
         direction[np.logical_and(side, too_vertical)] = np.mod(np.pi - direction[np.logical_and(side, too_vertical)], 2 * np.pi)
+        if stats is not None:
+            stats.count("wall_bounces", np.count_nonzero(too_horizontal | too_vertical))
         return direction
 
 
-    def bounce_objects(self, position, direction, opts):
+    def bounce_arena(self, position, direction, arena, stats=None):
+        """Checks for bouncing from boundary and obstacles of arena, returns corrected directions
+
+        See motbox.arenas.Arena.bounce.
+        """
+        return arena.bounce(position.x, position.y, direction, stats)
+
+
+    def bounce_objects(self, position, direction, opts, stats=None):
         """Checks for minimum inter-object spacing
+
+        Close objects are searched densely for few objects and with a uniform
+        grid (cell size spacing) for many, opts["collisions"] can force
+        "dense" or "grid". See motbox.collisions.
         """
-        spacing = opts["spacing"]
-        coords = np.zeros((position.n_objects, 2))
-        coords[:, 0] = position.x
-        coords[:, 1] = position.y
-        distances = distance.squareform(distance.pdist(coords)) < spacing
-        n_groups, grouping = csgraph.connected_components(distances)
-        for group_code in range(n_groups):
-            count = np.sum(grouping == group_code)
-            if count == 2:
-                direction[grouping == group_code] = direction[grouping == group_code][::-1]
-            if count > 2:
-                direction[grouping == group_code] = np.mod(direction[grouping == group_code] + np.pi, 2 * np.pi)
-        return direction
+        method = opts.get("collisions", "auto")
+        return collisions.bounce_groups(position.x, position.y, direction, opts["spacing"], method,
+                                        stats)
 
 
     # TODO - redo the opts parameter, as it includes REQUIRED parameters (such as spacing), so it is not much optional
-    def generate_trajectory(self, position, speed, opts, time=None, direction=None, jitter_func=None):
+    def generate_trajectory(self, position, speed, opts, time=None, direction=None, jitter_func=None,
+                            rng=None, stats=None, model=None):
         """Generates trajectory for given position, speed and
 
         Parameters
@@ -296,12 +711,24 @@ class Track(object):
             is the number of positions. Allows separate speeds to be applied to each object. e.g. (speed for first object, speed for second, etc.)
         opts : dictionary with optional parameters
             currently allowed parameters are xlim, ylim, spacing. e.g. opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing":2.}
+            or arena (motbox.arenas.Arena, e.g. a circle or polygon with obstacles) instead of xlim and ylim
+            and optionally collisions ("auto", "dense" or "grid", see Track.bounce_objects,
+            or "events" for exact continuous time collisions, see motbox.events)
+            and backend ("numpy", "numba" or "auto", see motbox.kernels)
         time : tuple of float
             array of floats to generate . e.g. np.arange(0, 5, 0.1) for a 5s long track generated each 0.1 s.
         direction : touple of float, optional
             defines starting direction of movement for all objects. The angle is in radians (0-2pi). (default is None, generates randomly).
         jitter_func : function to add jitter
             function to add jitter to otherwise straigth path.
+        rng : numpy.random.Generator, optional
+            source of random starting directions and of model's noise (default is the global numpy.random)
+        stats : motbox.stats.GenerationStats, optional
+            records time of phases (model, bounce_square, bounce_objects, events, move, jitter)
+            and counts of bounces and collisions, stored in Track.stats
+        model : motbox.models.MotionModel, optional
+            changes of speed and direction, sampled for all frames before generation
+            (see motbox.models), stored in meta["model"] with the seed of rng in meta["seed"]
 
         Returns
         ---------
@@ -311,42 +738,79 @@ class Track(object):
             raise Exception("Length of speed is not the same as number of objects")
 
         self.n_objects = position.n_objects
+        self.meta = {"xlim": opts.get("xlim"), "ylim": opts.get("ylim"),
+                     "spacing": opts.get("spacing"), "speed": speed}
+        arena = opts.get("arena")
+        if arena is not None:
+            if opts.get("collisions") == "events":
+                raise ValueError("Exact collisions (events) are available only in rectangular arenas")
+            self.meta["arena"] = arena.describe()
         # TODO - allow time to be passed as a number and np.arrange is run from within the function
         # TODO - handle time is being none - it crashes
         if not time is None:
             self.time = time
+        random = np.random if rng is None else rng
         if direction is None:
-            direction = np.random.uniform(low=0., high=2*np.pi, size=(self.n_objects,))
-
-        self.x = np.zeros((len(self.time), self.n_objects))
-        self.y = np.zeros((len(self.time), self.n_objects))
-        self.x[0, :] = position.x
-        self.y[0, :] = position.y
-        step = np.asarray(speed) * self.timestep()
+            direction = random.uniform(low=0., high=2*np.pi, size=(self.n_objects,))
+
+        xy = np.zeros((len(self.time), self.n_objects, 2))
+        xy[0] = position.xy
+        self._use_buffer(xy)
+        self.stats = stats
+        lap = instrumentation.ignore if stats is None else stats.start().lap
+        # distances moved into each frame
+        steps = np.broadcast_to(np.asarray(speed) * self.timestep(),
+                                (len(self.time) - 1, self.n_objects))
+        turns = None
+        if model is not None:
+            self.meta["model"] = model.describe()
+            seed = models.rng_seed(rng)
+            if seed is not None:
+                self.meta["seed"] = seed
+            (steps, turns) = model.sample(steps, self.timestep(), random)
+            lap("model")
+        if kernels.use_kernel(opts):
+            # whole frame loop in compiled code, identical results
+            kernels.generate_frames(self.x, self.y, direction, steps, jitter_func, opts, turns)
+            position.xy = xy[-1].copy()
+            lap("kernel")
+            return self
         for frame in range(1, len(self.time)):
-            # check boundary
-            direction_old = direction.copy()
-            direction = self.bounce_square(position, direction, opts)
-            # check collisions
-            direction_old = direction.copy()
-            direction = self.bounce_objects(position, direction, opts)
-
-            position.move((np.sin(direction) * step, np.cos(direction) * step))
-
-            #take information from the just calculated position
-            tx = self.x[frame - 1, :] + np.sin(direction) * step
-            ty = self.y[frame - 1, :] + np.cos(direction) * step
+            step = steps[frame - 1]
+            if opts.get("collisions") == "events":
+                # move with exact wall and object collisions within the step
+                (position.x, position.y, direction) = events.advance(
+                    position.x, position.y, direction, step, opts, stats)
+                lap("events")
+            else:
+                # check boundary
+                if arena is None:
+                    direction = self.bounce_square(position, direction, opts, stats)
+                    lap("bounce_square")
+                else:
+                    direction = self.bounce_arena(position, direction, arena, stats)
+                    lap("bounce_arena")
+                # check collisions
+                direction = self.bounce_objects(position, direction, opts, stats)
+                lap("bounce_objects")
+
+                position.move((np.sin(direction) * step, np.cos(direction) * step))
 
             # store coordinates
-            self.x[frame, :] = tx
-            self.y[frame, :] = ty
+            xy[frame] = position.xy
+            lap("move")
             # update direction
+            if turns is not None:
+                direction += turns[frame - 1]
+                lap("jitter")
             if jitter_func is not None:
                 direction += jitter_func()
+                lap("jitter")
         return self
 
 
-    def generate_vonmises(self, position, speed, kappa, opts, time=None, direction=None):
+    def generate_vonmises(self, position, speed, kappa, opts, time=None, direction=None, rng=None,
+                          stats=None, cache=None):
         """Generates trajectories from starting positions and von Mises sampling
 
         Parameters
@@ -356,6 +820,14 @@ class Track(object):
         kappa :
         opts :
         time :
+        rng : numpy.random.Generator, optional
+            source of random numbers (default is the global numpy.random)
+        stats : motbox.stats.GenerationStats, optional
+            see Track.generate_trajectory (nothing is recorded for cached
+            tracks except "cache_hits")
+        cache : motbox.cache.TrajectoryCache, optional
+            the track is taken from the cache when it was generated before
+            with the same parameters and random state
 
         Return
         ---------
@@ -365,12 +837,216 @@ class Track(object):
         Track.generate_trajectory
         """
         # opt = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing":2.}
+        if cache is not None:
+            params = {"position": position.xy, "speed": speed, "kappa": kappa, "opts": opts,
+                      "time": self.time if time is None else time, "direction": direction}
+            track = cache.fetch("vonmises", params, rng, lambda: Track().generate_vonmises(
+                Position(position.x, position.y), speed, kappa, opts, self.time if time is None else time,
+                direction, rng, stats), stats)
+            (self.time, self.n_objects, self.meta, self.stats) = (track.time, track.n_objects,
+                                                                  track.meta, stats)
+            self._use_buffer(track.xy)
+            # the same final positions as after generation
+            position.xy = track.xy[-1].astype(float)
+            return self
+
+        self.generate_trajectory(position, speed, opts, time, direction, rng=rng, stats=stats,
+                                 model=models.VonMises(kappa))
+        self.meta["kappa"] = kappa
+        return self
+
+
+class TrackView(Track):
+    """Part of a track sharing data with it
+
+    Created by slicing a track (track[10:200, [0, 2]]) or by Track.window.
+    Coordinates are read from the arrays of the original track. move and
+    scale do not touch the data, offset and scale are kept per axis and
+    object and applied when x and y are read, so variants of a trial
+    (shifted, mirrored, subset of objects) cost no copies. Views can be
+    sliced further, materialize() returns an ordinary Track with copied data.
+
+    x and y of a view without selected objects and transforms are numpy
+    views, modifying them in place changes the original track. Assigning
+    x or y (e.g. by time_interpolate) detaches the view: its data are
+    computed, and it does not share them anymore.
+    """
+    __slots__ = ("_objects", "_scale", "_offset")
+
+    def __init__(self, track, frames=slice(None), objects=None):
+        """Constructor
+
+        Parameters
+        ---------
+          track : motbox.Track or motbox.TrackView
+            track to take the data from
+          frames : slice
+            selected frames
+          objects : int, slice or list of int, optional
+            selected objects (default is all)
+        """
+        if not isinstance(frames, slice):
+            raise TypeError("Frames are selected by slice, e.g. track[10:200]")
+        (x, y, selected, scale, offset) = track._view_state()
+        (x, y) = (x[frames], y[frames])
+        if isinstance(objects, (int, np.integer)):
+            objects = [objects]
+        if objects is not None and not isinstance(objects, slice):
+            objects = np.asarray(objects)
+            if objects.dtype == bool:
+                objects = np.flatnonzero(objects)
+        if objects is not None:
+            if selected is None and isinstance(objects, slice):
+                (x, y) = (x[:, objects], y[:, objects])
+            else:
+                selected = (np.arange(x.shape[1]) if selected is None else selected)[objects]
+            if scale is not None:
+                (scale, offset) = (scale[:, objects], offset[:, objects])
+        if scale is not None:
+            (scale, offset) = (np.array(scale), np.array(offset))
+        self._x = x
+        self._y = y
+        self._xy = None
+        self._objects = selected
+        self._scale = scale
+        self._offset = offset
+        self.time = track.time[frames]
+        self.n_objects = x.shape[1] if selected is None else len(selected)
+        self.meta = dict(track.meta)
+        self.stats = None
+        self._lookup = None
+
+    def _view_state(self):
+        return (self._x, self._y, self._objects, self._scale, self._offset)
+
+    def _read(self, coords, axis):
+        if coords is None:
+            return None
+        data = coords if self._objects is None else coords[:, self._objects]
+        if self._scale is None:
+            return data
+        return data * self._scale[axis] + self._offset[axis]
+
+    def _detach(self):
+        """Replaces shared data with computed coordinates
+        """
+        if self._objects is not None or self._scale is not None:
+            (self._x, self._y) = (self.x, self.y)
+            (self._objects, self._scale, self._offset) = (None, None, None)
+
+    @property
+    def x(self):
+        return self._read(self._x, 0)
+
+    @x.setter
+    def x(self, value):
+        self._detach()
+        self._x = value
+
+    @property
+    def y(self):
+        return self._read(self._y, 1)
+
+    @y.setter
+    def y(self, value):
+        self._detach()
+        self._y = value
+
+    def _transform(self):
+        if self._scale is None:
+            self._scale = np.ones((2, self.n_objects))
+            self._offset = np.zeros((2, self.n_objects))
+        return (self._scale, self._offset)
+
+    def move(self, difference):
+        """Shifts all x,y by constant (per object), applied when coordinates are read
+        """
+        (scale, offset) = self._transform()
+        for axis in (0, 1):
+            offset[axis] += np.broadcast_to(np.asarray(difference[axis]), (self.n_objects, ))
 
-        n = position.n_objects
-        def jitter_func():
-            return np.random.vonmises(mu=0, kappa=kappa, size=n)
-        return self.generate_trajectory(position, speed, opts, time, direction, jitter_func)
+    def scale(self, factor, axis=None):
+        """Multiplies x,y by constant (per object), applied when coordinates are read
+        """
+        (scale, offset) = self._transform()
+        factor = np.broadcast_to(np.asarray(factor), (self.n_objects, ))
+        for index in ((0, 1) if axis is None else (axis, )):
+            scale[index] *= factor
+            offset[index] *= factor
+
+    def position_for_time(self, timevalue, out=None):
+        """Interpolates coordinates for given time point, see Track.position_for_time
+
+        Only the two neighbouring frames are read and transformed.
+        """
+        if out is None:
+            out = (np.zeros((1, self.n_objects)), np.zeros((1, self.n_objects)))
+        (index, weight) = self._time_index(timevalue)
+        following = min(index + 1, len(self.time) - 1)
+        for (axis, (coords, result)) in enumerate(((self._x, out[0]), (self._y, out[1]))):
+            (first, second) = (coords[index], coords[following])
+            if self._objects is not None:
+                (first, second) = (first[self._objects], second[self._objects])
+            np.subtract(second, first, out=result[0])
+            result *= weight
+            result += first
+            if self._scale is not None:
+                result *= self._scale[axis]
+                result += self._offset[axis]
+        return out
+
+
+def time_interpolate_tracks(tracks, newtime, method="linear"):
+    """Interpolates many tracks to new timeline in one call
+
+    Tracks with the same timeline are resampled together as one block.
+    Tracks are modified in place, as with Track.time_interpolate.
+
+    Returns
+    ---------
+      list of tracks
+    """
+    tracks = list(tracks)
+    remaining = list(tracks)
+    while remaining:
+        time = remaining[0].time
+        group = [track for track in remaining
+                 if track.time is time or np.array_equal(track.time, time)]
+        remaining = [track for track in remaining if not any(track is other for other in group)]
+        blocks = resample(time, newtime, [track.x for track in group] + [track.y for track in group],
+                          method)
+        for (index, track) in enumerate(group):
+            track.x = blocks[index]
+            track.y = blocks[len(group) + index]
+            track.time = newtime
+    return tracks
+
+
+def load_many(paths, delim=None, max_workers=None):
+    """Loads many track files concurrently
+
+    Files are read by a pool of threads, which mostly helps with files on
+    network shares.
+
+    Parameters
+    ---------
+      paths : sequence of str
+        text or binary track files
+      delim : str, optional
+        delimiter of text files, detected when None
+      max_workers : int, optional
+        number of threads (default as in concurrent.futures.ThreadPoolExecutor)
+
+    Returns
+    ---------
+      list of Track in the order of paths
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
+    def load(path):
+        return Track().load_from_csv(path, delim)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(load, paths))
 
 
 if __name__ == "__main__":
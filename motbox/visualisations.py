@@ -1,7 +1,17 @@
-import matplotlib.pyplot as plt
+import collections
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
-from moviepy.editor import VideoClip
-from moviepy.video.io.bindings import mplfig_to_npimage
+
+from motbox.track import Track, resample
+
+WIDTH = 900
+HEIGHT = 600
+DPI = 150
+FPS = 25
 
 
 def plot(x, y, filename, xlim=(-10, 10), ylim=(-10, 10)):
@@ -23,6 +33,7 @@ def plot(x, y, filename, xlim=(-10, 10), ylim=(-10, 10)):
     -------
     Saves a png file of name filename into the working directory
     """
+    import matplotlib.pyplot as plt
     plt.figure()
     plt.plot(x, y, "k")
     plt.xlabel = "x"
@@ -32,7 +43,113 @@ def plot(x, y, filename, xlim=(-10, 10), ylim=(-10, 10)):
     plt.savefig(filename)
 
 
-def trajectory_video(trajectory, filename, xlim=(-10, 10), ylim=(-10, 10), callback=None, axisOff=True):
+def disc_stamp(radius):
+    """Returns pixel offsets (rows, columns) of a disc with given radius in pixels
+    """
+    size = int(np.ceil(radius))
+    (rows, columns) = np.mgrid[-size:size + 1, -size:size + 1]
+    inside = rows ** 2 + columns ** 2 <= radius ** 2
+    return (rows[inside], columns[inside])
+
+
+def render_frames(trajectory, times, xlim=(-10, 10), ylim=(-10, 10), width=900, height=600,
+                  radius=0.5, color=(0, 0, 0), background=(255, 255, 255)):
+    """Rasterizes objects of the track as discs into RGB frames
+
+    Positions of all frames are interpolated at once and the discs are
+    drawn by placing precomputed disc stamp into the frame buffer.
+
+    Parameters
+    ---------
+    trajectory : motbox.Track
+        track to render
+    times : array of float
+        track times of the frames
+    xlim, ylim : touple(2) of float
+        shown area, scaled to fit into the frame keeping aspect ratio
+    width, height : int
+        frame size in pixels
+    radius : float
+        radius of the discs in track units
+    color, background : touple(3) of int
+        RGB colours of discs and background
+
+    Returns
+    --------
+    generator of numpy arrays (height x width x 3, uint8). The same buffer
+    is reused for all frames, copy it if needed later.
+    """
+    scale = min(width / (xlim[1] - xlim[0]), height / (ylim[1] - ylim[0]))
+    offset_x = (width - (xlim[1] - xlim[0]) * scale) / 2
+    offset_y = (height - (ylim[1] - ylim[0]) * scale) / 2
+    (newx, newy) = resample(trajectory.time, times, [trajectory.x, trajectory.y])
+    columns = np.rint((newx - xlim[0]) * scale + offset_x).astype(int)
+    rows = np.rint((ylim[1] - newy) * scale + offset_y).astype(int)
+    (stamp_rows, stamp_columns) = disc_stamp(max(radius * scale, 0.5))
+
+    blank = np.empty((height, width, 3), dtype=np.uint8)
+    blank[:, :] = background
+    frame = blank.copy()
+    for index in range(len(times)):
+        np.copyto(frame, blank)
+        pixel_rows = (rows[index][:, None] + stamp_rows).ravel()
+        pixel_columns = (columns[index][:, None] + stamp_columns).ravel()
+        inside = ((pixel_rows >= 0) & (pixel_rows < height)
+                  & (pixel_columns >= 0) & (pixel_columns < width))
+        frame[pixel_rows[inside], pixel_columns[inside]] = color
+        yield frame
+
+
+def frame_times(trajectory):
+    """Returns track times of video frames
+    """
+    start = np.min(trajectory.time)
+    return start + np.arange(0, np.max(trajectory.time) - start, 1. / FPS)
+
+
+def _write_frames(trajectory, filename, times, xlim, ylim, radius, preset):
+    """Renders frames at given times into video file, runs also in worker processes
+    """
+    from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+    writer = FFMPEG_VideoWriter(filename, (WIDTH, HEIGHT), FPS, preset=preset)
+    try:
+        for frame in render_frames(trajectory, times, xlim, ylim, WIDTH, HEIGHT, radius):
+            writer.write_frame(frame)
+    finally:
+        writer.close()
+    return filename
+
+
+def concatenate_videos(filenames, filename):
+    """Joins video files of the same format without re-encoding (ffmpeg concat)
+    """
+    from moviepy.config import get_setting
+    directory = tempfile.mkdtemp()
+    try:
+        list_filename = os.path.join(directory, "videos.txt")
+        with open(list_filename, "w") as handle:
+            for part in filenames:
+                handle.write("file '{}'\n".format(os.path.abspath(part).replace("'", "'\\''")))
+        subprocess.run([get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-f", "concat",
+                        "-safe", "0", "-i", list_filename, "-c", "copy", filename], check=True)
+    finally:
+        shutil.rmtree(directory)
+
+
+def _video_mode(mode, callback):
+    """Returns video mode, "pretty" when not given and callback is used
+    """
+    if mode is None:
+        return "fast" if callback is None else "pretty"
+    if mode == "fast" and callback is not None:
+        raise ValueError("callback can be used only in pretty mode")
+    if mode not in ("fast", "pretty"):
+        raise ValueError("Unknown video mode: {}".format(mode))
+    return mode
+
+
+def trajectory_video(trajectory, filename, xlim=(-10, 10), ylim=(-10, 10), callback=None,
+                     axisOff=True, mode=None, radius=0.5, preset="ultrafast", jobs=1):
     """Create video of the track and saves it in working directory
 
     Parameters
@@ -44,19 +161,52 @@ def trajectory_video(trajectory, filename, xlim=(-10, 10), ylim=(-10, 10), callb
     ylim : touple(2) of float
         ylimits of the video
     callback:
-        what to
+        function called with matplotlib axis to draw additional content ("pretty" mode only)
     axisOff : bool
+        hides axis ("pretty" mode only)
+    mode : str, optional
+        "fast" draws discs directly into frames (see render_frames),
+        "pretty" draws each frame with matplotlib, including time in the title
+        (default "fast", "pretty" when callback is given)
+    radius : float
+        radius of the discs in track units ("fast" mode only)
+    preset : str
+        x264 encoder preset ("fast" mode only), slower presets give smaller files
+    jobs : int
+        number of worker processes ("fast" mode only), each renders one time
+        range and the parts are joined. None uses all processors.
 
     Returns
     --------
     saved mp4 video at fiven filepath
     """
-    WIDTH = 900
-    HEIGHT = 600
-    DPI = 150
-    FPS = 25
     DURATION = np.max(trajectory.time) - np.min(trajectory.time)
 
+    mode = _video_mode(mode, callback)
+    if mode == "fast":
+        times = frame_times(trajectory)
+        n_workers = os.cpu_count() if jobs is None else jobs
+        if n_workers <= 1:
+            _write_frames(trajectory, filename, times, xlim, ylim, radius, preset)
+            return
+        directory = tempfile.mkdtemp()
+        try:
+            chunks = [chunk for chunk in np.array_split(times, n_workers) if len(chunk) > 0]
+            parts = [os.path.join(directory, "part_{}.mp4".format(index))
+                     for index in range(len(chunks))]
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(_write_frames, trajectory, part, chunk, xlim, ylim, radius,
+                                           preset)
+                           for (part, chunk) in zip(parts, chunks)]
+                for future in futures:
+                    future.result()
+            concatenate_videos(parts, filename)
+        finally:
+            shutil.rmtree(directory)
+        return
+
+    import matplotlib.pyplot as plt
+    from moviepy.editor import VideoClip
     fig, axis = plt.subplots(figsize=(1.0 * WIDTH / DPI, 1.0 * HEIGHT / DPI), dpi=DPI)
 
     def make_frame(t):
@@ -70,9 +220,77 @@ def trajectory_video(trajectory, filename, xlim=(-10, 10), ylim=(-10, 10), callb
             callback(axis)
         if axisOff:
             plt.axis('off')
-        return mplfig_to_npimage(fig)
+        fig.canvas.draw()
+        return np.asarray(fig.canvas.buffer_rgba())[:, :, :3].copy()
 
     animation = VideoClip(make_frame, duration=DURATION)
     #animation.write_gif(filename, fps=FPS)
     animation.write_videofile(filename, fps=FPS)
-    pass
+    plt.close(fig)
+
+
+def _track_video(path, filename, xlim, ylim, radius, preset):
+    """Renders track file into video, runs in worker processes
+    """
+    trajectory = Track().load_from_csv(path)
+    return _write_frames(trajectory, filename, frame_times(trajectory), xlim, ylim, radius, preset)
+
+
+def _video_filenames(paths, output_dir=None):
+    """Returns video filenames of track files, see render_videos
+    """
+    targets = []
+    for path in paths:
+        (stem, extension) = os.path.splitext(os.path.basename(path))
+        directory = os.path.dirname(path) if output_dir is None else output_dir
+        targets.append((directory, stem, extension))
+    counts = collections.Counter((directory, stem) for (directory, stem, _) in targets)
+    filenames = [os.path.join(directory, stem + ("_" + extension[1:] if counts[(directory, stem)] > 1 else "")
+                              + ".mp4")
+                 for (directory, stem, extension) in targets]
+    duplicates = sorted(name for (name, count) in collections.Counter(filenames).items() if count > 1)
+    if duplicates:
+        raise ValueError("Several track files would be rendered into {}".format(", ".join(duplicates)))
+    return filenames
+
+
+def render_videos(paths, output_dir=None, xlim=(-10, 10), ylim=(-10, 10), radius=0.5,
+                  preset="ultrafast", jobs=None, progress=None):
+    """Renders videos of many track files in parallel
+
+    Each track file is rendered by one worker process in "fast" mode
+    (see trajectory_video) into a video with the same name and .mp4 extension.
+    Files differing only in extension (a.csv and a.npz) get it in the name
+    of the video (a_csv.mp4 and a_npz.mp4).
+
+    Parameters
+    ---------
+    paths : sequence of str
+        track files (text or binary)
+    output_dir : str
+        directory for the videos (default is next to the track files)
+    xlim, ylim, radius, preset :
+        same as in trajectory_video
+    jobs : int
+        number of worker processes, None uses all processors
+    progress : function
+        called with number of finished videos
+
+    Returns
+    --------
+    list of video filenames in order of paths
+
+    Raises
+    --------
+    ValueError
+        when several track files would be rendered into the same video
+    """
+    filenames = _video_filenames(paths, output_dir)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_track_video, path, filename, xlim, ylim, radius, preset)
+                   for (path, filename) in zip(paths, filenames)]
+        for (finished, future) in enumerate(as_completed(futures)):
+            future.result()
+            if progress is not None:
+                progress(finished + 1)
+    return filenames
@@ -1,16 +1,21 @@
 """Setup file for the motbox
 """
 
+import re
 import setuptools
 
 
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
+# the version is defined once, in the package
+with open("motbox/__init__.py", "r") as fh:
+    version = re.search(r'^__version__ = "(.+)"$', fh.read(), re.MULTILINE).group(1)
+
 
 setuptools.setup(
     name="motbox",
-    version="0.1.0",
+    version=version,
     author="Jiri Lukavsky",
     author_email="lukavsky@praha.psu.cas.cz",
     description="Package for moving object track generation and control from psychopy",
@@ -25,9 +30,13 @@ setuptools.setup(
       'scipy',
       'click'
     ],
+    extras_require={
+      'numba': ['numba']
+    },
     entry_points={
       'console_scripts': [
         'generate-straight-trajectory = motbox.commands:generate_straight_trajectory',
+        'render-trajectory-videos = motbox.commands:render_trajectory_videos',
       ]
     },
     classifiers=[
@@ -0,0 +1,118 @@
+"""Unittests for track descriptors
+"""
+
+import unittest, os, re
+import numpy as np
+from numpy import testing
+from scipy.spatial.distance import pdist, squareform
+from motbox import Track, Position, TrackStack, TrackBank, analytics, arenas
+from motbox.bank import save_bank
+
+bank_path = os.path.join("test", "test_analytics.npz")
+
+
+class TestAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(5)
+        self.opts = {"xlim": (-5, 5), "ylim": (-5, 5), "spacing": 1.}
+        self.time = np.arange(0, 2, 0.05)
+        self.positions = [Position().random_positions(5, (-5, 5), (-5, 5), 1.) for _ in range(3)]
+        self.stack = TrackStack().generate_vonmises(self.positions, 3., 8, self.opts, self.time)
+
+    def tearDown(self):
+        for f in os.listdir("test"):
+            if re.search(".*(.npz)", f):
+                os.remove(os.path.join("test", f))
+
+    def test_straight_movement(self):
+        track = Track()
+        track.time = np.arange(0, 1, 0.1)
+        track.x = np.outer(track.time, [2., 0.])
+        track.y = np.outer(track.time, [0., -1.])
+        track.n_objects = 2
+        testing.assert_allclose(analytics.speed(track), np.tile([2., 1.], (9, 1)))
+        testing.assert_allclose(analytics.heading(track)[0], [np.pi / 2, np.pi])
+        testing.assert_allclose(analytics.heading_change(track), 0., atol=1e-12)
+
+    def test_heading_change_wraps(self):
+        track = Track()
+        track.time = np.arange(3.)
+        # up-left, then up-right: change of +pi/2 across zero
+        track.x = np.array([[0.], [-1.], [0.]])
+        track.y = np.array([[0.], [1.], [2.]])
+        track.n_objects = 1
+        testing.assert_allclose(analytics.heading_change(track), [[np.pi / 2]])
+
+    def test_pairwise(self):
+        for chunk_elements in [1, 7, analytics.CHUNK_ELEMENTS]:
+            nearest = analytics.nearest_distance(self.stack, chunk_elements)
+            counts = analytics.crowding(self.stack, 2., chunk_elements)
+            self.assertEqual(nearest.shape, self.stack.x.shape)
+            for trial in [0, 2]:
+                for frame in [0, 17, len(self.time) - 1]:
+                    distances = squareform(pdist(np.column_stack(
+                        (self.stack.x[trial, frame], self.stack.y[trial, frame]))))
+                    np.fill_diagonal(distances, np.inf)
+                    testing.assert_allclose(nearest[trial, frame], np.min(distances, axis=1))
+                    testing.assert_array_equal(counts[trial, frame], np.sum(distances < 2., axis=1))
+        testing.assert_allclose(analytics.min_distance(self.stack), np.min(nearest, axis=-1))
+
+    def test_wall_contacts(self):
+        track = self.stack[0]
+        expected = (np.abs(track.x) > 4.) | (np.abs(track.y) > 4.)
+        testing.assert_array_equal(analytics.wall_contacts(track, 1., (-5, 5), (-5, 5)), expected)
+        track.meta = {"xlim": (-5, 5), "ylim": (-5, 5)}
+        testing.assert_array_equal(analytics.wall_contacts(track, margin=1.), expected)
+        track.meta = {}
+        with self.assertRaises(ValueError):
+            analytics.wall_contacts(track)
+
+    def test_describe_stack(self):
+        descriptors = analytics.describe(self.stack, 2., 0.5, (-5, 5), (-5, 5))
+        self.assertEqual(descriptors["mean_speed"].shape, (3, ))
+        testing.assert_allclose(descriptors["mean_speed"], 3., rtol=0.05)
+        for trial in range(3):
+            single = analytics.describe(self.stack[trial], 2., 0.5, (-5, 5), (-5, 5))
+            for (name, value) in single.items():
+                self.assertAlmostEqual(descriptors[name][trial], value)
+        self.assertNotIn("mean_crowding", analytics.describe(self.stack[0]))
+
+    def test_describe_bank(self):
+        tracks = self.stack.split()
+        other = TrackStack().generate_vonmises(self.positions[:2], 2., 8, self.opts,
+                                               np.arange(0, 1, 0.05)).split()
+        save_bank(bank_path, tracks + other + tracks[:1])
+        bank = TrackBank().load(bank_path)
+        stack = bank.stack(0, 3)
+        testing.assert_array_equal(stack.x, self.stack.x)
+        self.assertIsInstance(stack.x.base, np.memmap)
+        with self.assertRaises(ValueError):
+            bank.stack(2, 4)
+        descriptors = analytics.describe_bank(bank, radius=2., margin=0.5, chunk_trials=2)
+        self.assertEqual(len(descriptors["mean_speed"]), 6)
+        for trial in range(6):
+            single = analytics.describe(bank[trial], radius=2., margin=0.5)
+            for (name, value) in single.items():
+                self.assertAlmostEqual(descriptors[name][trial], value)
+
+    def test_describe_bank_arena(self):
+        """Arena comes from meta, trials without limits get NaN wall contacts
+        """
+        arena = arenas.Circle(5.)
+        positions = [Position().random_positions(5, None, None, 1., arena=arena) for _ in range(2)]
+        tracks = [Track().generate_vonmises(position, 3., 8, {"arena": arena, "spacing": 1.}, self.time)
+                  for position in positions]
+        unknown = self.stack.split()[0]
+        unknown.meta = {}
+        save_bank(bank_path, tracks + [unknown])
+        descriptors = analytics.describe_bank(TrackBank().load(bank_path), margin=0.5, chunk_trials=2)
+        for trial in range(2):
+            self.assertAlmostEqual(descriptors["wall_contact_fraction"][trial],
+                                   analytics.describe(tracks[trial], margin=0.5)["wall_contact_fraction"])
+        self.assertTrue(np.isnan(descriptors["wall_contact_fraction"][2]))
+        self.assertEqual(len(descriptors["mean_speed"]), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Unittests for arena shapes
+"""
+
+import json
+import unittest
+import warnings
+import numpy as np
+from numpy import testing
+from motbox import Track, Position, TrackStack, analytics, arenas, kernels
+from motbox.constraints import WallContact, evaluate, generate_constrained
+from motbox.stream import TrajectoryStream
+
+
+class TestArenas(unittest.TestCase):
+
+    def setUp(self):
+        self.annulus = arenas.Circle(10., obstacles=[arenas.Circle(3.)])
+        # L-shaped polygon with a square obstacle
+        self.polygon = arenas.Polygon([(-10, -10), (10, -10), (10, 0), (0, 0), (0, 10), (-10, 10)],
+                                      obstacles=[arenas.Rectangle((-7, -3), (-7, -3))])
+        self.time = np.arange(0, 5, 0.02)
+
+    def test_distance(self):
+        rng = np.random.default_rng(0)
+        for arena in [arenas.Rectangle((-10, 10), (-5, 5)), self.annulus, self.polygon]:
+            (xlim, ylim) = arena.bounds()
+            x = rng.uniform(xlim[0] - 1, xlim[1] + 1, 10000)
+            y = rng.uniform(ylim[0] - 1, ylim[1] + 1, 10000)
+            exact = arena.exact_distance(x, y)
+            cell = 20. / arena.resolution
+            testing.assert_allclose(arena.distance(x, y), exact, atol=cell)
+            near = np.abs(exact) < 0.5
+            testing.assert_allclose(arena.distance(x[near], y[near]), exact[near], atol=cell / 2)
+            self.assertEqual(arena.distance(x.reshape(100, 100), y.reshape(100, 100)).shape, (100, 100))
+
+    def test_contains(self):
+        testing.assert_array_equal(self.annulus.contains([0., 5., 9.9, 10.1], [0., 0., 0., 0.]),
+                                   [False, True, True, False])
+        testing.assert_array_equal(self.polygon.contains([-8., 5., 5., -5., -1.], [8., -5., 5., -5., -1.]),
+                                   [True, True, False, False, True])
+        self.assertAlmostEqual(self.annulus.area(), np.pi * (100 - 9), delta=1.)
+        self.assertAlmostEqual(self.polygon.area(), 300 - 16, delta=1.)
+
+    def test_describe(self):
+        for arena in [arenas.Rectangle((-10, 10), (-5, 5)), self.annulus, self.polygon]:
+            description = json.loads(json.dumps(arena.describe()))
+            rebuilt = arenas.from_description(description)
+            self.assertEqual(rebuilt.describe(), arena.describe())
+            testing.assert_array_equal(rebuilt.exact_distance([1., 5.], [2., 3.]),
+                                       arena.exact_distance([1., 5.], [2., 3.]))
+
+    def test_bounce(self):
+        rectangle = arenas.Rectangle((-10, 10), (-10, 10))
+        # outside the right wall: moving right is mirrored, moving back is kept
+        direction = rectangle.bounce(np.array([10.05, 10.05]), np.array([0., 0.]),
+                                     np.array([1., 4.]))
+        testing.assert_allclose(direction, [2 * np.pi - 1., 4.])
+        # inside the obstacle of the annulus, moving to its centre
+        # (normals are taken from the nearest grid node)
+        direction = self.annulus.bounce(np.array([2.95]), np.array([0.]), np.array([3 * np.pi / 2]))
+        testing.assert_allclose(direction, [np.pi / 2], atol=0.03)
+        direction = self.annulus.bounce(np.array([0.]), np.array([-10.05]), np.array([np.pi + 0.3]))
+        testing.assert_allclose(direction, [2 * np.pi - 0.3], atol=0.03)
+
+    def test_random_positions(self):
+        for method in ["rejection", "grid"]:
+            position = Position().random_positions(10, None, None, 1.5, rng=np.random.default_rng(1),
+                                                   method=method, arena=self.polygon)
+            self.assertTrue(np.all(self.polygon.exact_distance(position.x, position.y) < 0))
+            self.assertTrue(position.is_min_distance_complied(1.5))
+        position = Position().random_positions(100, None, None, 0., method="grid", arena=self.annulus)
+        self.assertTrue(np.all(self.annulus.contains(position.x, position.y)))
+        with self.assertRaises(ValueError):
+            arenas.Circle(1., obstacles=[arenas.Circle(2.)]).sample(5, np.random.default_rng(0))
+
+    def test_generate(self):
+        for arena in [self.annulus, self.polygon]:
+            opts = {"arena": arena, "spacing": 1.}
+            position = Position().random_positions(8, None, None, 1., rng=np.random.default_rng(2),
+                                                   arena=arena)
+            track = Track().generate_vonmises(position, 4., 8, opts, self.time,
+                                              rng=np.random.default_rng(3))
+            step = 4. * track.timestep()
+            # objects return from the walls after at most a few steps
+            self.assertLess(np.max(arena.exact_distance(track.x, track.y)), 3 * step)
+            self.assertGreater(np.mean(arena.exact_distance(track.x, track.y) < 0), 0.99)
+            self.assertEqual(track.meta["arena"], arena.describe())
+            contacts = analytics.wall_contacts(track, margin=1.)
+            testing.assert_array_equal(contacts, arena.distance(track.x, track.y) > -1.)
+            self.assertIn("wall_contact_fraction", analytics.describe(track))
+
+    def test_batch_and_stream(self):
+        """Batches and streams bounce from the arena as Track does
+        """
+        opts = {"arena": self.annulus, "spacing": 1.}
+        positions = [Position().random_positions(6, None, None, 1., rng=np.random.default_rng(seed),
+                                                 arena=self.annulus) for seed in range(3)]
+        stack = TrackStack().generate_trajectory(positions, 4., opts, self.time, direction=1.)
+        for (position, track) in zip(positions, stack.split()):
+            single = Track().generate_trajectory(Position(position.x, position.y), 4., opts,
+                                                 self.time, direction=np.ones(6))
+            testing.assert_allclose(track.x, single.x)
+            testing.assert_allclose(track.y, single.y)
+        track = Track().generate_vonmises(Position(positions[0].x, positions[0].y), 4., 8, opts,
+                                          self.time, rng=np.random.default_rng(5))
+        stream = TrajectoryStream().start(positions[0], 4., opts, track.timestep(), kappa=8,
+                                          rng=np.random.default_rng(5))
+        chunk = next(stream.chunks(len(self.time)))
+        testing.assert_allclose(chunk.x, track.x)
+        self.assertEqual(chunk.meta["arena"], self.annulus.describe())
+
+    def test_constraints(self):
+        opts = {"arena": self.annulus, "spacing": 1.}
+        track = generate_constrained(6, 4., 8, opts, self.time, [WallContact([0, 1], 0.5)],
+                                     rng=np.random.default_rng(0))
+        self.assertIsNone(evaluate(track, [WallContact([0, 1], 0.5)], opts))
+        # next to the obstacle for the whole trial
+        track = Track()
+        track.time = self.time
+        track.x = np.tile([3.2, 6.], (len(self.time), 1))
+        track.y = np.zeros((len(self.time), 2))
+        track.n_objects = 2
+        self.assertEqual(evaluate(track, [WallContact([0], 1.)], opts), "wall_contact")
+        self.assertIsNone(evaluate(track, [WallContact([1], 1.)], opts))
+
+    def test_abstract(self):
+        class Incomplete(arenas.Arena):
+            def _distance(self, x, y):
+                return np.hypot(x, y) - 1.
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_unsupported(self):
+        position = Position().random_positions(4, None, None, 1., arena=self.annulus)
+        with self.assertRaises(ValueError):
+            Track().generate_trajectory(position, 3., {"arena": self.annulus, "spacing": 1.,
+                                                      "collisions": "events"}, self.time)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertFalse(kernels.use_kernel({"arena": self.annulus, "backend": "numba"}))
+        self.assertEqual(len(caught), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Unittests for track banks
+"""
+
+import unittest, os, re
+import numpy as np
+from numpy import testing
+from motbox import Track, Position, TrackBank
+from motbox.bank import BankWriter, save_bank
+
+track_data_path = os.path.join("test", "tracks", "T220.csv")
+bank_path = os.path.join("test", "test_bank.npz")
+
+
+class TestTrackBank(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(3)
+        opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing": 1.}
+        self.tracks = [Track().load_from_csv(track_data_path)]
+        for n in [3, 5, 8]:
+            self.tracks.append(Track().generate_vonmises(
+                Position().random_positions(n, (-10, 10), (-10, 10), 1), 2., 8, opts,
+                np.arange(0, n / 2., 0.1)))
+
+    def tearDown(self):
+        for f in os.listdir("test"):
+            if re.search(".*(.npz)", f):
+                os.remove(os.path.join("test", f))
+
+    def test_random_access(self):
+        save_bank(bank_path, self.tracks)
+        bank = TrackBank().load(bank_path)
+        self.assertEqual(len(bank), 4)
+        for trial in [2, 0, 3, 1, -1]:
+            testing.assert_array_equal(bank[trial].x, self.tracks[trial].x)
+            testing.assert_array_equal(bank[trial].y, self.tracks[trial].y)
+            testing.assert_array_equal(bank[trial].time, self.tracks[trial].time)
+        self.assertEqual(bank[3].meta["kappa"], 8)
+        self.assertEqual(bank.meta[2]["n_objects"], 5)
+        with self.assertRaises(IndexError):
+            bank[4]
+
+    def test_writer_float32(self):
+        with BankWriter(bank_path, dtype=np.float32) as writer:
+            for track in self.tracks:
+                writer.append(track)
+        bank = TrackBank().load(bank_path, mmap_mode=None)
+        tracks = list(bank)
+        self.assertEqual(tracks[1].x.dtype, np.float32)
+        testing.assert_allclose(tracks[0].y, self.tracks[0].y, rtol=1e-6)
+
+    def test_copy_on_write(self):
+        save_bank(bank_path, self.tracks)
+        track = TrackBank().load(bank_path)[1]
+        track.move((1., 1.))
+        testing.assert_array_equal(TrackBank().load(bank_path)[1].x, self.tracks[1].x)
@@ -0,0 +1,56 @@
+"""Unittests for batched trajectory generation
+"""
+
+import unittest
+import numpy as np
+from numpy import testing
+from motbox import Track, Position, TrackStack
+
+
+class TestTrackStack(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(42)
+        self.opts = {"xlim": (-5, 5), "ylim": (-5, 5), "spacing": 1.5}
+        self.time = np.arange(0, 5, 0.05)
+        self.positions = [Position().random_positions(6, (-5, 5), (-5, 5), 1.5) for _ in range(4)]
+        self.direction = np.random.uniform(0, 2 * np.pi, size=(4, 6))
+
+    def test_matches_single_tracks(self):
+        """Each trial of the stack equals a separately generated Track
+        """
+        stack = TrackStack().generate_trajectory(
+            self.positions, 3., self.opts, self.time, self.direction.copy())
+        for index, position in enumerate(self.positions):
+            single = Track().generate_trajectory(
+                Position(position.x, position.y), 3., self.opts, self.time,
+                self.direction[index].copy())
+            testing.assert_allclose(stack[index].x, single.x)
+            testing.assert_allclose(stack[index].y, single.y)
+
+    def test_split(self):
+        stack = TrackStack().generate_vonmises(self.positions, 3., 8, self.opts, self.time)
+        tracks = stack.split()
+        self.assertEqual(len(tracks), 4)
+        self.assertEqual(tracks[0].x.shape, (len(self.time), 6))
+        tracks[0].move((1., 1.))
+        self.assertFalse(np.allclose(tracks[0].x, stack.x[0]))
+
+    def test_from_tracks(self):
+        stack = TrackStack().generate_vonmises(self.positions, 3., 8, self.opts, self.time)
+        restacked = TrackStack().from_tracks(stack.split())
+        testing.assert_array_equal(restacked.x, stack.x)
+        self.assertEqual(len(restacked), 4)
+
+    def test_different_object_counts(self):
+        positions = [Position((0, 2), (0, 2)), Position((0, 2, 4), (0, 2, 4))]
+        with self.assertRaises(ValueError):
+            TrackStack().generate_trajectory(positions, 1., self.opts, self.time)
+
+    def test_time_interpolate(self):
+        stack = TrackStack().generate_vonmises(self.positions, 3., 8, self.opts, self.time)
+        newtime = np.arange(0, 5, 1 / 60.)
+        tracks = stack.split()
+        stack.time_interpolate(newtime)
+        tracks[2].time_interpolate(newtime)
+        testing.assert_allclose(stack.x[2], tracks[2].x)
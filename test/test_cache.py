@@ -0,0 +1,140 @@
+"""Unittests for the trajectory cache
+"""
+
+import unittest, os, shutil, tempfile, json
+import numpy as np
+from numpy import testing
+from motbox import Track, Position
+from motbox.stats import GenerationStats
+from motbox import cache as cache_module
+from motbox import generator
+from motbox.cache import TrajectoryCache
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = TrajectoryCache(self.directory)
+        self.opts = {"xlim": (-5, 5), "ylim": (-5, 5), "spacing": 1.}
+        self.time = np.arange(0, 2, 0.05)
+        self.position = Position().random_positions(5, (-5, 5), (-5, 5), 1.,
+                                                    rng=np.random.default_rng(0))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generate(self, seed, speed=3., bit_generator=np.random.PCG64, stats=None):
+        rng = np.random.Generator(bit_generator(seed))
+        position = Position(self.position.x, self.position.y)
+        track = Track().generate_vonmises(position, speed, 8, self.opts, self.time, rng=rng,
+                                          stats=stats, cache=self.cache)
+        return (track, position, rng)
+
+    def test_hit_is_identical(self):
+        for bit_generator in [np.random.PCG64, np.random.MT19937]:
+            (first, first_position, first_rng) = self.generate(3, bit_generator=bit_generator)
+            (second, second_position, second_rng) = self.generate(3, bit_generator=bit_generator)
+            testing.assert_array_equal(second.x, first.x)
+            testing.assert_array_equal(second.y, first.y)
+            testing.assert_array_equal(second.time, first.time)
+            testing.assert_array_equal(second_position.xy, first_position.xy)
+            # random generator continues as after generation
+            self.assertEqual(second_rng.random(), first_rng.random())
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_hit_is_same_as_uncached(self):
+        (cached, _, _) = self.generate(4)
+        (cached, _, rng) = self.generate(4)
+        plain_rng = np.random.default_rng(4)
+        plain = Track().generate_vonmises(Position(self.position.x, self.position.y), 3., 8,
+                                          self.opts, self.time, rng=plain_rng)
+        testing.assert_array_equal(cached.x, plain.x)
+        self.assertEqual(rng.random(), plain_rng.random())
+
+    def test_key(self):
+        self.generate(1)
+        self.generate(2)
+        self.generate(1, speed=4.)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 3))
+        key = self.cache.key("vonmises", {"time": self.time}, np.random.default_rng(1))
+        self.assertEqual(key, self.cache.key("vonmises", {"time": self.time.copy()},
+                                             np.random.default_rng(1)))
+        self.assertNotEqual(key, self.cache.key("vonmises", {"time": self.time[:-1]},
+                                                np.random.default_rng(1)))
+        original = cache_module.ALGORITHM
+        try:
+            cache_module.ALGORITHM = original + 1
+            self.assertNotEqual(key, self.cache.key("vonmises", {"time": self.time},
+                                                    np.random.default_rng(1)))
+        finally:
+            cache_module.ALGORITHM = original
+
+    def test_global_random(self):
+        tracks = []
+        for _ in range(2):
+            np.random.seed(7)
+            tracks.append(generator.generate_straight_trajectory(
+                n=3, time=2, save=False, cache=self.cache))
+            tracks.append(np.random.random())
+        testing.assert_array_equal(tracks[2].x, tracks[0].x)
+        self.assertEqual(tracks[3], tracks[1])
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_stats(self):
+        stats = GenerationStats()
+        self.generate(5, stats=stats)
+        (track, _, _) = self.generate(5, stats=stats)
+        self.assertEqual(stats.counts["cache_misses"], 1)
+        self.assertEqual(stats.counts["cache_hits"], 1)
+        self.assertIs(track.stats, stats)
+
+    def test_bank(self):
+        params = {"n": 3, "time": 2, "seed": 5, "file_format": None}
+        tracks = generator.generate_straight_trajectory_bank(4, cache=self.cache, **params)
+        stats = GenerationStats()
+        cached = generator.generate_straight_trajectory_bank(4, cache=self.cache, stats=stats,
+                                                             **params)
+        self.assertEqual(stats.counts["cache_hits"], 4)
+        for (first, second) in zip(tracks, cached):
+            testing.assert_array_equal(second.x, first.x)
+            self.assertEqual(second.meta["trial"], first.meta["trial"])
+
+    def test_eviction(self):
+        self.generate(0)
+        (first, ) = [path for (_, _, path) in self.cache._entries()]
+        entry = self.cache.size()
+        self.cache.max_size = 2 * entry + entry // 2
+        self.generate(1)
+        (second, ) = [path for (_, _, path) in self.cache._entries() if path != first]
+        os.utime(first, (1, 1))
+        os.utime(second, (2, 2))
+        # hit marks the first entry as recently used
+        self.generate(0)
+        self.generate(2)
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertLessEqual(self.cache.size(), self.cache.max_size)
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_damaged_entry(self):
+        self.generate(6)
+        (path, ) = [entry[2] for entry in self.cache._entries()]
+        with open(path, "wb") as f:
+            f.write(b"damaged")
+        (track, _, _) = self.generate(6)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(track.x.shape, (len(self.time), 5))
+
+    def test_rng_state_is_serializable(self):
+        for rng in [np.random.default_rng(2), np.random.Generator(np.random.MT19937(2)), None]:
+            state = json.loads(json.dumps(cache_module.rng_state(rng), default=lambda value: value.tolist()))
+            expected = (np.random.random() if rng is None else rng.random())
+            cache_module.set_rng_state(rng, state)
+            self.assertEqual(np.random.random() if rng is None else rng.random(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Unittests for collision grouping
+"""
+
+import unittest
+import numpy as np
+from numpy import testing
+from scipy.spatial import distance
+from scipy.sparse import csgraph
+from motbox import collisions
+
+
+def reference_bounce(x, y, direction, spacing):
+    """Original dense implementation of Track.bounce_objects
+    """
+    coords = np.stack((x, y), axis=1)
+    close = distance.squareform(distance.pdist(coords)) < spacing
+    n_groups, grouping = csgraph.connected_components(close)
+    for group_code in range(n_groups):
+        count = np.sum(grouping == group_code)
+        if count == 2:
+            direction[grouping == group_code] = direction[grouping == group_code][::-1]
+        if count > 2:
+            direction[grouping == group_code] = np.mod(direction[grouping == group_code] + np.pi, 2 * np.pi)
+    return direction
+
+
+class TestCollisions(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(7)
+        self.x = np.random.uniform(-10, 10, size=(5, 200))
+        self.y = np.random.uniform(-10, 10, size=(5, 200))
+        self.direction = np.random.uniform(0, 2 * np.pi, size=(5, 200))
+
+    def test_grid_equals_dense(self):
+        dense = collisions.close_pairs(self.x, self.y, 1.2, method="dense")
+        grid = collisions.close_pairs(self.x, self.y, 1.2, method="grid")
+        self.assertGreater(len(dense[0]), 0)
+        self.assertEqual(set(zip(*dense)), set(zip(*grid)))
+
+    def test_bounce_equals_reference(self):
+        for method in ["dense", "grid"]:
+            for arena in range(5):
+                expected = reference_bounce(self.x[arena], self.y[arena], self.direction[arena].copy(), 1.2)
+                result = collisions.bounce_groups(self.x[arena], self.y[arena],
+                                                  self.direction[arena].copy(), 1.2, method)
+                testing.assert_array_equal(result, expected)
+
+    def test_bounce_arenas_are_independent(self):
+        result = collisions.bounce_groups(self.x, self.y, self.direction.copy(), 1.2, "grid")
+        for arena in range(5):
+            expected = reference_bounce(self.x[arena], self.y[arena], self.direction[arena].copy(), 1.2)
+            testing.assert_array_equal(result[arena], expected)
+
+    def test_no_spacing(self):
+        for method in ["dense", "grid"]:
+            for spacing in [0., -1.]:
+                (first, second) = collisions.close_pairs(self.x, self.y, spacing, method)
+                self.assertEqual((len(first), len(second)), (0, 0))
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            collisions.close_pairs(self.x, self.y, 1.2, method="octree")
@@ -0,0 +1,65 @@
+"""Unittests for constraint-targeted trial generation
+"""
+
+import unittest
+import numpy as np
+from motbox import Track
+from motbox.constraints import (MinDistance, MinEncounters, WallContact, ConstraintReport,
+                                evaluate, generate_constrained)
+
+
+def static_track(x, y, n_frames=50, frequency=10.):
+    track = Track()
+    track.time = np.arange(n_frames) / frequency
+    track.x = np.tile(np.asarray(x, dtype=float), (n_frames, 1))
+    track.y = np.tile(np.asarray(y, dtype=float), (n_frames, 1))
+    track.n_objects = len(x)
+    return track
+
+
+class TestConstraints(unittest.TestCase):
+
+    def setUp(self):
+        self.opts = {"xlim": (-8, 8), "ylim": (-8, 8), "spacing": 1.5}
+        self.time = np.arange(0, 4, 0.02)
+
+    def constraints(self):
+        return [MinDistance([0, 1], 1.3), MinEncounters([0, 1], 2.5, 2), WallContact([0, 1], 0.5)]
+
+    def test_accepted_trial(self):
+        report = ConstraintReport()
+        track = generate_constrained(6, 5., 8, self.opts, self.time, self.constraints(),
+                                     rng=np.random.default_rng(0), report=report)
+        self.assertIsNone(evaluate(track, self.constraints(), self.opts))
+        self.assertEqual(track.x.shape, (len(self.time), 6))
+        self.assertEqual(report.accepted, 1)
+        self.assertEqual(report.candidates, track.meta["candidates"])
+        self.assertEqual(report.candidates, 1 + sum(report.rejected.values()))
+        self.assertEqual(report.frames - report.wasted_frames, len(self.time))
+
+    def test_wall_contact(self):
+        track = static_track([7.5, 0.], [0., 0.])
+        self.assertEqual(evaluate(track, [WallContact([0], 1.)], self.opts), "wall_contact")
+        self.assertIsNone(evaluate(track, [WallContact([1], 1.)], self.opts))
+        self.assertIsNone(evaluate(track, [WallContact([0], 5.)], self.opts))
+
+    def test_early_rejection(self):
+        """Unreachable number of encounters stops the check early
+        """
+        constraint = MinEncounters([0], 2., 3)
+        constraint.start(2, 6, 0.1, self.opts)
+        # 5 remaining frames allow 3 encounters, 4 frames only 2
+        self.assertTrue(constraint.update(0, np.array([0., 5.]), np.array([0., 0.])))
+        self.assertFalse(constraint.update(1, np.array([0., 5.]), np.array([0., 0.])))
+
+    def test_min_distance(self):
+        track = static_track([0., 1., 5.], [0., 0., 0.])
+        self.assertEqual(evaluate(track, [MinDistance([0], 1.5)], self.opts), "min_distance")
+        self.assertIsNone(evaluate(track, [MinDistance([2], 1.5)], self.opts))
+
+    def test_impossible(self):
+        with self.assertRaises(ValueError):
+            generate_constrained(4, 5., 8, self.opts, self.time, [MinDistance([0], 20.)],
+                                 rng=np.random.default_rng(0), max_candidates=3)
+        with self.assertRaises(ValueError):
+            generate_constrained(4, 5., 8, self.opts, [], self.constraints())
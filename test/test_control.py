@@ -0,0 +1,51 @@
+"""Unittests for Puppeteer
+"""
+
+import unittest, os
+import numpy as np
+from numpy import testing
+from motbox import Track, Puppeteer
+
+track_data_path = os.path.join("test", "tracks", "T220.csv")
+
+
+class Stimulus(object):
+    """Stands in for PsychoPy stimulus
+    """
+    def __init__(self):
+        self.pos = (0., 0.)
+        self.name = "stimulus"
+
+
+class TestPuppeteer(unittest.TestCase):
+
+    def setUp(self):
+        self.puppeteer = Puppeteer()
+        self.puppeteer.track = Track().load_from_csv(track_data_path)
+        self.puppeteer.clone_template_psychopy(Stimulus(), 8)
+
+    def test_update_positions(self):
+        self.puppeteer.update_positions_psychopy(1.)
+        self.assertAlmostEqual(self.puppeteer.objects[3].pos[0], self.puppeteer.track.x[100, 3])
+
+    def test_prepare_frames(self):
+        frames = self.puppeteer.prepare_frames(144, duration=2.)
+        self.assertEqual(frames.shape, (289, 8, 2))
+        self.puppeteer.update_frame_psychopy(144)
+        (x, y) = self.puppeteer.track.position_for_time(1.)
+        self.assertAlmostEqual(self.puppeteer.objects[5].pos[0], x[0, 5])
+        self.assertAlmostEqual(self.puppeteer.objects[5].pos[1], y[0, 5])
+        self.puppeteer.update_frame_psychopy(1000)
+        testing.assert_allclose(self.puppeteer.objects[0].pos, frames[-1, 0])
+
+    def test_frame_report(self):
+        self.puppeteer.prepare_frames(100, duration=1.)
+        timestamps = np.arange(101) * 0.01
+        timestamps[50:] += 0.02
+        for frame in range(101):
+            self.puppeteer.update_frame_psychopy(frame, timestamp=timestamps[frame])
+        report = self.puppeteer.frame_report()
+        self.assertEqual(report["n_recorded"], 101)
+        self.assertEqual(report["n_dropped"], 2)
+        self.assertEqual(report["dropped_after"], [49])
+        self.assertAlmostEqual(report["max_interval"], 0.03)
@@ -0,0 +1,64 @@
+"""Unittests for event-driven collisions
+"""
+
+import unittest
+import numpy as np
+from numpy import testing
+from scipy.spatial.distance import pdist
+from motbox import Track, Position, TrackStack
+from motbox import events
+
+
+class TestEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.opts = {"xlim": (-5, 5), "ylim": (-5, 5), "spacing": 2.}
+
+    def test_wall(self):
+        """Object reflects from the right wall within the step
+        """
+        (x, y, direction) = events.advance([4.], [0.], [np.pi / 2], 3., self.opts)
+        testing.assert_allclose(x, [3.])
+        testing.assert_allclose(y, [0.], atol=1e-12)
+        testing.assert_allclose(direction, [3 * np.pi / 2])
+
+    def test_corner(self):
+        (x, y, direction) = events.advance([4.], [4.], [np.pi / 4], 2 * np.sqrt(2), self.opts)
+        testing.assert_allclose(x, [4.])
+        testing.assert_allclose(y, [4.])
+        testing.assert_allclose(direction, [5 * np.pi / 4])
+
+    def test_head_on(self):
+        """Objects moving against each other bounce back at spacing distance
+        """
+        (x, y, direction) = events.advance([-1.5, 1.5], [0., 0.], [np.pi / 2, 3 * np.pi / 2], 2.,
+                                           self.opts)
+        testing.assert_allclose(x, [-2.5, 2.5])
+        testing.assert_allclose(direction, [3 * np.pi / 2, np.pi / 2])
+
+    def test_coarse_track(self):
+        """Spacing and arena hold at every frame even with large steps
+        """
+        opts = dict(self.opts, collisions="events")
+        position = Position().random_positions(6, (-5, 5), (-5, 5), 2., rng=np.random.default_rng(1))
+        track = Track().generate_vonmises(position, 8., 4, opts, np.arange(0, 20, 0.25),
+                                          rng=np.random.default_rng(2))
+        self.assertTrue(np.all(np.abs(track.x) <= 5 + 1e-9))
+        self.assertTrue(np.all(np.abs(track.y) <= 5 + 1e-9))
+        for frame in range(len(track.time)):
+            distances = pdist(np.column_stack((track.x[frame], track.y[frame])))
+            self.assertTrue(np.all(distances >= 2 - 1e-9))
+        steps = np.hypot(np.diff(track.x, axis=0), np.diff(track.y, axis=0))
+        self.assertTrue(np.all(steps <= 2 + 1e-9))
+
+    def test_stack_matches_track(self):
+        opts = dict(self.opts, collisions="events")
+        positions = [Position().random_positions(5, (-5, 5), (-5, 5), 2., rng=np.random.default_rng(seed))
+                     for seed in range(3)]
+        direction = np.random.default_rng(4).uniform(0, 2 * np.pi, size=(3, 5))
+        time = np.arange(0, 5, 0.2)
+        stack = TrackStack().generate_trajectory(positions, 6., opts, time, direction.copy())
+        for (index, position) in enumerate(positions):
+            track = Track().generate_trajectory(position, 6., opts, time, direction[index].copy())
+            testing.assert_allclose(stack[index].x, track.x)
+            testing.assert_allclose(stack[index].y, track.y)
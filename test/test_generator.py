@@ -0,0 +1,52 @@
+"""Unittests for generator shorthands
+"""
+
+import unittest, os, re
+import numpy as np
+from numpy import testing
+from motbox import TrackBank
+from motbox import generator
+
+
+class TestGenerator(unittest.TestCase):
+
+    def tearDown(self):
+        for f in os.listdir("test"):
+            if re.search(".*(.csv)|(.npz)", f):
+                os.remove(os.path.join("test", f))
+
+    def test_bank_is_reproducible(self):
+        params = {"n": 4, "speed": 2, "time": 2, "seed": 11, "file_format": None}
+        serial = generator.generate_straight_trajectory_bank(6, jobs=1, **params)
+        parallel = generator.generate_straight_trajectory_bank(6, jobs=2, **params)
+        # 0 uses all processors as in the command line
+        all_processors = generator.generate_straight_trajectory_bank(6, jobs=0, **params)
+        self.assertEqual(len(parallel), 6)
+        for (first, second, third) in zip(serial, parallel, all_processors):
+            testing.assert_array_equal(first.x, second.x)
+            testing.assert_array_equal(first.x, third.x)
+        self.assertFalse(np.allclose(serial[0].x, serial[1].x))
+        self.assertEqual(serial[3].meta["trial"], 3)
+
+    def test_bank_float32(self):
+        params = {"n": 3, "time": 2, "seed": 5, "file_format": None}
+        tracks = generator.generate_straight_trajectory_bank(4, **params)
+        compact = generator.generate_straight_trajectory_bank(4, dtype=np.float32, **params)
+        self.assertEqual(compact[2].x.dtype, np.float32)
+        testing.assert_allclose(compact[2].y, tracks[2].y, atol=1e-5)
+        self.assertIs(compact[3].time, compact[0].time)
+
+    def test_bank_file(self):
+        finished = []
+        paths = generator.generate_straight_trajectory_bank(
+            5, n=3, seed=1, jobs=2, path="test", filename="test_bank", progress=finished.append)
+        bank = TrackBank().load(paths[0])
+        self.assertEqual(len(bank), 5)
+        self.assertEqual([track.meta["trial"] for track in bank], list(range(5)))
+        self.assertEqual(finished[-1], 5)
+
+    def test_trial_files(self):
+        paths = generator.generate_straight_trajectory_bank(
+            3, n=2, seed=1, path="test", filename="test_trial", file_format="csv")
+        self.assertEqual(paths, [os.path.join("test", "test_trial_{:05d}.csv".format(k)) for k in [1, 2, 3]])
+        self.assertTrue(all(os.path.exists(path) for path in paths))
@@ -0,0 +1,43 @@
+"""Unittests for lazy imports of heavy dependencies
+"""
+
+import subprocess, sys, unittest
+
+HEAVY = ("scipy", "matplotlib", "moviepy", "numba")
+
+
+def loaded_modules(statement):
+    """Runs statement in a fresh interpreter, returns heavy modules it loaded
+    """
+    code = "import sys; {}; print(','.join(name for name in {!r} if name in sys.modules))".format(
+        statement, HEAVY)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return [name for name in output.stdout.strip().split(",") if name]
+
+
+class TestImports(unittest.TestCase):
+
+    def test_import_motbox(self):
+        self.assertEqual(loaded_modules("import motbox"), [])
+
+    def test_playback_path(self):
+        statement = ("import motbox; track = motbox.Track().load_from_csv('test/tracks/T220.csv'); "
+                     "track.position_for_time(1.); motbox.Puppeteer")
+        self.assertEqual(loaded_modules(statement), [])
+
+    def test_generator_without_plots(self):
+        statement = ("from motbox.generator import generate_straight_trajectory; "
+                     "generate_straight_trajectory(n=3, time=1, save=False, plot=False, video=False)")
+        loaded = loaded_modules(statement)
+        self.assertNotIn("matplotlib", loaded)
+        self.assertNotIn("moviepy", loaded)
+
+    def test_lazy_classes(self):
+        self.assertEqual(loaded_modules("from motbox import TrackBank, TrackStack, TrajectoryStream"), [])
+        self.assertEqual(loaded_modules("import motbox; motbox.TrackBank"), [])
+        with self.assertRaises(subprocess.CalledProcessError):
+            loaded_modules("import motbox; motbox.Missing")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Unittests for the compiled simulation kernel
+"""
+
+import unittest
+import warnings
+import numpy as np
+from numpy import testing
+from motbox import Track, Position
+from motbox import kernels
+
+
+@unittest.skipUnless(kernels.AVAILABLE, "numba is not installed")
+class TestKernels(unittest.TestCase):
+
+    def setUp(self):
+        self.opts = {"xlim": (-4, 4), "ylim": (-4, 4), "spacing": 1.5}
+        self.position = Position().random_positions(12, (-4, 4), (-4, 4), 1.5,
+                                                    rng=np.random.default_rng(0), method="grid")
+        self.time = np.arange(0, 10, 0.01)
+
+    def generate(self, backend, speed=5.):
+        opts = dict(self.opts, backend=backend)
+        return Track().generate_vonmises(Position(self.position.x, self.position.y), speed, 8, opts,
+                                         self.time, rng=np.random.default_rng(1))
+
+    def test_identical_vonmises(self):
+        """Dense arena with crowds gives the same track with both backends
+        """
+        track = self.generate("numba")
+        expected = self.generate("numpy")
+        testing.assert_array_equal(track.x, expected.x)
+        testing.assert_array_equal(track.y, expected.y)
+
+    def test_identical_speeds(self):
+        speed = tuple(np.linspace(1, 6, 12))
+        testing.assert_array_equal(self.generate("auto", speed).x, self.generate("numpy", speed).x)
+
+    def test_identical_straight(self):
+        direction = np.random.default_rng(2).uniform(0, 2 * np.pi, 12)
+        tracks = [Track().generate_trajectory(Position(self.position.x, self.position.y), 4.,
+                                              dict(self.opts, backend=backend), self.time,
+                                              direction.copy())
+                  for backend in ("numpy", "numba")]
+        testing.assert_array_equal(tracks[0].x, tracks[1].x)
+
+    def test_fallback(self):
+        kernels.AVAILABLE = False
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                self.assertFalse(kernels.use_kernel({"backend": "numba"}))
+            self.assertEqual(len(caught), 1)
+            self.assertFalse(kernels.use_kernel({"backend": "auto"}))
+        finally:
+            kernels.AVAILABLE = True
+        with self.assertRaises(ValueError):
+            kernels.use_kernel({"backend": "cython"})
@@ -0,0 +1,130 @@
+"""Unittests for motion models
+"""
+
+import json
+import unittest
+import numpy as np
+from numpy import testing
+from motbox import Track, Position, analytics, kernels, models
+from motbox.stats import GenerationStats
+
+
+class TestModels(unittest.TestCase):
+
+    def setUp(self):
+        self.opts = {"xlim": (-5, 5), "ylim": (-5, 5), "spacing": 1.}
+        # no walls and no collisions
+        self.open = {"xlim": (-1e6, 1e6), "ylim": (-1e6, 1e6), "spacing": 0., "collisions": "dense"}
+        self.time = np.arange(0, 4, 0.01)
+        self.position = Position().random_positions(6, (-5, 5), (-5, 5), 1.,
+                                                     rng=np.random.default_rng(0))
+
+    def generate(self, model, opts=None, speed=3., n_objects=None, seed=1):
+        position = (Position(self.position.x, self.position.y) if n_objects is None
+                    else Position(np.zeros(n_objects), np.zeros(n_objects)))
+        return Track().generate_trajectory(position, speed, self.opts if opts is None else opts,
+                                           self.time, model=model, rng=np.random.default_rng(seed))
+
+    def test_vonmises_same_as_jitter_func(self):
+        rng = np.random.default_rng(4)
+        def jitter_func():
+            return rng.vonmises(mu=0, kappa=8, size=6)
+        expected = Track().generate_trajectory(Position(self.position.x, self.position.y), 3.,
+                                               self.opts, self.time, jitter_func=jitter_func, rng=rng)
+        track = self.generate(models.VonMises(8), seed=4)
+        testing.assert_array_equal(track.x, expected.x)
+        testing.assert_array_equal(track.y, expected.y)
+
+    def test_meta(self):
+        model = models.Combined(models.SpeedChanges(1., (0.5, 2.)), models.Curvature([0.1] * 6),
+                                models.VonMises(20))
+        track = self.generate(model)
+        description = json.loads(json.dumps(track.meta["model"]))
+        self.assertEqual(description["models"][1], {"name": "curvature", "curvature": [0.1] * 6})
+        self.assertEqual(models.from_description(description).describe(), model.describe())
+        # the recorded seed and model reproduce the track
+        seed = json.loads(json.dumps(track.meta["seed"]))
+        self.assertEqual(seed, {"entropy": 1, "spawn_key": []})
+        rng = np.random.default_rng(np.random.SeedSequence(**seed))
+        rebuilt = Track().generate_trajectory(Position(self.position.x, self.position.y), 3.,
+                                              self.opts, self.time, rng=rng,
+                                              model=models.from_description(description))
+        testing.assert_array_equal(rebuilt.x, track.x)
+        testing.assert_array_equal(rebuilt.y, track.y)
+        # nothing is recorded for the global numpy.random
+        track = Track().generate_trajectory(Position(self.position.x, self.position.y), 3.,
+                                            self.opts, self.time, model=model)
+        self.assertNotIn("seed", track.meta)
+
+    def test_straight(self):
+        track = self.generate(models.MotionModel(), self.open)
+        testing.assert_allclose(analytics.speed(track), 3.)
+        testing.assert_allclose(analytics.heading_change(track), 0., atol=1e-9)
+
+    def test_curvature(self):
+        track = self.generate(models.Curvature(0.5), self.open)
+        step = 3. * track.timestep()
+        testing.assert_allclose(analytics.speed(track), 3.)
+        testing.assert_allclose(analytics.heading_change(track), 0.5 * step)
+
+    def test_brownian(self):
+        track = self.generate(models.Brownian(2.), self.open, n_objects=200)
+        (dx, dy) = analytics.displacement(track)
+        expected = 2. * np.sqrt(track.timestep())
+        self.assertAlmostEqual(np.std(dx) / expected, 1., delta=0.02)
+        self.assertAlmostEqual(np.std(dy) / expected, 1., delta=0.02)
+        # displacements are independent
+        self.assertLess(abs(np.corrcoef(dx[1:].ravel(), dx[:-1].ravel())[0, 1]), 0.02)
+        track = self.generate(models.Brownian(), self.open, n_objects=200)
+        self.assertAlmostEqual(np.mean(analytics.speed(track)), 3., delta=0.05)
+
+    def test_ornstein_uhlenbeck(self):
+        track = self.generate(models.OrnsteinUhlenbeck(0.2), self.open, n_objects=200)
+        self.assertAlmostEqual(np.mean(analytics.speed(track)), 3., delta=0.1)
+        (dx, _) = analytics.displacement(track)
+        lag = 20
+        correlation = np.corrcoef(dx[lag:].ravel(), dx[:-lag].ravel())[0, 1]
+        self.assertAlmostEqual(correlation, np.exp(-lag * track.timestep() / 0.2), delta=0.05)
+
+    def test_no_steps(self):
+        """Models accept tracks with a single frame
+        """
+        steps = np.zeros((0, 4))
+        for model in [models.VonMises(8), models.Brownian(), models.OrnsteinUhlenbeck(0.5),
+                      models.SpeedChanges(1.)]:
+            (model_steps, turns) = model.sample(steps, 0.01, np.random.default_rng(0))
+            self.assertEqual(model_steps.shape, (0, 4))
+            self.assertEqual(turns.shape, (0, 4))
+
+    def test_speed_changes(self):
+        track = self.generate(models.SpeedChanges(2., (0.5, 1.5)), self.open, n_objects=50)
+        speeds = analytics.speed(track)
+        self.assertTrue(np.all((speeds > 1.5 - 1e-9) & (speeds < 4.5 + 1e-9)))
+        changes = np.count_nonzero(np.abs(np.diff(speeds, axis=0)) > 1e-9)
+        self.assertAlmostEqual(changes / 50 / self.time[-1], 2., delta=0.3)
+
+    def test_stays_in_arena(self):
+        for model in [models.Brownian(), models.OrnsteinUhlenbeck(0.5), models.Curvature(1.)]:
+            track = self.generate(model)
+            self.assertLess(np.max(np.abs(track.x)), 6.)
+            self.assertLess(np.max(np.abs(track.y)), 6.)
+
+    def test_stats(self):
+        stats = GenerationStats()
+        Track().generate_trajectory(Position(self.position.x, self.position.y), 3., self.opts,
+                                    self.time, model=models.VonMises(8), stats=stats)
+        self.assertEqual(stats.calls["model"], 1)
+        self.assertEqual(stats.calls["jitter"], len(self.time) - 1)
+
+    @unittest.skipUnless(kernels.AVAILABLE, "numba is not installed")
+    def test_kernel(self):
+        model = models.Combined(models.SpeedChanges(1.), models.OrnsteinUhlenbeck(0.5),
+                                models.VonMises(50))
+        expected = self.generate(model)
+        track = self.generate(model, dict(self.opts, backend="numba"))
+        testing.assert_array_equal(track.x, expected.x)
+        testing.assert_array_equal(track.y, expected.y)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,12 +25,46 @@ class TestPosition(unittest.TestCase):
         P = Position().random_positions(8, (-10, 10), (-10, 10), min_distance)
         self.assertTrue(P.is_min_distance_complied(min_distance))
 
+    def test_random_positions_grid(self):
+        """Dense display which rejection sampling would not finish
+        """
+        min_distance = 2
+        P = Position().random_positions(60, (-10, 10), (-10, 10), min_distance, method="grid")
+        self.assertEqual(P.n_objects, 60)
+        self.assertTrue(P.is_min_distance_complied(min_distance))
+        self.assertTrue(np.all(np.abs(P.x) <= 10) and np.all(np.abs(P.y) <= 10))
+
+    def test_random_positions_infeasible(self):
+        with self.assertRaises(ValueError):
+            Position().random_positions(200, (-10, 10), (-10, 10), 2, method="grid")
+        with self.assertRaises(ValueError):
+            Position().random_positions(100, (-10, 10), (-10, 10), 2, method="grid", max_attempts=50)
+
+    def test_random_positions_rng(self):
+        P1 = Position().random_positions(5, (-10, 10), (-10, 10), 1, rng=np.random.default_rng(4))
+        P2 = Position().random_positions(5, (-10, 10), (-10, 10), 1, rng=np.random.default_rng(4))
+        testing.assert_array_equal(P1.x, P2.x)
+
     def test_circular_positions(self):
         """Does it work?
         """
         P = Position().circular_positions(7, 5)
         self.assertAlmostEqual(P.y[0], 5.)
 
+    def test_interleaved_coordinates(self):
+        """x and y are columns of one buffer
+        """
+        testing.assert_array_equal(self.P1.xy, [[-2, -2], [2, -2], [2, 2], [-2, 2]])
+        self.P1.move((1., np.arange(4.)))
+        testing.assert_array_equal(self.P1.x, [-1, 3, 3, -1])
+        testing.assert_array_equal(self.P1.xy[:, 1], [-2, -1, 4, 5])
+        self.P1.scale(np.array([1., 2., 1., 2.]))
+        testing.assert_array_equal(self.P1.y, [-2, -2, 4, 10])
+        self.P1.x = np.zeros(6)
+        self.assertEqual(self.P1.xy.shape, (6, 2))
+        self.P1.extra = 1
+        self.assertEqual(self.P1.extra, 1)
+
     def test_jitter_positions(self):
         """Are all coordinates changed?
         """
@@ -0,0 +1,55 @@
+"""Unittests for generation statistics
+"""
+
+import unittest
+import numpy as np
+from numpy import testing
+from motbox import Track, Position
+from motbox.stats import GenerationStats
+
+
+class TestGenerationStats(unittest.TestCase):
+
+    def setUp(self):
+        self.opts = {"xlim": (-5, 5), "ylim": (-5, 5), "spacing": 1.5}
+        self.time = np.arange(0, 5, 0.01)
+
+    def generate(self, stats=None):
+        position = Position().random_positions(8, (-5, 5), (-5, 5), 1.5, rng=np.random.default_rng(1),
+                                               stats=stats)
+        return Track().generate_vonmises(position, 3., 8, self.opts, self.time,
+                                         rng=np.random.default_rng(2), stats=stats)
+
+    def test_same_track(self):
+        """Statistics do not change the generated track
+        """
+        track = self.generate(GenerationStats())
+        testing.assert_array_equal(track.x, self.generate().x)
+        self.assertIsNone(self.generate().stats)
+
+    def test_phases_and_counts(self):
+        track = self.generate(GenerationStats())
+        stats = track.stats
+        n_steps = len(self.time) - 1
+        for phase in ("bounce_square", "bounce_objects", "move", "jitter"):
+            self.assertEqual(stats.calls[phase], n_steps)
+            self.assertGreater(stats.times[phase], 0)
+        self.assertEqual(stats.calls["random_positions"], 1)
+        self.assertGreaterEqual(stats.counts["position_attempts"], 1)
+        self.assertGreater(stats.counts["wall_bounces"], 0)
+        self.assertGreaterEqual(stats.counts["collision_pairs"], stats.counts["collision_groups"])
+        self.assertIn("bounce_objects", stats.summary())
+
+    def test_grid_attempts(self):
+        stats = GenerationStats()
+        Position().random_positions(30, (-5, 5), (-5, 5), 1., rng=np.random.default_rng(0),
+                                    method="grid", stats=stats)
+        self.assertGreaterEqual(stats.counts["position_attempts"], 30)
+
+    def test_merge(self):
+        first = self.generate(GenerationStats()).stats
+        second = self.generate(GenerationStats()).stats
+        total = GenerationStats().merge(first).merge(second)
+        self.assertEqual(total.calls["move"], 2 * first.calls["move"])
+        self.assertEqual(total.counts["wall_bounces"], 2 * first.counts["wall_bounces"])
+        self.assertEqual(sorted(total.as_dict()), ["calls", "counts", "times"])
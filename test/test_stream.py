@@ -0,0 +1,91 @@
+"""Unittests for streaming trajectory generation
+"""
+
+import json
+import unittest
+import numpy as np
+from numpy import testing
+from motbox import Track, Position, arenas
+from motbox.stream import TrajectoryStream
+
+
+class TestTrajectoryStream(unittest.TestCase):
+
+    def setUp(self):
+        self.opts = {"xlim": (-5, 5), "ylim": (-5, 5), "spacing": 1.5}
+        self.time = np.arange(0, 5, 0.05)
+        self.position = Position().random_positions(6, (-5, 5), (-5, 5), 1.5,
+                                                    rng=np.random.default_rng(3))
+
+    def test_matches_track(self):
+        """Stream produces the same frames as Track.generate_vonmises
+        """
+        track = Track().generate_vonmises(Position(self.position.x, self.position.y), 3., 8,
+                                          self.opts, self.time, rng=np.random.default_rng(5))
+        stream = TrajectoryStream().start(self.position, 3., self.opts, track.timestep(), kappa=8,
+                                          rng=np.random.default_rng(5))
+        chunks = list(stream.chunks(30, n_frames=len(self.time)))
+        self.assertEqual([len(chunk.time) for chunk in chunks], [30, 30, 30, 10])
+        testing.assert_allclose(np.concatenate([chunk.x for chunk in chunks]), track.x)
+        testing.assert_allclose(np.concatenate([chunk.y for chunk in chunks]), track.y)
+        testing.assert_allclose(chunks[1].time, self.time[30:60])
+        self.assertEqual(chunks[0].meta["kappa"], 8)
+
+    def test_resume(self):
+        stream = TrajectoryStream().start(self.position, 3., self.opts, 0.05, kappa=8,
+                                          rng=np.random.default_rng(5))
+        frames = list(stream.frames(100))
+        stream = TrajectoryStream().start(self.position, 3., self.opts, 0.05, kappa=8,
+                                          rng=np.random.default_rng(5))
+        list(stream.frames(40))
+        state = json.loads(json.dumps(stream.state()))
+        resumed = list(TrajectoryStream().resume(state).frames(60))
+        for (expected, frame) in zip(frames[40:], resumed):
+            self.assertAlmostEqual(expected[0], frame[0])
+            testing.assert_array_equal(expected[1], frame[1])
+            testing.assert_array_equal(expected[2], frame[2])
+
+    def test_resume_arena(self):
+        """Arena is stored by its description and rebuilt on resume
+        """
+        opts = {"arena": arenas.Circle(5., obstacles=[arenas.Circle(1.5)]), "spacing": 1.5}
+        position = Position().random_positions(6, None, None, 1.5, rng=np.random.default_rng(3),
+                                               arena=opts["arena"])
+        stream = TrajectoryStream().start(position, 3., opts, 0.05, kappa=8,
+                                          rng=np.random.default_rng(5))
+        frames = list(stream.frames(100))
+        stream = TrajectoryStream().start(position, 3., opts, 0.05, kappa=8,
+                                          rng=np.random.default_rng(5))
+        list(stream.frames(40))
+        state = json.loads(json.dumps(stream.state()))
+        self.assertEqual(state["opts"]["arena"], opts["arena"].describe())
+        resumed = list(TrajectoryStream().resume(state).frames(60))
+        for (expected, frame) in zip(frames[40:], resumed):
+            testing.assert_array_equal(expected[1], frame[1])
+            testing.assert_array_equal(expected[2], frame[2])
+        self.assertIsInstance(stream.opts["arena"], arenas.Circle)
+
+    def test_global_random(self):
+        """Without rng the stream uses the global numpy.random like Track
+        """
+        np.random.seed(5)
+        track = Track().generate_vonmises(Position(self.position.x, self.position.y), 3., 8,
+                                          self.opts, self.time)
+        np.random.seed(5)
+        stream = TrajectoryStream().start(self.position, 3., self.opts, track.timestep(), kappa=8)
+        frames = list(stream.frames(len(self.time)))
+        testing.assert_allclose(np.array([frame[1] for frame in frames]), track.x)
+        np.random.seed(5)
+        stream = TrajectoryStream().start(self.position, 3., self.opts, track.timestep(), kappa=8)
+        list(stream.frames(40))
+        state = json.loads(json.dumps(stream.state()))
+        np.random.seed(0)
+        resumed = list(TrajectoryStream().resume(state).frames(len(self.time) - 40))
+        testing.assert_array_equal(np.array([frame[1] for frame in resumed]), track.x[40:])
+
+    def test_position_not_modified(self):
+        x = self.position.x.copy()
+        stream = TrajectoryStream().start(self.position, 3., self.opts, 0.05)
+        list(stream.frames(10))
+        testing.assert_array_equal(self.position.x, x)
+        self.assertEqual(stream.frame, 10)
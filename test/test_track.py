@@ -4,7 +4,8 @@
 import unittest, os, re
 import numpy as np
 from numpy import testing
-from motbox import Track, Position
+from motbox import Track, TrackView, Position
+from motbox.track import time_interpolate_tracks, load_many
 
 COMPLETE = True
 track_data_path = os.path.join("test", "tracks", "T220.csv")
@@ -30,7 +31,7 @@ class TestTrack(unittest.TestCase):
     def tearDown(self):
         # removes generated files so they are not left in .git by accident
         for f in os.listdir("test"):
-            if re.search(".*(.csv)", f):
+            if re.search(".*(.csv)|(.npz)", f):
                 os.remove(os.path.join("test", f))
 
     def test_move_x(self):
@@ -62,9 +63,186 @@ class TestTrack(unittest.TestCase):
         step = self.T1.timestep()
         self.assertAlmostEqual(step, 0.01)
 
-    @unittest.skipUnless(COMPLETE, "Time consuming video generation")
-    def generate_vonmises(self):
+    def test_time_interpolate(self):
+        newtime = np.arange(-0.1, 12.5, 1 / 60.)
+        self.T1.time_interpolate(newtime)
+        for index in range(self.T2.n_objects):
+            testing.assert_allclose(self.T1.x[:, index], np.interp(newtime, self.T2.time, self.T2.x[:, index]))
+            testing.assert_allclose(self.T1.y[:, index], np.interp(newtime, self.T2.time, self.T2.y[:, index]))
+
+    def test_time_interpolate_cubic(self):
+        newtime = self.T1.time[::3]
+        self.T1.time_interpolate(newtime, method="cubic")
+        testing.assert_allclose(self.T1.x, self.T2.x[::3])
+
+    def test_time_interpolate_tracks(self):
+        T3 = Track()
+        T3.load_from_csv(track_data_path, delim=",")
+        T3.time = T3.time * 2
+        newtime = np.arange(0, 10, 1 / 144.)
+        time_interpolate_tracks([self.T1, T3], newtime)
+        self.T2.time_interpolate(newtime)
+        testing.assert_allclose(self.T1.x, self.T2.x)
+        self.assertEqual(T3.x.shape, self.T2.x.shape)
+        testing.assert_allclose(T3.y[720], self.T2.y[360])
+
+    def test_load_detects_delimiter(self):
+        T3 = Track().load_from_csv_v0(track_data_path)
+        testing.assert_array_equal(T3.x, self.T1.x)
+        filename = os.path.join("test", "test_track_tab.csv")
+        self.T1.save_to_csv(filename)
+        T3.load_from_csv(filename)
+        testing.assert_array_equal(T3.y, self.T1.y)
+
+    def test_load_even_columns(self):
+        filename = os.path.join("test", "test_track_even.csv")
+        with open(filename, "w") as handle:
+            handle.write("0,1,2,3\n0.1,1,2,3\n")
+        with self.assertRaises(ValueError):
+            Track().load_from_csv(filename)
+
+    def test_load_trailing_delimiter(self):
+        filename = os.path.join("test", "test_track_trailing.csv")
+        with open(filename, "w") as handle:
+            handle.write("0\t1\t2\t\n0.1\t1.5\t2.5\t\n\n")
+        track = Track().load_from_csv(filename)
+        testing.assert_array_equal(track.time, [0., 0.1])
+        testing.assert_array_equal(track.x, [[1.], [1.5]])
+        testing.assert_array_equal(track.y, [[2.], [2.5]])
+
+    def test_load_many(self):
+        filename = os.path.join("test", "test_track_many.npz")
+        self.T1.save_to_npz(filename)
+        tracks = load_many([track_data_path, filename, track_data_path], max_workers=2)
+        self.assertEqual(len(tracks), 3)
+        for track in tracks:
+            testing.assert_array_equal(track.x, self.T1.x)
+
+    def test_save_load_npz(self):
+        filename = os.path.join("test", "test_track.npz")
+        self.T1.meta = {"xlim": (-10, 10), "spacing": 1.}
+        self.T1.save_to_csv(filename)
+        T3 = Track()
+        T3.load_from_csv(filename)
+        testing.assert_array_equal(T3.x, self.T1.x)
+        testing.assert_array_equal(T3.time, self.T1.time)
+        self.assertEqual(T3.meta, {"xlim": [-10, 10], "spacing": 1.})
+        T3.move(self.diff1)
+        testing.assert_allclose(T3.y, self.T1.y + self.diff1[1])
+
+    def test_save_npz_float32(self):
+        filename = os.path.join("test", "test_track32.npz")
+        self.T1.save_to_npz(filename, dtype=np.float32)
+        T3 = Track().load_from_npz(filename)
+        self.assertEqual(T3.x.dtype, np.float32)
+        testing.assert_allclose(T3.x, self.T1.x, rtol=1e-6)
+        with self.assertRaises(ValueError):
+            T3.move(self.diff1)
+
+    def test_position_for_time(self):
+        """Fast lookup gives the same as per-object np.interp
+        """
+        for timevalue in [-1., 0., 0.005, 0.01, 1.234567, 5.555, self.T1.time[-1], 100.]:
+            (newx, newy) = self.T1.position_for_time(timevalue)
+            for index in range(self.T1.n_objects):
+                self.assertAlmostEqual(newx[0, index], np.interp(timevalue, self.T1.time, self.T1.x[:, index]))
+                self.assertAlmostEqual(newy[0, index], np.interp(timevalue, self.T1.time, self.T1.y[:, index]))
+
+    def test_position_for_time_nonuniform(self):
+        self.T1.time = self.T1.time ** 2
+        (newx, _) = self.T1.position_for_time(3.3)
+        testing.assert_allclose(newx[0], [np.interp(3.3, self.T1.time, column) for column in self.T1.x.T])
+
+    def test_position_for_time_out(self):
+        buffers = (np.zeros((1, self.T1.n_objects)), np.zeros((1, self.T1.n_objects)))
+        result = self.T1.position_for_time(2.5, out=buffers)
+        self.assertIs(result[0], buffers[0])
+        testing.assert_allclose(buffers[1], self.T2.position_for_time(2.5)[1])
+
+    def test_compact(self):
+        x = self.T1.x.copy()
+        self.assertIs(self.T1.compact(np.float32), self.T1)
+        self.assertEqual(self.T1.xy.shape, x.shape + (2, ))
+        self.assertEqual(self.T1.x.dtype, np.float32)
+        self.assertTrue(np.shares_memory(self.T1.x, self.T1.xy))
+        testing.assert_allclose(self.T1.x, x, atol=1e-5)
+        self.T1.move((1., 1.))
+        testing.assert_allclose(self.T1.xy[..., 0], x + 1., atol=1e-5)
+        self.T1.x = x
+        self.assertFalse(np.shares_memory(self.T1.x, self.T1.xy))
+        testing.assert_array_equal(self.T1.xy[..., 0], x)
+
+    def test_pickle_compact(self):
+        import pickle
+        self.T1.compact()
+        track = pickle.loads(pickle.dumps(self.T1))
+        testing.assert_array_equal(track.y, self.T1.y)
+        self.assertTrue(np.shares_memory(track.x, track.xy))
+        self.T1.condition = "easy"
+        self.assertEqual(pickle.loads(pickle.dumps(self.T1)).condition, "easy")
+        view = pickle.loads(pickle.dumps(self.T1[5:10, [1, 2]]))
+        testing.assert_array_equal(view.x, self.T1.x[5:10, [1, 2]])
+
+    @unittest.skipUnless(COMPLETE, "Time consuming track generation")
+    def test_generate_vonmises(self):
         opts = {"xlim": (-10, 10), "ylim": (-10, 10), "spacing":2.}
         time = np.arange(0, 5, 0.5)
-        self.T1.generate_vonmises(Positions().circular_positions(8, 5), speed= 3., kappa = 8, opts = opts, time = time)
-        self.assertTrue(True)
+        self.T1.generate_vonmises(Position().circular_positions(8, 5), speed= 3., kappa = 8, opts = opts, time = time)
+        self.assertEqual(self.T1.x.shape, (len(time), 8))
+        self.assertEqual(self.T1.meta["kappa"], 8)
+        self.assertTrue(np.shares_memory(self.T1.y, self.T1.xy))
+
+
+class TestTrackView(unittest.TestCase):
+
+    def setUp(self):
+        self.track = Track().load_from_csv(track_data_path, delim=",")
+
+    def test_slice_shares_data(self):
+        view = self.track[10:50, 2:5]
+        self.assertIsInstance(view, TrackView)
+        self.assertEqual(view.n_objects, 3)
+        testing.assert_array_equal(view.time, self.track.time[10:50])
+        self.assertTrue(np.shares_memory(view.x, self.track.x))
+        testing.assert_array_equal(view[5:, [0, 2]].y, self.track.y[15:50][:, [2, 4]])
+
+    def test_window(self):
+        view = self.track.window(1., 2., objects=[0, 3])
+        self.assertTrue(np.all((view.time >= 1.) & (view.time < 2.)))
+        self.assertEqual(len(view.time), np.count_nonzero((self.track.time >= 1.) & (self.track.time < 2.)))
+        testing.assert_array_equal(view.x[:, 1], self.track.x[self.track.time >= 1., 3][:len(view.time)])
+
+    def test_lazy_transforms(self):
+        original = self.track.x.copy()
+        view = self.track[:, [1, 4, 6]]
+        view.move((1., 2.))
+        view.scale(-1, axis=0)
+        view.scale(2.)
+        testing.assert_allclose(view.x, -2 * (original[:, [1, 4, 6]] + 1.))
+        testing.assert_allclose(view.y, 2 * (self.track.y[:, [1, 4, 6]] + 2.))
+        testing.assert_array_equal(self.track.x, original)
+        subset = view[100:, 1]
+        testing.assert_allclose(subset.x[:, 0], -2 * (original[100:, 4] + 1.))
+        subset.move((1., 0.))
+        testing.assert_allclose(view.x[100:, 1], subset.x[:, 0] - 1.)
+        (x, y) = view.position_for_time(2.345)
+        testing.assert_allclose(x[0], [np.interp(2.345, view.time, column) for column in view.x.T])
+        testing.assert_allclose(y[0], [np.interp(2.345, view.time, column) for column in view.y.T])
+
+    def test_materialize(self):
+        view = self.track[20:30, [0, 1]]
+        view.move((5., 5.))
+        track = view.materialize()
+        self.assertNotIsInstance(track, TrackView)
+        testing.assert_array_equal(track.x, view.x)
+        track.x[0, 0] = 1000.
+        self.assertNotEqual(view.x[0, 0], 1000.)
+        self.assertFalse(np.shares_memory(self.track[20:30].materialize().x, self.track.x))
+
+    def test_assign_detaches(self):
+        view = self.track[:100, :3]
+        view.move((1., 1.))
+        expected = np.array(view.y)
+        view.time_interpolate(view.time[::2])
+        testing.assert_allclose(view.y, expected[::2])
+        self.assertFalse(np.shares_memory(view.x, self.track.x))
@@ -1,4 +1,4 @@
-import unittest, os, re
+import unittest, os, re, shutil, tempfile
 import numpy as np
 from numpy import testing
 from motbox import Track, Position
@@ -32,3 +32,82 @@ class TestVisualisation(unittest.TestCase):
     def test_make_video(self):
         vis.trajectory_video(self.T1, os.path.join("test", "test_video.mp4"))
         self.assertTrue(True)
+
+
+    def test_video_mode(self):
+        self.assertEqual(vis._video_mode(None, None), "fast")
+        self.assertEqual(vis._video_mode(None, print), "pretty")
+        self.assertEqual(vis._video_mode("pretty", None), "pretty")
+        with self.assertRaises(ValueError):
+            vis._video_mode("fast", print)
+        with self.assertRaises(ValueError):
+            vis._video_mode("slow", None)
+
+
+    @unittest.skipUnless(COMPLETE, "Time consuming video generation")
+    def test_make_video_pretty(self):
+        self.T1.time_interpolate(np.arange(0, 1, 0.01))
+        vis.trajectory_video(self.T1, os.path.join("test", "test_video_pretty.mp4"), mode="pretty")
+        self.assertTrue(True)
+
+
+    @unittest.skipUnless(COMPLETE, "Time consuming video generation")
+    def test_make_video_jobs(self):
+        self.T1.time_interpolate(np.arange(0, 2, 0.01))
+        filename = os.path.join("test", "test_video_jobs.mp4")
+        vis.trajectory_video(self.T1, filename, jobs=2)
+        self.assertTrue(os.path.getsize(filename) > 0)
+
+
+    @unittest.skipUnless(COMPLETE, "Time consuming video generation")
+    def test_render_videos(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.T1.time_interpolate(np.arange(0, 1, 0.01))
+            paths = [os.path.join(directory, name) for name in ("a.csv", "b.npz")]
+            for path in paths:
+                self.T1.save_to_csv(path)
+            finished = []
+            filenames = vis.render_videos(paths, jobs=2, progress=finished.append)
+            self.assertEqual(filenames, [os.path.join(directory, name) for name in ("a.mp4", "b.mp4")])
+            self.assertTrue(all(os.path.exists(filename) for filename in filenames))
+            self.assertEqual(finished, [1, 2])
+        finally:
+            shutil.rmtree(directory)
+
+
+    def test_video_filenames(self):
+        filenames = vis._video_filenames(["d/a.csv", "d/a.npz", "d/b.npz", "e/a.csv"])
+        self.assertEqual(filenames, [os.path.join("d", "a_csv.mp4"), os.path.join("d", "a_npz.mp4"),
+                                     os.path.join("d", "b.mp4"), os.path.join("e", "a.mp4")])
+        with self.assertRaises(ValueError):
+            vis._video_filenames(["d/a.csv", "e/a.csv"], output_dir="videos")
+
+
+    def test_track_files(self):
+        """Banks in directories are not taken as tracks
+        """
+        from motbox.bank import save_bank
+        from motbox.commands import track_files
+        directory = tempfile.mkdtemp()
+        try:
+            self.T1.save_to_csv(os.path.join(directory, "a.csv"))
+            self.T1.save_to_npz(os.path.join(directory, "b.npz"))
+            save_bank(os.path.join(directory, "bank.npz"), [self.T1])
+            self.assertEqual(track_files([directory]), [os.path.join(directory, name)
+                                                        for name in ("a.csv", "b.npz")])
+        finally:
+            shutil.rmtree(directory)
+
+
+    def test_render_frames(self):
+        frames = vis.render_frames(self.T1, [0., 1.], xlim=(-10, 10), ylim=(-10, 10),
+                                   width=200, height=100, radius=1.)
+        frame = next(frames).copy()
+        self.assertEqual(frame.shape, (100, 200, 3))
+        # object 0 starts at (-3.74, 6.62), scale is 5 pixels per unit
+        row = int(round((10 - 6.62) * 5))
+        column = int(round((-3.74 + 10) * 5 + 50))
+        testing.assert_array_equal(frame[row, column], (0, 0, 0))
+        testing.assert_array_equal(frame[0, 0], (255, 255, 255))
+        self.assertEqual(len(list(frames)), 1)